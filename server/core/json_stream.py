@@ -0,0 +1,151 @@
+"""
+Incremental readers for request bodies holding many JSON values, either one per line (NDJSON) or as
+a single top-level array. Both read the stream in fixed-size chunks and hand values out one at a time,
+so memory stays bounded by the largest single value rather than by the size of the body.
+Values that cannot be decoded are yielded as ValueError instances in their place, and errors about the
+body as a whole, such as a JSON body that is not an array, as BodyError instances.
+"""
+import codecs
+import json
+import re
+
+CHUNK_SIZE = 64 * 1024
+MAX_VALUE_SIZE = 1024 * 1024
+
+_decoder = json.JSONDecoder()
+_whitespace = re.compile(r'[ \t\n\r]*')
+
+
+class BodyError(ValueError):
+    """The body cannot be read at all from this point: it is not UTF-8 or not the kind of document expected."""
+
+
+def iter_ndjson(stream, chunk_size=CHUNK_SIZE, max_value_size=MAX_VALUE_SIZE):
+    """Values of the non-blank lines of stream. A bad line only costs its own value."""
+    for line in _iter_lines(stream, chunk_size, max_value_size):
+        if isinstance(line, ValueError):
+            yield line
+        elif line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                yield e
+
+
+def iter_json_array(stream, chunk_size=CHUNK_SIZE, max_value_size=MAX_VALUE_SIZE):
+    """
+    Elements of the top-level JSON array in stream. A syntax error yields the error and ends
+    the iteration, since there is no reliable way to find where the next element starts.
+    """
+    try:
+        yield from _iter_array_elements(_TextReader(stream, chunk_size), max_value_size)
+    except ValueError as e:
+        # Raised by the reader for bytes that are not UTF-8.
+        yield e
+
+
+def _iter_array_elements(reader, max_value_size):
+    buffer, position = '', 0
+    expecting = '['
+    while True:
+        position = _whitespace.match(buffer, position).end()
+        if position == len(buffer):
+            buffer, position = reader.read_more(buffer[position:]), 0
+            if buffer is None:
+                if expecting == '[':
+                    yield BodyError('Expected a JSON array.')
+                elif expecting != 'end':
+                    yield ValueError('Unexpected end of data, the JSON array is not closed.')
+                return
+            continue
+
+        char = buffer[position]
+        if expecting == 'end':
+            yield ValueError(f'Unexpected data after the JSON array at character {reader.offset + position}.')
+            return
+        if expecting == '[':
+            if char != '[':
+                yield BodyError('Expected a JSON array.')
+                return
+            position, expecting = position + 1, 'first value'
+        elif expecting in ('first value', 'separator') and char == ']':
+            position, expecting = position + 1, 'end'
+        elif expecting == 'separator':
+            if char != ',':
+                yield ValueError(f"Expected ',' or ']' at character {reader.offset + position}.")
+                return
+            position, expecting = position + 1, 'value'
+        else:
+            try:
+                value, end = _decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError as e:
+                error = ValueError(f'Invalid JSON at character {reader.offset + e.pos}: {e.msg}.')
+            else:
+                # A number running into the end of the buffer may continue in the next chunk.
+                if end < len(buffer) or reader.finished:
+                    yield value
+                    position, expecting = end, 'separator'
+                    continue
+                error = None
+            if len(buffer) - position > max_value_size:
+                yield ValueError(f'JSON value at character {reader.offset + position} is longer than {max_value_size} characters.')
+                return
+            if reader.finished:
+                yield error
+                return
+            buffer, position = reader.read_more(buffer[position:]), 0
+
+
+class _TextReader:
+    """Reads a byte stream as UTF-8 text in chunks, tracking the character offset of the kept buffer."""
+
+    def __init__(self, stream, chunk_size):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.finished = False
+        self.offset = 0
+        self.consumed = 0
+
+    def read_more(self, rest):
+        """rest followed by the next chunk of text, or None once rest is empty and the stream is exhausted."""
+        self.offset = self.consumed - len(rest)
+        while not self.finished:
+            chunk = self.stream.read(self.chunk_size)
+            self.finished = not chunk
+            try:
+                text = self.decoder.decode(chunk, final=self.finished)
+            except UnicodeDecodeError as e:
+                raise BodyError(f'Request body is not valid UTF-8: {e}')
+            if text:
+                self.consumed += len(text)
+                return rest + text
+        return rest or None
+
+
+def _iter_lines(stream, chunk_size, max_value_size):
+    """Decoded lines of a byte stream without their line breaks. Overlong lines are replaced by a ValueError."""
+    pending, skipping = b'', False
+    while True:
+        chunk = stream.read(chunk_size)
+        lines = (pending + chunk).split(b'\n')
+        pending = lines.pop() if chunk else b''
+        for line in lines:
+            if skipping:
+                skipping = False
+                continue
+            yield _decode_line(line)
+        if len(pending) > max_value_size:
+            # The rest of the line, up to the next line break, is dropped as well.
+            if not skipping:
+                yield ValueError(f'Line is longer than {max_value_size} bytes.')
+            pending, skipping = b'', True
+        if not chunk:
+            return
+
+
+def _decode_line(line):
+    try:
+        return line.decode('utf-8')
+    except UnicodeDecodeError as e:
+        return ValueError(f'Line is not valid UTF-8: {e}')
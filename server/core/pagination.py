@@ -0,0 +1,27 @@
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination on the primary key. Every page is a `WHERE id > <cursor> ORDER BY id LIMIT n`
+    index range scan, so deep pages cost the same as the first one, and rows inserted while a client
+    walks the list never shift it onto rows it has already seen.
+    The page size comes from REST_FRAMEWORK['PAGE_SIZE'] and can be lowered or raised per request
+    with ?page_size= up to max_page_size.
+    """
+    ordering = 'id'
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
+class CreatedAtKeysetPagination(KeysetPagination):
+    """Newest first. Rows created in the same instant are told apart by the offset DRF encodes in the cursor."""
+    ordering = '-created_at'
+
+
+class SearchRankKeysetPagination(KeysetPagination):
+    """
+    For querysets annotated with a `search_rank`: best matches first, the cursor keeps the rank of the
+    last row seen, and id breaks ties so equally ranked rows keep a stable order.
+    """
+    ordering = ('-search_rank', 'id')
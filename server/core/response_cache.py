@@ -0,0 +1,90 @@
+"""
+Cache of rendered GET responses with ETags.
+Keys embed a version per group of endpoints ('products', 'shops'). A write bumps the version of the
+groups it affects once its transaction commits, so stale entries are never read again and expire on their own.
+"""
+import hashlib
+import time
+from functools import wraps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags, quote_etag
+
+VERSION_KEY = 'response-cache-version:{group}'
+ENTRY_KEY = 'response-cache:{group}:{version}:{digest}'
+
+
+def cache_version(group):
+    # A fresh version starts at the current time, so a version evicted from the cache never restarts
+    # at a value that old entries were stored under.
+    key = VERSION_KEY.format(group=group)
+    cache.add(key, time.time_ns(), timeout=None)
+    return cache.get(key)
+
+
+def bump_cache_versions(groups):
+    for group in groups:
+        try:
+            cache.incr(VERSION_KEY.format(group=group))
+        except ValueError:
+            cache.set(VERSION_KEY.format(group=group), time.time_ns(), timeout=None)
+
+
+def invalidate_responses(*groups):
+    """Drop the cached responses of the given groups once the current transaction commits."""
+    transaction.on_commit(lambda: bump_cache_versions(groups))
+
+
+def cache_response(view_method):
+    """
+    Cache successful JSON responses of a view method under its view's response_cache_group, and answer
+    If-None-Match with 304 when the client already has the current representation.
+    """
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        if request.method != 'GET' or request.accepted_renderer.format != 'json':
+            return view_method(self, request, *args, **kwargs)
+
+        key = _entry_key(self.response_cache_group, request)
+        entry = cache.get(key)
+        if entry is None:
+            response = self.finalize_response(request, view_method(self, request, *args, **kwargs), *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            response.render()
+            entry = {
+                'content': response.content,
+                'content_type': response['Content-Type'],
+                'etag': quote_etag(hashlib.sha1(response.content).hexdigest()),
+            }
+            cache.set(key, entry, settings.RESPONSE_CACHE_TIMEOUT)
+        else:
+            response = HttpResponse(entry['content'], content_type=entry['content_type'])
+
+        if entry['etag'] in parse_etags(request.headers.get('If-None-Match', '')):
+            response = HttpResponseNotModified()
+        response['ETag'] = entry['etag']
+        return response
+
+    return wrapper
+
+
+def _entry_key(group, request):
+    # The absolute URI, because pagination links in the body carry the host the client used.
+    digest = hashlib.sha1(request.build_absolute_uri().encode()).hexdigest()
+    return ENTRY_KEY.format(group=group, version=cache_version(group), digest=digest)
+
+
+class CachedResponseMixin:
+    """Caches the list and retrieve actions of a viewset; other actions opt in with @cache_response."""
+    response_cache_group = None
+
+    @cache_response
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cache_response
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
@@ -1,3 +1,154 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.json_stream import BodyError, iter_ndjson, iter_json_array
+from products.bulk_loader import BulkCSVLoader
+from products.models import Product, Tag, PriceSnapshot
+from shops.models import Shop
+from datetime import date
+from io import BytesIO
 
-# Create your tests here.
+
+@override_settings(RESPONSE_CACHE_TIMEOUT=600)
+class ResponseCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client = APIClient()
+        self.product = Product.objects.create(name="Bananas")
+        self.shop = Shop.objects.create(name="Costco", address="Pearland")
+
+    def write(self, action):
+        # Versions are bumped on commit, which TestCase only simulates when asked to.
+        with self.captureOnCommitCallbacks(execute=True):
+            return action()
+
+    def product_names(self):
+        return [product['name'] for product in self.client.get(reverse('products')).data['results']]
+
+    def test_repeated_product_list_request_is_served_from_cache(self):
+        self.client.get(reverse('products'))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('products'))
+        self.assertEqual(response.json()['results'][0]['name'], "Bananas")
+
+    def test_cached_response_has_same_body_and_etag_as_first_response(self):
+        first = self.client.get(reverse('product', args=[self.product.id]))
+        second = self.client.get(reverse('product', args=[self.product.id]))
+
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(first['ETag'], second['ETag'])
+
+    def test_matching_if_none_match_returns_not_modified(self):
+        etag = self.client.get(reverse('shops'))['ETag']
+        response = self.client.get(reverse('shops'), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+    def test_stale_if_none_match_returns_full_response(self):
+        response = self.client.get(reverse('shops'), HTTP_IF_NONE_MATCH='"stale"')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_query_string_is_part_of_cache_key(self):
+        Product.objects.create(name="Apples")
+        self.client.get(reverse('products'), {'search': 'apples'})
+
+        self.assertEqual(len(self.client.get(reverse('products')).data['results']), 2)
+
+    def test_product_write_invalidates_product_list(self):
+        self.product_names()
+        self.write(lambda: Product.objects.create(name="Apples"))
+
+        self.assertEqual(self.product_names(), ["Bananas", "Apples"])
+
+    def test_tag_change_invalidates_product_detail(self):
+        url = reverse('product', args=[self.product.id])
+        self.client.get(url)
+        self.write(lambda: self.product.tags.set([Tag.objects.create(name="fruit")]))
+
+        self.assertEqual(self.client.get(url).data['tags'][0]['name'], "fruit")
+
+    def test_price_snapshot_write_changes_etag_of_product_prices(self):
+        url = reverse('product-current-prices', args=[self.product.id])
+        etag = self.client.get(url)['ETag']
+        self.write(lambda: PriceSnapshot.objects.create(product=self.product, shop=self.shop, unit_price='1.49', date=date(2025, 2, 20)))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()), 1)
+
+    def test_shop_write_invalidates_shop_list(self):
+        self.client.get(reverse('shops'))
+        self.write(self.shop.delete)
+
+        self.assertEqual(self.client.get(reverse('shops')).data['results'], [])
+
+    def test_bulk_loader_write_invalidates_product_list(self):
+        self.product_names()
+        loader = BulkCSVLoader()
+        loader.add(2, {'store_product_id': '1', 'date': '2/20/2025', 'product_name': 'Apples', 'tags': 'fruit', 'unit': 'lb', 'units_per_pack': '1', 'packs_bought': '1', 'sale_price': '$1.49', 'unit_price': '$1.49', 'store_name': 'Costco', 'store_location': 'Pearland'})
+        self.write(loader.flush)
+
+        self.assertEqual(self.product_names(), ["Bananas", "Apples"])
+
+    def test_not_found_responses_are_not_cached(self):
+        url = reverse('product', args=[self.product.id + 1])
+        self.client.get(url)
+        self.write(lambda: Product.objects.create(name="Apples"))
+
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+
+def decoded(values):
+    return [f'error: {value}' if isinstance(value, ValueError) else value for value in values]
+
+
+class JSONStreamTest(TestCase):
+    def test_iter_json_array_yields_elements_across_chunk_boundaries(self):
+        body = '[1, 23456, {"name": "café"}, [true, null]]'.encode()
+
+        self.assertEqual(list(iter_json_array(BytesIO(body), chunk_size=2)), [1, 23456, {'name': 'café'}, [True, None]])
+
+    def test_iter_json_array_of_empty_array_yields_nothing(self):
+        self.assertEqual(list(iter_json_array(BytesIO(b' [ ] '))), [])
+
+    def test_iter_json_array_stops_at_first_syntax_error(self):
+        values = decoded(iter_json_array(BytesIO(b'[1, {"a" 2}, 3]'), chunk_size=4))
+
+        self.assertEqual(values[0], 1)
+        self.assertEqual(len(values), 2)
+        self.assertIn("Expecting ':' delimiter", values[1])
+
+    def test_iter_json_array_rejects_body_that_is_not_an_array(self):
+        self.assertEqual(decoded(iter_json_array(BytesIO(b'{"a": 1}'))), ['error: Expected a JSON array.'])
+        self.assertIsInstance(next(iter_json_array(BytesIO(b''))), BodyError)
+
+    def test_iter_json_array_rejects_unclosed_array(self):
+        self.assertEqual(decoded(iter_json_array(BytesIO(b'[1, 2'))), [1, 2, 'error: Unexpected end of data, the JSON array is not closed.'])
+
+    def test_iter_json_array_rejects_values_longer_than_limit(self):
+        values = decoded(iter_json_array(BytesIO(b'["' + b'a' * 100 + b'"]'), chunk_size=8, max_value_size=16))
+
+        self.assertEqual(values, ['error: JSON value at character 1 is longer than 16 characters.'])
+
+    def test_iter_ndjson_yields_one_value_per_line_and_skips_blank_lines(self):
+        body = b'{"a": 1}\r\n\n[2]\n3'
+
+        self.assertEqual(list(iter_ndjson(BytesIO(body), chunk_size=3)), [{'a': 1}, [2], 3])
+
+    def test_iter_ndjson_replaces_only_bad_lines_with_errors(self):
+        values = decoded(iter_ndjson(BytesIO(b'1\n{bad\n3\n')))
+
+        self.assertEqual((values[0], values[2]), (1, 3))
+        self.assertTrue(values[1].startswith('error: '))
+
+    def test_iter_ndjson_drops_lines_longer_than_limit(self):
+        body = b'1\n"' + b'a' * 100 + b'"\n3\n'
+
+        self.assertEqual(decoded(iter_ndjson(BytesIO(body), chunk_size=8, max_value_size=16)), [1, 'error: Line is longer than 16 bytes.', 3])
@@ -1,6 +1,15 @@
 from django.contrib import admin
-from .models import Order, OrderItem
+from .models import Order, OrderItem, DailySpend, MonthlySpend
 
 admin.site.register(Order)
 admin.site.register(OrderItem)
 
+
+class SpendAdmin(admin.ModelAdmin):
+    list_display = ('user', 'period', 'shop', 'tag', 'total', 'item_count')
+    list_filter = ('period',)
+    search_fields = ('user__username', 'shop__name', 'tag__name')
+    list_per_page = 10
+
+admin.site.register(DailySpend, SpendAdmin)
+admin.site.register(MonthlySpend, SpendAdmin)
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from orders.rollups import rebuild_spend_rollups
+
+
+class Command(BaseCommand):
+    help = 'Recompute the daily and monthly spend rollups of every user from their order items.'
+
+    def handle(self, *args, **options):
+        daily, monthly = rebuild_spend_rollups()
+        self.stdout.write(f'Rebuilt {daily} daily and {monthly} monthly spend rows.')
@@ -0,0 +1,74 @@
+# Generated by Django 4.2.23 on 2026-10-18 12:06
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shops', '0002_shop_grid_cell'),
+        ('products', '0008_store_sku'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('orders', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlySpend',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total', models.DecimalField(decimal_places=6, default=0, max_digits=20)),
+                ('item_count', models.IntegerField(default=0)),
+                ('period', models.DateField(help_text='First day of the month the orders were placed')),
+                ('shop', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='shops.shop')),
+                ('tag', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='products.tag')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailySpend',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total', models.DecimalField(decimal_places=6, default=0, max_digits=20)),
+                ('item_count', models.IntegerField(default=0)),
+                ('period', models.DateField(help_text='Day the orders were placed')),
+                ('shop', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='shops.shop')),
+                ('tag', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='products.tag')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='monthlyspend',
+            constraint=models.UniqueConstraint(fields=('user', 'period', 'shop', 'tag'), name='monthlyspend_shop_tag'),
+        ),
+        migrations.AddConstraint(
+            model_name='monthlyspend',
+            constraint=models.UniqueConstraint(condition=models.Q(('tag__isnull', True)), fields=('user', 'period', 'shop'), name='monthlyspend_shop_all_tags'),
+        ),
+        migrations.AddConstraint(
+            model_name='monthlyspend',
+            constraint=models.UniqueConstraint(condition=models.Q(('shop__isnull', True)), fields=('user', 'period', 'tag'), name='monthlyspend_no_shop_tag'),
+        ),
+        migrations.AddConstraint(
+            model_name='monthlyspend',
+            constraint=models.UniqueConstraint(condition=models.Q(('shop__isnull', True), ('tag__isnull', True)), fields=('user', 'period'), name='monthlyspend_no_shop_all_tags'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyspend',
+            constraint=models.UniqueConstraint(fields=('user', 'period', 'shop', 'tag'), name='dailyspend_shop_tag'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyspend',
+            constraint=models.UniqueConstraint(condition=models.Q(('tag__isnull', True)), fields=('user', 'period', 'shop'), name='dailyspend_shop_all_tags'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyspend',
+            constraint=models.UniqueConstraint(condition=models.Q(('shop__isnull', True)), fields=('user', 'period', 'tag'), name='dailyspend_no_shop_tag'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyspend',
+            constraint=models.UniqueConstraint(condition=models.Q(('shop__isnull', True), ('tag__isnull', True)), fields=('user', 'period'), name='dailyspend_no_shop_all_tags'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+from django.db import migrations
+from django.db.models import Count, DateField, DecimalField, ExpressionWrapper, F, Sum
+from django.db.models.functions import TruncDate, TruncMonth
+
+TOTAL_FIELD = DecimalField(max_digits=20, decimal_places=6)
+
+
+def backfill_spend_rollups(apps, schema_editor):
+    """Recompute both rollups from the existing order items, like orders.rollups.rebuild_spend_rollups."""
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    line_total = ExpressionWrapper(F('quantity') * F('price_snapshot__unit_price'), output_field=TOTAL_FIELD)
+    for model_name, period in (
+        ('DailySpend', TruncDate('order__date')),
+        ('MonthlySpend', TruncMonth('order__date', output_field=DateField())),
+    ):
+        model = apps.get_model('orders', model_name)
+        # Rows written by edits to items that predate the rollups only hold deltas, so they are replaced too.
+        model.objects.all().delete()
+        items = OrderItem.objects.annotate(period=period)
+        all_tags = items.values('order__ordered_by_id', 'period', 'price_snapshot__shop_id').annotate(
+            total=Sum(line_total, output_field=TOTAL_FIELD), item_count=Count('id'),
+        )
+        per_tag = items.filter(price_snapshot__product__tags__isnull=False).values(
+            'order__ordered_by_id', 'period', 'price_snapshot__shop_id', 'price_snapshot__product__tags',
+        ).annotate(total=Sum(line_total, output_field=TOTAL_FIELD), item_count=Count('id'))
+        model.objects.bulk_create([
+            model(
+                user_id=row['order__ordered_by_id'], period=row['period'], shop_id=row['price_snapshot__shop_id'],
+                tag_id=row.get('price_snapshot__product__tags'), total=row['total'], item_count=row['item_count'],
+            )
+            for row in [*all_tags, *per_tag]
+        ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0002_order_spend_rollups'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_spend_rollups, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,39 @@
 from django.db import models
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
 from core.models import User
-from products.models import PriceSnapshot
+from products.models import PriceSnapshot, Tag
+from shops.models import Shop
+
+TOTAL_FIELD = DecimalField(max_digits=20, decimal_places=6)
+
+
+def line_total(prefix=''):
+    """quantity * unit_price of the order item at prefix, computed by the database."""
+    return ExpressionWrapper(F(f'{prefix}quantity') * F(f'{prefix}price_snapshot__unit_price'), output_field=TOTAL_FIELD)
+
+
+class OrderQuerySet(models.QuerySet):
+    def with_totals(self):
+        """Annotates item_count and total, summed over the items in SQL."""
+        return self.annotate(
+            item_count=Count('orderitem'),
+            total=Coalesce(Sum(line_total('orderitem__')), Value(0), output_field=TOTAL_FIELD),
+        )
+
+
+class OrderItemQuerySet(models.QuerySet):
+    def with_totals(self):
+        """Annotates total, the quantity times the unit price of the item's snapshot."""
+        return self.annotate(total=line_total())
+
 
 class Order(models.Model):
     ordered_by = models.ForeignKey(User, on_delete=models.CASCADE)
     date = models.DateTimeField(auto_now_add=True)
 
+    objects = OrderQuerySet.as_manager()
+
     def __str__(self):
         return f"ORDERED BY: {self.ordered_by.username} # DATE: {self.date}"
 
@@ -14,9 +42,58 @@ class OrderItem(models.Model):
     price_snapshot = models.ForeignKey(PriceSnapshot, on_delete=models.CASCADE)
     quantity = models.DecimalField(max_digits=10, decimal_places=2)
 
+    objects = OrderItemQuerySet.as_manager()
+
     @property
     def total_price(self):
         return self.quantity * self.price_snapshot.unit_price
 
     def __str__(self):
         return f"{self.price_snapshot.product} # QTY: {self.quantity} @ {self.price_snapshot.unit_price} / {self.price_snapshot.unit}"
+
+
+def rollup_constraints(model_name):
+    # NULL never equals NULL in a unique index, so every combination of missing shop and tag gets its own partial index.
+    keys = ['user', 'period']
+    return [
+        models.UniqueConstraint(fields=keys + ['shop', 'tag'], name=f'{model_name}_shop_tag'),
+        models.UniqueConstraint(fields=keys + ['shop'], condition=Q(tag__isnull=True), name=f'{model_name}_shop_all_tags'),
+        models.UniqueConstraint(fields=keys + ['tag'], condition=Q(shop__isnull=True), name=f'{model_name}_no_shop_tag'),
+        models.UniqueConstraint(fields=keys, condition=Q(shop__isnull=True, tag__isnull=True), name=f'{model_name}_no_shop_all_tags'),
+    ]
+
+
+class SpendRollup(models.Model):
+    """
+    What a user spent in one period at one shop, maintained by orders.rollups. Rows without a tag count every
+    item, rows with a tag only the items whose product carries it, so an item bought with two tags shows up
+    under both. A missing shop stands for snapshots without one.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    shop = models.ForeignKey(Shop, on_delete=models.CASCADE, null=True, blank=True)
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, null=True, blank=True)
+    total = models.DecimalField(max_digits=20, decimal_places=6, default=0)
+    item_count = models.IntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+
+class DailySpend(SpendRollup):
+    period = models.DateField(help_text="Day the orders were placed")
+
+    class Meta:
+        constraints = rollup_constraints('dailyspend')
+
+    def __str__(self):
+        return f"{self.user} - SPENT {self.total:.2f} ON {self.period} AT {self.shop or 'NO SHOP'} ON {self.tag or 'ALL TAGS'}"
+
+
+class MonthlySpend(SpendRollup):
+    period = models.DateField(help_text="First day of the month the orders were placed")
+
+    class Meta:
+        constraints = rollup_constraints('monthlyspend')
+
+    def __str__(self):
+        return f"{self.user} - SPENT {self.total:.2f} IN {self.period:%Y-%m} AT {self.shop or 'NO SHOP'} ON {self.tag or 'ALL TAGS'}"
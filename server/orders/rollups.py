@@ -0,0 +1,97 @@
+"""
+Maintenance of the DailySpend and MonthlySpend rollups, so spending dashboards read a few precomputed
+rows instead of summing every OrderItem.
+
+Every write to an order item turns its old and new line totals into deltas, one per rollup row it counts
+towards: the row of its shop for all tags and the row of its shop for each tag of its product, per day and
+per month. Deltas are added to the rows in place and rows left without items are dropped. Tags are those of
+the product when the item is written; rebuild_spend_rollups recomputes everything from the order items.
+"""
+from collections import defaultdict
+from decimal import Decimal
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DateField, F, Sum
+from django.db.models.functions import TruncDate, TruncMonth
+from products.models import ProductTag
+from .models import OrderItem, DailySpend, MonthlySpend, TOTAL_FIELD, line_total
+
+ROLLUPS = {DailySpend: 'day', MonthlySpend: 'month'}
+
+
+def item_spend(item_ids):
+    """(user_id, day, month, shop_id, tag_ids, total) of the given order items, read in two queries."""
+    rows = list(
+        OrderItem.objects.filter(id__in=item_ids)
+        .annotate(day=TruncDate('order__date'), month=TruncMonth('order__date', output_field=DateField()), total=line_total())
+        .values_list('order__ordered_by_id', 'day', 'month', 'price_snapshot__shop_id', 'price_snapshot__product_id', 'total')
+    )
+    tag_ids = defaultdict(list)
+    for product_id, tag_id in ProductTag.objects.filter(product_id__in={row[4] for row in rows}).values_list('product_id', 'tag_id'):
+        tag_ids[product_id].append(tag_id)
+    return [(user_id, day, month, shop_id, tag_ids[product_id], total) for user_id, day, month, shop_id, product_id, total in rows]
+
+
+def spend_deltas(spend, sign=1):
+    """{(model, user_id, period, shop_id, tag_id): [total, item_count]} that the given item spend adds (or with sign -1, removes)."""
+    deltas = defaultdict(lambda: [Decimal(0), 0])
+    for user_id, day, month, shop_id, tag_ids, total in spend:
+        for model, period in ((DailySpend, day), (MonthlySpend, month)):
+            for tag_id in [None, *tag_ids]:
+                delta = deltas[(model, user_id, period, shop_id, tag_id)]
+                delta[0] += sign * total
+                delta[1] += sign
+    return deltas
+
+
+def merge_deltas(*deltas):
+    merged = defaultdict(lambda: [Decimal(0), 0])
+    for delta in deltas:
+        for key, (total, item_count) in delta.items():
+            merged[key][0] += total
+            merged[key][1] += item_count
+    return merged
+
+
+def apply_deltas(deltas):
+    """Add the deltas to their rollup rows, creating missing rows and dropping rows that no longer count any item."""
+    emptied = defaultdict(set)
+    for (model, user_id, period, shop_id, tag_id), (total, item_count) in deltas.items():
+        if not total and not item_count:
+            continue
+        rows = model.objects.filter(user_id=user_id, period=period, shop_id=shop_id, tag_id=tag_id)
+        changes = {'total': F('total') + total, 'item_count': F('item_count') + item_count}
+        if not rows.update(**changes):
+            try:
+                with transaction.atomic():
+                    model.objects.create(user_id=user_id, period=period, shop_id=shop_id, tag_id=tag_id, total=total, item_count=item_count)
+            except IntegrityError:
+                # Another writer created the row first.
+                rows.update(**changes)
+        if item_count < 0:
+            emptied[model].add(user_id)
+    for model, user_ids in emptied.items():
+        model.objects.filter(user_id__in=user_ids, item_count__lte=0).delete()
+
+
+def rebuild_spend_rollups():
+    """Recompute both rollups from every order item. Returns the number of (daily, monthly) rows."""
+    with transaction.atomic():
+        for model, truncate in ROLLUPS.items():
+            model.objects.all().delete()
+            period = TruncDate('order__date') if truncate == 'day' else TruncMonth('order__date', output_field=DateField())
+            items = OrderItem.objects.annotate(period=period)
+            all_tags = items.values('order__ordered_by_id', 'period', 'price_snapshot__shop_id').annotate(
+                total=Sum(line_total(), output_field=TOTAL_FIELD), item_count=Count('id'),
+            )
+            # Joining the product's tags gives one row per item and tag; untagged items only count for all tags.
+            per_tag = items.filter(price_snapshot__product__tags__isnull=False).values(
+                'order__ordered_by_id', 'period', 'price_snapshot__shop_id', 'price_snapshot__product__tags',
+            ).annotate(total=Sum(line_total(), output_field=TOTAL_FIELD), item_count=Count('id'))
+            model.objects.bulk_create([
+                model(
+                    user_id=row['order__ordered_by_id'], period=row['period'], shop_id=row['price_snapshot__shop_id'],
+                    tag_id=row.get('price_snapshot__product__tags'), total=row['total'], item_count=row['item_count'],
+                )
+                for row in [*all_tags, *per_tag]
+            ])
+    return DailySpend.objects.count(), MonthlySpend.objects.count()
@@ -0,0 +1,50 @@
+from rest_framework import serializers
+
+
+class SpendQuerySerializer(serializers.Serializer):
+    PERIODS = ['day', 'month']
+    GROUPINGS = ['total', 'shop', 'tag']
+
+    period = serializers.ChoiceField(choices=PERIODS, default='month')
+    by = serializers.ChoiceField(choices=GROUPINGS, default='total')
+    since = serializers.DateField(required=False)
+    until = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        if 'since' in attrs and 'until' in attrs and attrs['since'] > attrs['until']:
+            raise serializers.ValidationError("since must not be after until")
+        return attrs
+
+
+class OrderSerializer(serializers.Serializer):
+    """An order row annotated by Order.objects.with_totals()."""
+    id = serializers.IntegerField()
+    date = serializers.DateTimeField()
+    item_count = serializers.IntegerField()
+    total = serializers.FloatField()
+
+
+class OrderItemSerializer(serializers.Serializer):
+    """An order item row annotated by OrderItem.objects.with_totals() and read with .values()."""
+    id = serializers.IntegerField()
+    product = serializers.IntegerField(source='price_snapshot__product_id')
+    product_name = serializers.CharField(source='price_snapshot__product__name')
+    shop = serializers.IntegerField(source='price_snapshot__shop_id', allow_null=True)
+    unit = serializers.CharField(source='price_snapshot__unit')
+    unit_price = serializers.FloatField(source='price_snapshot__unit_price')
+    quantity = serializers.FloatField()
+    total = serializers.FloatField()
+
+
+class OrderDetailSerializer(OrderSerializer):
+    items = OrderItemSerializer(many=True)
+
+
+class SpendSerializer(serializers.Serializer):
+    period = serializers.DateField()
+    # Only the grouping asked for is in each row; a shop of None stands for snapshots without one.
+    shop = serializers.IntegerField(required=False)
+    tag = serializers.IntegerField(required=False)
+    tag_name = serializers.CharField(required=False, source='tag__name')
+    total = serializers.FloatField()
+    item_count = serializers.IntegerField()
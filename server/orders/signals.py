@@ -0,0 +1,26 @@
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+from .models import OrderItem
+from .rollups import item_spend, spend_deltas, merge_deltas, apply_deltas
+
+
+@receiver(pre_save, sender=OrderItem)
+def remember_spend_before_save(sender, instance, **kwargs):
+    # What the item counted for before this save, so moving it between shops, days or tags takes it off the old rows.
+    instance._spend_before = item_spend([instance.pk]) if instance.pk else []
+
+
+@receiver(post_save, sender=OrderItem)
+def update_spend_on_save(sender, instance, **kwargs):
+    apply_deltas(merge_deltas(spend_deltas(getattr(instance, '_spend_before', []), sign=-1), spend_deltas(item_spend([instance.pk]))))
+
+
+@receiver(pre_delete, sender=OrderItem)
+def remember_spend_before_delete(sender, instance, **kwargs):
+    # Read before anything is deleted, while the item's order and snapshot still exist.
+    instance._spend_before = item_spend([instance.pk])
+
+
+@receiver(post_delete, sender=OrderItem)
+def update_spend_on_delete(sender, instance, **kwargs):
+    apply_deltas(spend_deltas(getattr(instance, '_spend_before', []), sign=-1))
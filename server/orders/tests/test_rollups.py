@@ -0,0 +1,136 @@
+from django.apps import apps
+from django.core.management import call_command
+from django.test import TestCase
+from core.models import User
+from orders.models import Order, OrderItem, DailySpend, MonthlySpend
+from orders.rollups import rebuild_spend_rollups
+from products.models import Product, Tag, PriceSnapshot
+from shops.models import Shop
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from io import StringIO
+from importlib import import_module
+
+
+class SpendRollupTestBase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='shopper')
+        self.costco = Shop.objects.create(name='Costco', address='Pearland')
+        self.heb = Shop.objects.create(name='HEB', address='Katy')
+        self.fruit, self.yellow = Tag.objects.create(name='fruit'), Tag.objects.create(name='yellow')
+        self.bananas = Product.objects.create(name='Bananas')
+        self.bananas.tags.set([self.fruit, self.yellow])
+        self.milk = Product.objects.create(name='Milk')
+
+    def order(self, day=20, month=2):
+        order = Order.objects.create(ordered_by=self.user)
+        Order.objects.filter(pk=order.pk).update(date=datetime(2025, month, day, 15, tzinfo=timezone.utc))
+        order.refresh_from_db()
+        return order
+
+    def item(self, order, product, unit_price, quantity, shop=None):
+        snapshot = PriceSnapshot.objects.create(product=product, shop=shop or self.costco, unit='lb', unit_price=unit_price, date=order.date.date())
+        return OrderItem.objects.create(order=order, price_snapshot=snapshot, quantity=quantity)
+
+    def spend(self, model=DailySpend, **filters):
+        return {
+            (row.period, row.shop_id, row.tag_id): (row.total, row.item_count)
+            for row in model.objects.filter(user=self.user, **filters)
+        }
+
+
+class SpendRollupMaintenanceTest(SpendRollupTestBase):
+    def test_new_item_counts_for_its_shop_and_every_tag_of_its_product(self):
+        self.item(self.order(), self.bananas, '0.50', '3')
+
+        self.assertEqual(self.spend(), {
+            (date(2025, 2, 20), self.costco.id, None): (Decimal('1.5'), 1),
+            (date(2025, 2, 20), self.costco.id, self.fruit.id): (Decimal('1.5'), 1),
+            (date(2025, 2, 20), self.costco.id, self.yellow.id): (Decimal('1.5'), 1),
+        })
+
+    def test_items_add_up_per_day_and_per_month(self):
+        self.item(self.order(day=20), self.milk, '3.00', '1')
+        self.item(self.order(day=20), self.milk, '2.00', '2')
+        self.item(self.order(day=21), self.milk, '1.00', '1')
+
+        self.assertEqual(self.spend(), {
+            (date(2025, 2, 20), self.costco.id, None): (Decimal('7'), 2),
+            (date(2025, 2, 21), self.costco.id, None): (Decimal('1'), 1),
+        })
+        self.assertEqual(self.spend(MonthlySpend), {(date(2025, 2, 1), self.costco.id, None): (Decimal('8'), 3)})
+
+    def test_changing_an_item_moves_its_spend(self):
+        item = self.item(self.order(), self.milk, '3.00', '1')
+        item.quantity = Decimal('2')
+        item.price_snapshot = PriceSnapshot.objects.create(product=self.milk, shop=self.heb, unit='lb', unit_price='2.50', date=date(2025, 2, 20))
+        item.save()
+
+        self.assertEqual(self.spend(), {(date(2025, 2, 20), self.heb.id, None): (Decimal('5'), 1)})
+
+    def test_deleting_items_and_orders_takes_their_spend_off(self):
+        order = self.order()
+        self.item(order, self.milk, '3.00', '1')
+        self.item(order, self.bananas, '0.50', '2').delete()
+
+        self.assertEqual(self.spend(), {(date(2025, 2, 20), self.costco.id, None): (Decimal('3'), 1)})
+
+        order.delete()
+
+        self.assertEqual(self.spend(), {})
+        self.assertEqual(self.spend(MonthlySpend), {})
+
+    def test_snapshots_without_shop_count_under_no_shop(self):
+        order = self.order()
+        snapshot = PriceSnapshot.objects.create(product=self.milk, unit='lb', unit_price='3.00', date=date(2025, 2, 20))
+        OrderItem.objects.create(order=order, price_snapshot=snapshot, quantity='1')
+        OrderItem.objects.create(order=order, price_snapshot=snapshot, quantity='2')
+
+        self.assertEqual(self.spend(), {(date(2025, 2, 20), None, None): (Decimal('9'), 2)})
+
+    def test_rebuild_matches_incremental_maintenance(self):
+        self.item(self.order(day=20), self.bananas, '0.50', '3')
+        self.item(self.order(day=21), self.milk, '3.00', '1', shop=self.heb)
+        self.item(self.order(day=3, month=3), self.bananas, '0.40', '1.5')
+        daily, monthly = self.spend(), self.spend(MonthlySpend)
+        DailySpend.objects.all().delete()
+
+        self.assertEqual(rebuild_spend_rollups(), (len(daily), len(monthly)))
+        self.assertEqual((self.spend(), self.spend(MonthlySpend)), (daily, monthly))
+
+    def test_migration_backfills_rollups_of_existing_orders(self):
+        self.item(self.order(day=20), self.bananas, '0.50', '3')
+        self.item(self.order(day=3, month=3), self.milk, '3.00', '1', shop=self.heb)
+        daily, monthly = self.spend(), self.spend(MonthlySpend)
+        DailySpend.objects.all().delete()
+        MonthlySpend.objects.update(item_count=0)
+
+        import_module('orders.migrations.0003_backfill_spend_rollups').backfill_spend_rollups(apps, None)
+
+        self.assertEqual((self.spend(), self.spend(MonthlySpend)), (daily, monthly))
+
+    def test_rebuild_spend_rollups_command_reports_counts(self):
+        self.item(self.order(), self.milk, '3.00', '1')
+        out = StringIO()
+        call_command('rebuild_spend_rollups', stdout=out)
+
+        self.assertIn('Rebuilt 1 daily and 1 monthly spend rows.', out.getvalue())
+
+
+class OrderTotalsTest(SpendRollupTestBase):
+    def test_order_totals_are_summed_in_one_query(self):
+        order = self.order()
+        self.item(order, self.bananas, '0.50', '3')
+        self.item(order, self.milk, '3.79', '2')
+        empty = self.order()
+
+        with self.assertNumQueries(1):
+            totals = {row.id: (row.item_count, row.total) for row in Order.objects.with_totals()}
+
+        self.assertEqual(totals, {order.id: (2, Decimal('9.08')), empty.id: (0, Decimal('0'))})
+
+    def test_item_totals_match_total_price(self):
+        item = self.item(self.order(), self.bananas, '0.4967', '1.5')
+        item.refresh_from_db()
+
+        self.assertEqual(OrderItem.objects.with_totals().get().total, item.total_price)
@@ -0,0 +1,73 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.models import User
+from orders.models import Order
+from .test_rollups import SpendRollupTestBase
+
+
+class OrderViewsTest(SpendRollupTestBase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_order_endpoints_require_a_signed_in_user(self):
+        self.client.force_authenticate(None)
+
+        for url in (reverse('orders'), reverse('orders-spend')):
+            self.assertIn(self.client.get(url).status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+
+    def test_list_returns_own_orders_with_totals(self):
+        order = self.order()
+        self.item(order, self.bananas, '0.50', '3')
+        self.item(order, self.milk, '3.79', '2')
+        Order.objects.create(ordered_by=User.objects.create_user(username='someone else'))
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('orders'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([(row['id'], row['item_count'], row['total']) for row in response.data['results']], [(order.id, 2, 9.08)])
+
+    def test_detail_returns_items_with_totals_in_two_queries(self):
+        order = self.order()
+        item = self.item(order, self.bananas, '0.50', '3')
+
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('order', args=[order.id]))
+
+        self.assertEqual(response.data['total'], 1.5)
+        self.assertEqual(response.data['items'], [{
+            'id': item.id, 'product': self.bananas.id, 'product_name': 'Bananas', 'shop': self.costco.id,
+            'unit': 'lb', 'unit_price': 0.5, 'quantity': 3.0, 'total': 1.5,
+        }])
+
+    def test_detail_of_another_users_order_is_not_found(self):
+        other = Order.objects.create(ordered_by=User.objects.create_user(username='someone else'))
+
+        self.assertEqual(self.client.get(reverse('order', args=[other.id])).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_spend_by_shop_and_tag_reads_the_rollups(self):
+        self.item(self.order(day=20), self.bananas, '0.50', '3')
+        self.item(self.order(day=21), self.milk, '3.00', '1', shop=self.heb)
+
+        with self.assertNumQueries(1):
+            by_shop = self.client.get(reverse('orders-spend'), {'by': 'shop'}).data
+        by_tag = self.client.get(reverse('orders-spend'), {'by': 'tag', 'period': 'day'}).data
+        total = self.client.get(reverse('orders-spend'), {'period': 'day', 'since': '2025-02-21'}).data
+
+        self.assertEqual(by_shop['results'], [
+            {'period': '2025-02-01', 'shop': self.costco.id, 'total': 1.5, 'item_count': 1},
+            {'period': '2025-02-01', 'shop': self.heb.id, 'total': 3.0, 'item_count': 1},
+        ])
+        self.assertEqual(by_tag['results'], [
+            {'period': '2025-02-20', 'tag': self.fruit.id, 'tag_name': 'fruit', 'total': 1.5, 'item_count': 1},
+            {'period': '2025-02-20', 'tag': self.yellow.id, 'tag_name': 'yellow', 'total': 1.5, 'item_count': 1},
+        ])
+        self.assertEqual(total['results'], [{'period': '2025-02-21', 'total': 3.0, 'item_count': 1}])
+
+    def test_spend_rejects_unknown_groupings(self):
+        response = self.client.get(reverse('orders-spend'), {'by': 'product'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,8 @@
+from django.urls import path
+from .views import OrderViewSet
+
+urlpatterns = [
+    path('', OrderViewSet.as_view({'get': 'list'}), name='orders'),
+    path('spend/', OrderViewSet.as_view({'get': 'spend'}), name='orders-spend'),
+    path('<int:pk>/', OrderViewSet.as_view({'get': 'retrieve'}), name='order'),
+]
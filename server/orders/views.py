@@ -0,0 +1,53 @@
+from django.db.models import Sum
+from django.shortcuts import get_object_or_404
+from rest_framework import viewsets
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from .models import Order, OrderItem, DailySpend, MonthlySpend
+from .serializers import OrderSerializer, OrderDetailSerializer, OrderItemSerializer, SpendQuerySerializer, SpendSerializer
+
+ORDER_FIELDS = ['id', 'date', 'item_count', 'total']
+ITEM_FIELDS = [
+    'id', 'price_snapshot__product_id', 'price_snapshot__product__name', 'price_snapshot__shop_id',
+    'price_snapshot__unit', 'price_snapshot__unit_price', 'quantity', 'total',
+]
+SPEND_MODELS = {'day': DailySpend, 'month': MonthlySpend}
+SPEND_GROUPS = {'total': [], 'shop': ['shop'], 'tag': ['tag', 'tag__name']}
+
+
+class OrderViewSet(viewsets.ReadOnlyModelViewSet):
+    """The signed-in user's orders. Item and order totals are computed by the database, not per item in Python."""
+    permission_classes = [IsAuthenticated]
+    serializer_class = OrderSerializer
+
+    def get_queryset(self):
+        return Order.objects.filter(ordered_by=self.request.user).with_totals()
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.get_queryset().values(*ORDER_FIELDS))
+        return self.get_paginated_response(OrderSerializer(page, many=True).data)
+
+    def retrieve(self, request, *args, **kwargs):
+        order = get_object_or_404(self.get_queryset().values(*ORDER_FIELDS), pk=kwargs['pk'])
+        order['items'] = OrderItem.objects.filter(order_id=order['id']).with_totals().order_by('id').values(*ITEM_FIELDS)
+        return Response(OrderDetailSerializer(order).data)
+
+    def spend(self, request):
+        """
+        Spending per day or month, in total, per shop or per tag, read from the DailySpend and MonthlySpend rollups.
+        An item counts towards every tag of its product, so per-tag totals can add up to more than the total.
+        """
+        params = SpendQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        query = params.validated_data
+
+        rows = SPEND_MODELS[query['period']].objects.filter(user=request.user)
+        if 'since' in query:
+            rows = rows.filter(period__gte=query['since'])
+        if 'until' in query:
+            rows = rows.filter(period__lte=query['until'])
+        rows = rows.filter(tag__isnull=query['by'] != 'tag')
+
+        group = ['period'] + SPEND_GROUPS[query['by']]
+        spend = rows.values(*group).annotate(total=Sum('total'), item_count=Sum('item_count')).order_by(*group)
+        return Response({'period': query['period'], 'by': query['by'], 'results': SpendSerializer(spend, many=True).data})
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Product, Tag, PriceSnapshot
+from .models import Product, Tag, PriceSnapshot, CurrentPrice, StoreSKU, TagCount
 
 class ProductAdmin(admin.ModelAdmin):
     list_display = ('name',)
@@ -11,6 +11,13 @@ class TagAdmin(admin.ModelAdmin):
 
 admin.site.register(Tag, TagAdmin)
 
+class TagCountAdmin(admin.ModelAdmin):
+    list_display = ('tag', 'product_count')
+    search_fields = ('tag__name',)
+    list_per_page = 10
+
+admin.site.register(TagCount, TagCountAdmin)
+
 class PriceSnapshotAdmin(admin.ModelAdmin):
     list_display = ('product', 'date', 'unit_price', 'currency', 'shop')
     list_filter = ('product', 'date', 'currency', 'shop')
@@ -18,3 +25,17 @@ class PriceSnapshotAdmin(admin.ModelAdmin):
     list_per_page = 10
 
 admin.site.register(PriceSnapshot, PriceSnapshotAdmin)
+
+class CurrentPriceAdmin(admin.ModelAdmin):
+    list_display = ('product', 'shop', 'unit', 'unit_price', 'date')
+    search_fields = ('product__name', 'shop__name')
+    list_per_page = 10
+
+admin.site.register(CurrentPrice, CurrentPriceAdmin)
+
+class StoreSKUAdmin(admin.ModelAdmin):
+    list_display = ('shop', 'store_product_id', 'product', 'date')
+    search_fields = ('store_product_id', 'product__name', 'shop__name')
+    list_per_page = 10
+
+admin.site.register(StoreSKU, StoreSKUAdmin)
@@ -0,0 +1,131 @@
+"""Synthetic CSV generator and measurement helpers for benchmarking load_products_data."""
+import csv
+import io
+import random
+import resource
+import threading
+import time
+from datetime import date, timedelta
+from django.core.management import call_command
+from django.db import connection
+from .utils import VALID_UNITS
+
+CSV_COLUMNS = [
+    'store_product_id', 'date', 'product_name', 'tags', 'unit', 'units_per_pack',
+    'packs_bought', 'sale_price', 'unit_price', 'store_name', 'store_location',
+]
+
+# Extra load_products_data options for every loader mode the benchmark knows about.
+LOADER_MODES = {
+    'rows': lambda batch_size, workers: [],
+    'batch': lambda batch_size, workers: ['--batch-size', str(batch_size)],
+    'workers': lambda batch_size, workers: ['--batch-size', str(batch_size), '--workers', str(workers)],
+    'copy': lambda batch_size, workers: ['--batch-size', str(batch_size), '--copy'],
+}
+
+
+def generate_csv(path, rows, products=1000, shops=20, tags=50, seed=0):
+    """
+    Write a CSV in the layout of the receipts sheet with the requested cardinalities.
+    Every product keeps the same tags and unit across rows, like real data does.
+    """
+    rng = random.Random(seed)
+    tag_names = [f'tag{i}' for i in range(tags)]
+    catalog = [
+        (f'Product {i:06d}', ' '.join(rng.sample(tag_names, min(len(tag_names), rng.randint(1, 3)))), rng.choice(VALID_UNITS))
+        for i in range(products)
+    ]
+    start = date(2024, 1, 1)
+
+    with open(path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(CSV_COLUMNS)
+        for _ in range(rows):
+            product_index = rng.randrange(products)
+            product_name, product_tags, unit = catalog[product_index]
+            shop_index = rng.randrange(shops)
+            day = start + timedelta(days=rng.randrange(730))
+            units_per_pack, packs_bought = rng.randint(1, 12), rng.randint(1, 3)
+            unit_price = rng.randint(10, 50000) / 1000
+            writer.writerow([
+                str(100000 + product_index),
+                f'{day.month}/{day.day}/{day.year}',
+                product_name,
+                product_tags,
+                unit,
+                units_per_pack,
+                packs_bought,
+                f'${unit_price * units_per_pack * packs_bought:.2f}',
+                f'${unit_price:.4f}',
+                f'Shop {shop_index}',
+                f'{shop_index} Main St, Springfield',
+            ])
+
+    return path
+
+
+class QueryCounter:
+    """connection.execute_wrapper hook that counts the queries run on this connection."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class PeakRSSSampler:
+    """Samples the resident set size in a background thread and keeps the highest value seen."""
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self.peak_bytes = current_rss_bytes()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self.peak_bytes = max(self.peak_bytes, current_rss_bytes())
+        return False
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak_bytes = max(self.peak_bytes, current_rss_bytes())
+
+
+def current_rss_bytes():
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        # Without /proc only the lifetime peak is available (kilobytes on Linux).
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def run_loader(mode, csv_path, rows, batch_size=1000, workers=2):
+    """
+    Run load_products_data in the given mode and measure it.
+    Queries are only counted on this process's connection, so worker processes are not included.
+    """
+    counter = QueryCounter()
+    started = time.perf_counter()
+    with PeakRSSSampler() as sampler, connection.execute_wrapper(counter):
+        call_command('load_products_data', csv_path, *LOADER_MODES[mode](batch_size, workers), stdout=io.StringIO(), stderr=io.StringIO())
+    seconds = time.perf_counter() - started
+
+    return {
+        'mode': mode,
+        'rows': rows,
+        'seconds': round(seconds, 3),
+        'rows_per_sec': round(rows / seconds, 1) if seconds else None,
+        'queries': counter.count,
+        'queries_per_row': round(counter.count / rows, 4) if rows else None,
+        'peak_rss_mb': round(sampler.peak_bytes / (1024 * 1024), 1),
+    }
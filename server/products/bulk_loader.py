@@ -0,0 +1,202 @@
+"""Batched CSV ingestion used by load_products_data."""
+from django.db import transaction
+from core.response_cache import invalidate_responses
+from shops.models import Shop
+from shops.resolver import shop_resolver, group_new_shops
+from .models import Product, Tag, ProductTag, PriceSnapshot, ImportLedger, ImportedRow
+from .import_ledger import hash_row
+from .columnar_validator import validate_rows
+from .ingest_telemetry import IngestTelemetry
+from .current_prices import update_current_prices
+from .skus import update_skus
+from .units import normalize_unit_prices
+
+DEFAULT_BATCH_SIZE = 1000
+# PriceSnapshot's unique key, which decides whether a snapshot is a duplicate.
+SNAPSHOT_KEY_FIELDS = ('product_id', 'date', 'unit', 'unit_price', 'currency', 'shop_id')
+
+
+class BulkCSVLoader:
+    """
+    Collects CSV rows into chunks, validates each chunk column by column and writes it inside one transaction
+    with a fixed number of queries, keeping name -> id caches for products, tags and shops.
+    With a ledger, rows whose content hash was already committed are skipped, and every chunk
+    records its row hashes and the last row index it covers in the same transaction.
+    Validation and writes are timed on the given telemetry.
+    """
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, ledger=None, telemetry=None):
+        self.batch_size = batch_size
+        self.ledger = ledger
+        self.telemetry = telemetry or IngestTelemetry()
+        self.seen_hashes = set(ledger.rows.values_list('row_hash', flat=True)) if ledger else set()
+        self.product_ids = {}
+        self.tag_ids = {}
+        self.shop_ids = {}
+        self.pending = []
+        self.pending_hashes = {}
+        self.last_row_index = 0
+        self.errors = []
+        self.processed_count = 0
+        self.skipped_count = 0
+
+    def add(self, row_index, row):
+        self.last_row_index = row_index
+        row_hash = hash_row(row) if self.ledger else None
+        if row_hash in self.seen_hashes:
+            self.skipped_count += 1
+            return
+
+        self.pending.append((row_index, row))
+        if row_hash:
+            self.pending_hashes[row_index] = row_hash
+            self.seen_hashes.add(row_hash)
+
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+
+        chunk, self.pending = self.pending, []
+        row_hashes, self.pending_hashes = self.pending_hashes, {}
+        with self.telemetry.stage('validate'):
+            records, errors = self.validate(chunk)
+        self.errors.extend(errors)
+        # Rejected rows are not remembered, so they are retried on the next run.
+        self.seen_hashes.difference_update(row_hashes[row_index] for row_index, _ in errors if row_index in row_hashes)
+        if errors and self.ledger:
+            self._record_rejections()
+        if not records:
+            return
+
+        try:
+            with self.telemetry.stage('write'), transaction.atomic():
+                new_ids = self.write_chunk([record for _, record in records])
+                if self.ledger:
+                    self._record_chunk([row_hashes[row_index] for row_index, _ in records])
+        except Exception as e:
+            self.errors.extend((row_index, e) for row_index, _ in records)
+            self.seen_hashes.difference_update(row_hashes.values())
+            if self.ledger:
+                self._record_rejections()
+            return
+
+        # Caches are only updated once the chunk is committed, so a rolled back chunk
+        # never leaves ids behind that point at rows that do not exist.
+        self.product_ids.update(new_ids['products'])
+        self.tag_ids.update(new_ids['tags'])
+        self.shop_ids.update(new_ids['shops'])
+        self.processed_count += len(records)
+
+    def validate(self, chunk):
+        return validate_rows(chunk)
+
+    def write_chunk(self, records):
+        product_ids = self._resolve_names(Product, self.product_ids, {r['product_name'] for r in records})
+        tag_ids = self._resolve_names(Tag, self.tag_ids, {tag for r in records for tag in r['tags'] or []})
+        shop_ids = self.resolve_shops({r['shop'] for r in records})
+
+        # Later rows replace the tags of earlier rows for the same product, like product.tags.set() does.
+        # Records without tags (None) leave the product's tags alone.
+        product_tag_ids = {product_ids[r['product_name']]: {tag_ids[tag] for tag in r['tags']} for r in records if r['tags'] is not None}
+        self._sync_product_tags(product_tag_ids)
+
+        normalized_units, normalized_prices = normalize_unit_prices([r['unit'] for r in records], [r['unit_price'] for r in records])
+        snapshots = [
+            PriceSnapshot(
+                product_id=product_ids[r['product_name']],
+                shop_id=shop_ids[r['shop']],
+                date=r['date'],
+                unit=r['unit'],
+                unit_price=r['unit_price'],
+                store_product_id=r['store_product_id'],
+                currency=r['currency'],
+                source=r['source'],
+                normalized_unit=normalized_unit,
+                normalized_unit_price=normalized_price,
+            ) for r, normalized_unit, normalized_price in zip(records, normalized_units, normalized_prices)
+        ]
+        inserted = self._new_snapshots(snapshots)
+        PriceSnapshot.objects.bulk_create(snapshots, ignore_conflicts=True)
+        # Duplicates of stored snapshots are skipped by the insert, so they must not move current prices or SKUs either.
+        update_current_prices(inserted)
+        update_skus(inserted)
+        # bulk_create sends no signals, so cached product and shop responses are dropped here.
+        invalidate_responses('products', 'shops')
+
+        return {'products': product_ids, 'tags': tag_ids, 'shops': shop_ids}
+
+    def _new_snapshots(self, snapshots):
+        """The snapshots that bulk_create(ignore_conflicts=True) will insert: not stored yet, and the first of identical ones."""
+        existing = set(
+            PriceSnapshot.objects.filter(
+                product_id__in={snapshot.product_id for snapshot in snapshots},
+                date__in={snapshot.date for snapshot in snapshots},
+            ).values_list(*SNAPSHOT_KEY_FIELDS)
+        )
+        new = []
+        for snapshot in snapshots:
+            key = tuple(PriceSnapshot._meta.get_field(field).to_python(getattr(snapshot, field)) for field in SNAPSHOT_KEY_FIELDS)
+            if key not in existing:
+                existing.add(key)
+                new.append(snapshot)
+        return new
+
+    def _record_chunk(self, row_hashes):
+        ImportedRow.objects.bulk_create([ImportedRow(ledger=self.ledger, row_hash=row_hash) for row_hash in row_hashes], ignore_conflicts=True)
+        ImportLedger.objects.filter(pk=self.ledger.pk).update(last_committed_row=self.last_row_index)
+        self.ledger.last_committed_row = self.last_row_index
+
+    def _record_rejections(self):
+        # Stored right away, so a run resuming after a crash knows rows before its starting row were rejected.
+        if not self.ledger.had_rejections:
+            ImportLedger.objects.filter(pk=self.ledger.pk).update(had_rejections=True)
+            self.ledger.had_rejections = True
+
+    def _resolve_names(self, model, cache, names):
+        ids = {name: cache[name] for name in names if name in cache}
+        # Sorted so concurrent loaders always insert shared names in the same order.
+        missing = sorted(name for name in names if name not in ids)
+        if missing:
+            model.objects.bulk_create([model(name=name) for name in missing], ignore_conflicts=True)
+            ids.update(model.objects.filter(name__in=missing).values_list('name', 'id'))
+
+        return ids
+
+    def resolve_shops(self, keys):
+        ids = {key: self.shop_ids[key] for key in keys if key in self.shop_ids}
+        missing = {key for key in keys if key not in ids}
+        if not missing:
+            return ids
+
+        # Spelling variants of existing shops resolve to them; variants among the new ones become one shop.
+        ids.update(shop_resolver.resolve(missing))
+        representatives = group_new_shops(key for key in missing if key not in ids)
+        new_shops = [Shop(name=name, address=address) for name, address in sorted(set(representatives.values()))]
+        Shop.objects.bulk_create(new_shops)
+        created = {(shop.name, shop.address): shop.pk for shop in new_shops}
+        ids.update({key: created[representative] for key, representative in representatives.items()})
+        shop_resolver.add_on_commit([(shop.pk, shop.name, shop.address) for shop in new_shops])
+
+        return ids
+
+    def _sync_product_tags(self, product_tag_ids):
+        present, stale = set(), []
+        existing = ProductTag.objects.filter(product_id__in=product_tag_ids)
+        for product_tag_id, product_id, tag_id in existing.values_list('id', 'product_id', 'tag_id'):
+            if tag_id in product_tag_ids[product_id]:
+                present.add((product_id, tag_id))
+            else:
+                stale.append(product_tag_id)
+
+        if stale:
+            ProductTag.objects.filter(id__in=stale).delete()
+
+        ProductTag.objects.bulk_create([
+            ProductTag(product_id=product_id, tag_id=tag_id)
+            for product_id, tag_ids in product_tag_ids.items()
+            for tag_id in tag_ids
+            if (product_id, tag_id) not in present
+        ])
@@ -0,0 +1,184 @@
+"""Column-wise validation of CSV rows, equivalent to running CSVRowSerializer on every row."""
+import re
+from decimal import Decimal
+import numpy as np
+from rest_framework import serializers
+from rest_framework.exceptions import ErrorDetail
+from rest_framework.settings import api_settings
+from .serializers import CSVRowSerializer
+from .utils import VALID_UNITS, format_date, convert_price_to_float, validate_unit
+
+CSV_SOURCE = 'CSV input'
+
+# Mirrors the regex strptime builds for '%m/%d/%Y', restricted to ASCII digits.
+DATE_PATTERN = re.compile(r'(1[0-2]|0[1-9]|[1-9])/(3[01]|[12][0-9]|0[1-9]|[1-9]| [1-9])/([0-9]{4})')
+PRICE_PATTERN = re.compile(r'[0-9]+(?:\.[0-9]+)?')
+# Characters CharField rejects through its null and surrogate character validators.
+UNSAFE_CHARACTERS = re.compile('[\x00\ud800-\udfff]')
+DAYS_IN_MONTH = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+_fields = CSVRowSerializer().fields
+FIELD_NAMES = list(_fields)
+REQUIRED_FIELDS = [name for name, field in _fields.items() if not field.allow_blank]
+BLANK_MESSAGE = _fields['product_name'].error_messages['blank']
+# Fields the fast path reads from every row. Currency may be absent; source is always set by the loader.
+FAST_PATH_FIELDS = [name for name in FIELD_NAMES if name not in ('currency', 'source')]
+
+
+def parse_row(row):
+    """Reference path: validate one row with CSVRowSerializer and convert it into a record."""
+    row['source'] = CSV_SOURCE
+    serializer = CSVRowSerializer(data=row)
+    serializer.is_valid(raise_exception=True)
+    data = serializer.validated_data
+
+    return {
+        'product_name': data['product_name'],
+        'tags': data['tags'].split(' '),
+        'shop': (data['store_name'], data['store_location']),
+        'date': format_date(data['date']).date(),
+        'unit': data['unit'],
+        'unit_price': convert_price_to_float(data['unit_price']),
+        'store_product_id': data['store_product_id'],
+        'currency': data.get('currency', 'USD'),
+        'source': data.get('source', 'manual input'),
+    }
+
+
+def validate_rows(indexed_rows):
+    """
+    Validate a chunk of (row_index, row) pairs column by column.
+    Returns (row_index, record) pairs for valid rows and (row_index, error) pairs for the rest,
+    in input order, with the same records and errors that parse_row gives for each row.
+    Rows the fast path cannot judge on its own (missing columns, nulls, null or surrogate
+    characters) are handed to parse_row.
+    """
+    rows = [row for _, row in indexed_rows]
+    results = [None] * len(rows)
+    fast_path = _fast_path_mask(rows)
+
+    for position in np.flatnonzero(~fast_path):
+        try:
+            results[position] = parse_row(rows[position])
+        except Exception as e:
+            results[position] = e
+
+    fast_positions = np.flatnonzero(fast_path)
+    if len(fast_positions):
+        for position, result in zip(fast_positions, _validate_columns([rows[i] for i in fast_positions])):
+            results[position] = result
+
+    records, errors = [], []
+    for (row_index, _), result in zip(indexed_rows, results):
+        if isinstance(result, Exception):
+            errors.append((row_index, result))
+        else:
+            records.append((row_index, result))
+
+    return records, errors
+
+
+def _fast_path_mask(rows):
+    mask = np.ones(len(rows), dtype=bool)
+    for name in FAST_PATH_FIELDS + ['currency']:
+        values = [row.get(name, '') if name == 'currency' else row.get(name) for row in rows]
+        mask &= np.fromiter(
+            (type(value) is str and not UNSAFE_CHARACTERS.search(value) for value in values),
+            dtype=bool, count=len(rows),
+        )
+
+    return mask
+
+
+def _validate_columns(rows):
+    """Returns a record or an exception for every row; every row must fit the fast path."""
+    for row in rows:
+        row['source'] = CSV_SOURCE
+    columns = {name: np.char.strip(np.array([row[name] for row in rows], dtype=str)) for name in FAST_PATH_FIELDS}
+
+    blank = {name: columns[name] == '' for name in REQUIRED_FIELDS}
+    field_error = np.logical_or.reduce(list(blank.values()))
+    unit_error = ~field_error & ~np.isin(columns['unit'], VALID_UNITS)
+    pending = ~field_error & ~unit_error
+    dates = _parse_dates(columns['date'], pending)
+    prices = _parse_prices(columns['unit_price'], pending)
+
+    values = {name: column.tolist() for name, column in columns.items()}
+    results = []
+    for i, row in enumerate(rows):
+        if field_error[i]:
+            results.append(serializers.ValidationError({
+                name: [ErrorDetail(BLANK_MESSAGE, code='blank')] for name in FIELD_NAMES if name in blank and blank[name][i]
+            }))
+        elif unit_error[i]:
+            results.append(_unit_error(values['unit'][i]))
+        elif isinstance(dates[i], Exception):
+            results.append(dates[i])
+        elif isinstance(prices[i], Exception):
+            results.append(prices[i])
+        else:
+            results.append({
+                'product_name': values['product_name'][i],
+                'tags': values['tags'][i].split(' '),
+                'shop': (values['store_name'][i], values['store_location'][i]),
+                'date': dates[i],
+                'unit': values['unit'][i],
+                'unit_price': prices[i],
+                'store_product_id': values['store_product_id'][i],
+                'currency': row['currency'].strip() if 'currency' in row else 'USD',
+                'source': CSV_SOURCE,
+            })
+
+    return results
+
+
+def _unit_error(unit):
+    try:
+        validate_unit(unit)
+    except ValueError as e:
+        return serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [ErrorDetail(str(e), code='invalid')]})
+
+
+def _parse_dates(column, mask):
+    """Dates for the masked rows, calendar-checked with array arithmetic; anything unusual goes through format_date."""
+    strings = column.tolist()
+    matches = [DATE_PATTERN.fullmatch(value) if selected else None for value, selected in zip(strings, mask)]
+    parts = np.array([[int(group) for group in match.groups()] if match else [1, 1, 1970] for match in matches], dtype=np.int64).reshape(-1, 3)
+    months, days, years = parts.T
+
+    leap = (years % 4 == 0) & ((years % 100 != 0) | (years % 400 == 0))
+    month_lengths = DAYS_IN_MONTH[months - 1] + (leap & (months == 2))
+    valid = np.array([match is not None for match in matches], dtype=bool) & (years >= 1) & (days <= month_lengths)
+    valid_dates = (
+        (years - 1970).astype('datetime64[Y]') + (months - 1).astype('timedelta64[M]')
+    ).astype('datetime64[D]') + (days - 1).astype('timedelta64[D]')
+    dates = np.where(valid, valid_dates, np.datetime64('1970-01-01')).astype(object)
+
+    results = [None] * len(strings)
+    for i in np.flatnonzero(mask):
+        if valid[i]:
+            results[i] = dates[i]
+        else:
+            results[i] = _call_or_exception(lambda value=strings[i]: format_date(value).date())
+
+    return results
+
+
+def _parse_prices(column, mask):
+    strings = np.char.replace(column, '$', '').tolist()
+    originals = column.tolist()
+    results = [None] * len(strings)
+    for i in np.flatnonzero(mask):
+        if PRICE_PATTERN.fullmatch(strings[i]):
+            results[i] = Decimal(strings[i])
+        else:
+            results[i] = _call_or_exception(lambda value=originals[i]: convert_price_to_float(value))
+
+    return results
+
+
+def _call_or_exception(function):
+    try:
+        return function()
+    except Exception as e:
+        return e
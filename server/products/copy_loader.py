@@ -0,0 +1,201 @@
+"""PostgreSQL COPY fast path for load_products_data."""
+import csv
+import tempfile
+import uuid
+from django.db import connection, transaction
+from core.response_cache import invalidate_responses
+from shops.models import Shop
+from shops.resolver import shop_resolver
+from .bulk_loader import BulkCSVLoader, DEFAULT_BATCH_SIZE
+from .columnar_validator import validate_rows
+from .ingest_telemetry import IngestTelemetry
+from .models import Product, Tag, ProductTag, PriceSnapshot, CurrentPrice, StoreSKU
+from .units import normalize_unit_prices
+
+STAGING_COLUMNS = [
+    'row_index', 'product_name', 'tags', 'store_name', 'store_location',
+    'date', 'unit', 'unit_price', 'store_product_id', 'currency', 'source',
+    'normalized_unit', 'normalized_unit_price',
+]
+NULLABLE_STAGING_COLUMNS = ['normalized_unit', 'normalized_unit_price']
+
+CREATE_STAGING_SQL = """
+CREATE UNLOGGED TABLE {staging} (
+    row_index integer NOT NULL,
+    product_name varchar(255) NOT NULL,
+    tags text NOT NULL,
+    store_name varchar(255) NOT NULL,
+    store_location varchar(255) NOT NULL,
+    date date NOT NULL,
+    unit varchar(255) NOT NULL,
+    unit_price numeric(10, 4) NOT NULL,
+    store_product_id varchar(255) NOT NULL,
+    currency varchar(3) NOT NULL,
+    source varchar(255) NOT NULL,
+    normalized_unit varchar(2),
+    normalized_unit_price numeric(16, 4)
+)
+"""
+
+UPSERT_SQL = [
+    """
+    INSERT INTO {product} (name)
+    SELECT DISTINCT product_name FROM {staging}
+    ON CONFLICT DO NOTHING
+    """,
+    """
+    INSERT INTO {tag} (name)
+    SELECT DISTINCT unnest(string_to_array(tags, ' ')) FROM {staging}
+    ON CONFLICT DO NOTHING
+    """,
+    # Shops have no unique constraint, so only the (name, address) pairs that are missing get inserted.
+    """
+    INSERT INTO {shop} (name, address, url, created_at, updated_at)
+    SELECT DISTINCT s.store_name, s.store_location, '', now(), now()
+    FROM {staging} s
+    WHERE NOT EXISTS (SELECT 1 FROM {shop} sh WHERE sh.name = s.store_name AND sh.address = s.store_location)
+    """,
+    # The last row of every product decides its tags, like product.tags.set() on the per-row path.
+    """
+    CREATE TEMPORARY TABLE {staging}_tags AS
+    SELECT p.id AS product_id, t.id AS tag_id
+    FROM (
+        SELECT DISTINCT ON (product_name) product_name, tags
+        FROM {staging} ORDER BY product_name, row_index DESC
+    ) latest
+    JOIN {product} p ON p.name = latest.product_name
+    JOIN {tag} t ON t.name = ANY(string_to_array(latest.tags, ' '))
+    """,
+    """
+    DELETE FROM {product_tag} pt
+    WHERE pt.product_id IN (SELECT p.id FROM {product} p JOIN {staging} s ON s.product_name = p.name)
+    AND NOT EXISTS (SELECT 1 FROM {staging}_tags w WHERE w.product_id = pt.product_id AND w.tag_id = pt.tag_id)
+    """,
+    """
+    INSERT INTO {product_tag} (product_id, tag_id)
+    SELECT product_id, tag_id FROM {staging}_tags
+    ON CONFLICT DO NOTHING
+    """,
+    # Snapshots go in first and only the ones actually inserted move current prices and SKUs, so reloading
+    # a duplicate changes neither. The rules are those of products.current_prices and products.skus: a newer
+    # date wins, and on the same date the later snapshot.
+    """
+    WITH inserted AS (
+        INSERT INTO {snapshot} (product_id, store_product_id, date, unit, unit_price, currency, source, shop_id, normalized_unit, normalized_unit_price)
+        SELECT p.id, s.store_product_id, s.date, s.unit, s.unit_price, s.currency, s.source, sh.id, s.normalized_unit, s.normalized_unit_price
+        FROM {staging} s
+        JOIN {product} p ON p.name = s.product_name
+        JOIN (
+            SELECT DISTINCT ON (name, address) id, name, address
+            FROM {shop} ORDER BY name, address, id
+        ) sh ON sh.name = s.store_name AND sh.address = s.store_location
+        ORDER BY s.row_index
+        ON CONFLICT DO NOTHING
+        RETURNING id, product_id, shop_id, unit, unit_price, currency, date, store_product_id
+    ), current_prices AS (
+        INSERT INTO {current_price} (product_id, shop_id, unit, unit_price, currency, date, updated_at)
+        SELECT DISTINCT ON (product_id, shop_id, unit) product_id, shop_id, unit, unit_price, currency, date, now()
+        FROM inserted
+        ORDER BY product_id, shop_id, unit, date DESC, id DESC
+        ON CONFLICT (product_id, shop_id, unit) DO UPDATE
+        SET unit_price = EXCLUDED.unit_price, currency = EXCLUDED.currency, date = EXCLUDED.date, updated_at = EXCLUDED.updated_at
+        WHERE EXCLUDED.date >= {current_price}.date
+    )
+    INSERT INTO {store_sku} (shop_id, store_product_id, product_id, date, updated_at)
+    SELECT DISTINCT ON (shop_id, store_product_id) shop_id, store_product_id, product_id, date, now()
+    FROM inserted
+    WHERE store_product_id <> ''
+    ORDER BY shop_id, store_product_id, date DESC, id DESC
+    ON CONFLICT (shop_id, store_product_id) DO UPDATE
+    SET product_id = EXCLUDED.product_id, date = EXCLUDED.date, updated_at = EXCLUDED.updated_at
+    WHERE EXCLUDED.date >= {store_sku}.date
+    """,
+]
+
+
+def load_csv_with_copy(file_path, batch_size=DEFAULT_BATCH_SIZE, telemetry=None):
+    """
+    Validate every row, stream the valid ones into an unlogged staging table with COPY and
+    move them into the real tables with set-based INSERT ... ON CONFLICT DO NOTHING statements.
+    Databases other than PostgreSQL fall back to the batched ORM loader.
+    Returns the number of loaded rows and the sorted list of skipped rows.
+    """
+    telemetry = telemetry or IngestTelemetry()
+    if connection.vendor != 'postgresql':
+        return _load_csv_with_bulk_loader(file_path, batch_size, telemetry)
+
+    errors = []
+    staged_count = 0
+    with tempfile.TemporaryFile('w+', newline='') as staged, open(file_path, 'r') as file:
+        writer = csv.writer(staged, quoting=csv.QUOTE_ALL)
+        chunk = []
+        for row_index, row in enumerate(telemetry.read_rows(csv.DictReader(file)), start=2):
+            chunk.append((row_index, row))
+            if len(chunk) >= batch_size:
+                staged_count += _stage_chunk(writer, chunk, errors, telemetry)
+                chunk = []
+        staged_count += _stage_chunk(writer, chunk, errors, telemetry)
+
+        staged.seek(0)
+        with telemetry.stage('write'):
+            _copy_into_tables(staged)
+
+    return staged_count, errors
+
+
+def _load_csv_with_bulk_loader(file_path, batch_size, telemetry):
+    loader = BulkCSVLoader(batch_size=batch_size, telemetry=telemetry)
+    with open(file_path, 'r') as file:
+        for row_index, row in enumerate(telemetry.read_rows(csv.DictReader(file)), start=2):
+            loader.add(row_index, row)
+    loader.flush()
+
+    return loader.processed_count, sorted(loader.errors, key=lambda item: item[0])
+
+
+def _stage_chunk(writer, chunk, errors, telemetry):
+    with telemetry.stage('validate'):
+        records, chunk_errors = validate_rows(chunk)
+    errors.extend(chunk_errors)
+    normalized_units, normalized_prices = normalize_unit_prices(
+        [record['unit'] for _, record in records], [record['unit_price'] for _, record in records],
+    )
+    # Shops are staged under the name and address of the shop they resolve to, which the SQL then matches exactly.
+    shops = shop_resolver.canonical({record['shop'] for _, record in records})
+    writer.writerows(
+        _staging_row(row_index, record, shops[record['shop']], normalized_unit, normalized_price)
+        for (row_index, record), normalized_unit, normalized_price in zip(records, normalized_units, normalized_prices)
+    )
+    return len(records)
+
+
+def _staging_row(row_index, record, shop, normalized_unit, normalized_price):
+    name, address = shop
+    return [
+        row_index, record['product_name'], ' '.join(record['tags']), name, address,
+        record['date'].isoformat(), record['unit'], record['unit_price'],
+        record['store_product_id'], record['currency'], record['source'],
+        normalized_unit, normalized_price,
+    ]
+
+
+def _copy_into_tables(staged):
+    tables = {
+        'staging': f'products_import_staging_{uuid.uuid4().hex}',
+        'product': Product._meta.db_table,
+        'tag': Tag._meta.db_table,
+        'product_tag': ProductTag._meta.db_table,
+        'snapshot': PriceSnapshot._meta.db_table,
+        'shop': Shop._meta.db_table,
+        'current_price': CurrentPrice._meta.db_table,
+        'store_sku': StoreSKU._meta.db_table,
+    }
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(CREATE_STAGING_SQL.format(**tables))
+        cursor.copy_expert(f'COPY {tables["staging"]} ({", ".join(STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv, FORCE_NULL ({", ".join(NULLABLE_STAGING_COLUMNS)}))', staged)
+        for statement in UPSERT_SQL:
+            cursor.execute(statement.format(**tables))
+        cursor.execute('DROP TABLE {staging}_tags, {staging}'.format(**tables))
+        invalidate_responses('products', 'shops')
+
@@ -1,9 +1,17 @@
 """Utilities for handling CSV file operations."""
+import hashlib
+import json
 import os
-import subprocess
+from datetime import datetime, timezone
+import requests
 from django.conf import settings
 from django.core.management.base import CommandError
 
+GOOGLE_SHEET_ID = '1swHtHTNIqwcZaIplDUuNRqmMMllI_GyelsN0RsB-FEo'
+DEFAULT_CSV_URL = f'https://docs.google.com/spreadsheets/d/{GOOGLE_SHEET_ID}/export?format=csv&gid=0'
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+DOWNLOAD_TIMEOUT = 30
+
 
 def get_default_csv_path():
     """Get the path to the default CSV file."""
@@ -11,31 +19,103 @@ def get_default_csv_path():
     return os.path.join(base_dir, 'data', 'receipts_data.csv')
 
 
-def download_default_csv():
-    """Download the default CSV from Google Sheets."""
-    base_dir = str(settings.BASE_DIR)
-    script_path = os.path.join(base_dir, 'download_default_csv.sh')
-    
-    if not os.path.exists(script_path):
-        raise CommandError(f'Download script not found at {script_path}')
-    
-    result = subprocess.run(['bash', script_path], capture_output=True, text=True, cwd=base_dir)
-    if result.returncode != 0:
-        raise CommandError(f'Failed to download default CSV: {result.stderr}')
-    
+def get_cache_metadata_path(csv_path):
+    """Path of the JSON file that remembers how the cached CSV was downloaded."""
+    return f'{csv_path}.meta.json'
+
+
+def get_pending_metadata_path(csv_path):
+    """Path of the metadata of a download that has not been imported yet, see record_download."""
+    return f'{csv_path}.meta.json.pending'
+
+
+def download_default_csv(url=DEFAULT_CSV_URL, force=False):
+    """
+    Download the default CSV from Google Sheets, streaming it to disk in chunks.
+    When a cached copy exists, the request is conditional on its ETag and Last-Modified,
+    so an unchanged sheet costs a 304 and no body. Unless forced, a 200 whose body hashes
+    the same as the cached copy also counts as unchanged.
+    Returns the CSV path and whether its content changed since the last download.
+    The metadata of a new download is only kept as pending: until record_download is called
+    after a successful import, later downloads do not treat the sheet as unchanged.
+    """
     csv_path = get_default_csv_path()
+    metadata_path = get_cache_metadata_path(csv_path)
+    metadata = {} if force else _read_cache_metadata(metadata_path, csv_path, url)
+
+    headers = {}
+    if metadata.get('etag'):
+        headers['If-None-Match'] = metadata['etag']
+    if metadata.get('last_modified'):
+        headers['If-Modified-Since'] = metadata['last_modified']
+
+    os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+    partial_path = f'{csv_path}.part'
+    try:
+        with requests.get(url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+            if response.status_code == 304:
+                return csv_path, False
+            response.raise_for_status()
+
+            digest = hashlib.sha1()
+            size = 0
+            with open(partial_path, 'wb') as file:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    file.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+            response_headers = response.headers
+    except requests.RequestException as e:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise CommandError(f'Failed to download default CSV: {e}')
+
+    # The cached copy is only replaced once the whole body has arrived.
+    os.replace(partial_path, csv_path)
+    sha1 = digest.hexdigest()
+    _write_cache_metadata(get_pending_metadata_path(csv_path), {
+        'url': url,
+        'etag': response_headers.get('ETag'),
+        'last_modified': response_headers.get('Last-Modified'),
+        'sha1': sha1,
+        'size': size,
+        'downloaded_at': datetime.now(timezone.utc).isoformat(),
+    })
+
+    return csv_path, metadata.get('sha1') != sha1
+
+
+def record_download(csv_path):
+    """Keep the metadata of the last download of csv_path once its rows have been imported."""
+    pending_path = get_pending_metadata_path(csv_path)
+    if os.path.exists(pending_path):
+        os.replace(pending_path, get_cache_metadata_path(csv_path))
+
+
+def _read_cache_metadata(metadata_path, csv_path, url):
+    """Metadata of the cached CSV, or nothing when the cache is missing or belongs to another URL."""
     if not os.path.exists(csv_path):
-        raise CommandError(f'Downloaded CSV not found at {csv_path}')
-    
-    return csv_path
+        return {}
+
+    try:
+        with open(metadata_path) as file:
+            metadata = json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+    return metadata if metadata.get('url') == url else {}
+
+
+def _write_cache_metadata(metadata_path, metadata):
+    with open(metadata_path, 'w') as file:
+        json.dump(metadata, file, indent=2)
 
 
 def resolve_csv_path(csv_path=None):
     if csv_path is None:
-        return download_default_csv()
-    
+        return download_default_csv()[0]
+
     if not os.path.exists(csv_path):
         raise CommandError(f'CSV file not found: {csv_path}')
-    
-    return csv_path
 
+    return csv_path
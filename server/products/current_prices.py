@@ -0,0 +1,95 @@
+"""
+Maintenance of CurrentPrice, the latest snapshot price of every product at every shop per unit.
+Inserts only ever move a current price forward in time, so snapshots can be applied in any order
+and a chunk of them costs one statement per UPSERT_BATCH_SIZE keys.
+"""
+from django.db import connection, transaction
+from django.utils import timezone
+from .models import CurrentPrice, PriceSnapshot
+
+UPSERT_BATCH_SIZE = 1000
+
+UPSERT_SQL = """
+INSERT INTO {table} (product_id, shop_id, unit, unit_price, currency, date, updated_at)
+VALUES {values}
+ON CONFLICT (product_id, shop_id, unit) DO UPDATE
+SET unit_price = excluded.unit_price, currency = excluded.currency, date = excluded.date, updated_at = excluded.updated_at
+WHERE excluded.date >= {table}.date
+"""
+
+REBUILD_SQL = """
+INSERT INTO {table} (product_id, shop_id, unit, unit_price, currency, date, updated_at)
+SELECT product_id, shop_id, unit, unit_price, currency, date, %s FROM (
+    SELECT product_id, shop_id, unit, unit_price, currency, date,
+           ROW_NUMBER() OVER (PARTITION BY product_id, shop_id, unit ORDER BY date DESC, id DESC) AS position
+    FROM {snapshot_table}
+    WHERE shop_id IS NOT NULL
+) latest
+WHERE position = 1
+"""
+
+_date_field = PriceSnapshot._meta.get_field('date')
+_price_field = PriceSnapshot._meta.get_field('unit_price')
+
+
+def latest_prices(snapshots):
+    """
+    The latest of the given snapshots per (product, shop, unit) as (key, unit_price, currency, date).
+    Later snapshots win ties on date. Snapshots without a shop have no current price.
+    """
+    latest = {}
+    for snapshot in snapshots:
+        if snapshot.shop_id is None:
+            continue
+        key = (snapshot.product_id, snapshot.shop_id, snapshot.unit)
+        date = _date_field.to_python(snapshot.date)
+        if key not in latest or date >= latest[key][3]:
+            latest[key] = (key, _price_field.to_python(snapshot.unit_price), snapshot.currency, date)
+
+    return list(latest.values())
+
+
+def update_current_prices(snapshots):
+    """Move the current prices forward to the given newly inserted snapshots where they are newer."""
+    rows = latest_prices(snapshots)
+    table = connection.ops.quote_name(CurrentPrice._meta.db_table)
+    updated_at = connection.ops.adapt_datetimefield_value(timezone.now())
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+            batch = rows[start:start + UPSERT_BATCH_SIZE]
+            values = ', '.join(['(%s, %s, %s, %s, %s, %s, %s)'] * len(batch))
+            params = []
+            for (product_id, shop_id, unit), unit_price, currency, date in batch:
+                params.extend([
+                    product_id, shop_id, unit,
+                    connection.ops.adapt_decimalfield_value(unit_price, _price_field.max_digits, _price_field.decimal_places),
+                    currency, connection.ops.adapt_datefield_value(date), updated_at,
+                ])
+            cursor.execute(UPSERT_SQL.format(table=table, values=values), params)
+
+
+def refresh_current_prices(keys):
+    """Recompute the given (product_id, shop_id, unit) keys from history, after snapshots were changed or deleted."""
+    for product_id, shop_id, unit in keys:
+        if shop_id is None:
+            continue
+        latest = PriceSnapshot.objects.filter(product_id=product_id, shop_id=shop_id, unit=unit).order_by('-date', '-id').first()
+        if latest is None:
+            CurrentPrice.objects.filter(product_id=product_id, shop_id=shop_id, unit=unit).delete()
+        else:
+            CurrentPrice.objects.update_or_create(
+                product_id=product_id, shop_id=shop_id, unit=unit,
+                defaults={'unit_price': latest.unit_price, 'currency': latest.currency, 'date': latest.date},
+            )
+
+
+def rebuild_current_prices():
+    """Recompute the whole table from PriceSnapshot history. Returns the number of current prices."""
+    with transaction.atomic():
+        CurrentPrice.objects.all().delete()
+        with connection.cursor() as cursor:
+            cursor.execute(REBUILD_SQL.format(
+                table=connection.ops.quote_name(CurrentPrice._meta.db_table),
+                snapshot_table=connection.ops.quote_name(PriceSnapshot._meta.db_table),
+            ), [connection.ops.adapt_datetimefield_value(timezone.now())])
+    return CurrentPrice.objects.count()
@@ -0,0 +1,95 @@
+"""
+Tag facets: how many products carry each tag, over the whole catalog or over the products a list request matches.
+
+Catalog-wide counts are read from TagCount, which the triggers of migration 0009 keep in step with ProductTag.
+Counts over filtered results come from an in-memory index of every (product, tag) pair: the matching product
+ids are set in a bitmap over the product id range and every pair is looked up in it, so the intersection of the
+matches with each tag's products costs one vectorized pass instead of a GROUP BY per request. The index is
+rebuilt whenever the 'products' response cache version moves, which every product and tag write bumps.
+"""
+import threading
+import numpy as np
+from django.db import connection
+from django.db.models import Count
+from rest_framework import filters
+from rest_framework.exceptions import ValidationError
+from core.response_cache import cache_version
+from .models import Tag, ProductTag, TagCount
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+# Databases whose migration installed the TagCount triggers; others count with GROUP BY.
+MAINTAINED_VENDORS = ('postgresql', 'sqlite')
+TAG_PARAM = 'tag'
+
+
+class TagIndex:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self.version = None
+        self.tag_ids = np.empty(0, dtype=np.int64)
+        self.tag_names = []
+        self.pair_products = np.empty(0, dtype=np.int64)
+        self.pair_tags = np.empty(0, dtype=np.int64)
+
+    def refresh(self):
+        """Reload the pairs if products or tags were written since they were read."""
+        version = cache_version('products')
+        with self.lock:
+            if version == self.version:
+                return
+            pairs = np.array(list(ProductTag.objects.values_list('product_id', 'tag_id')), dtype=np.int64).reshape(-1, 2)
+            self.tag_ids, self.pair_tags = np.unique(pairs[:, 1], return_inverse=True)
+            names = dict(Tag.objects.filter(id__in=self.tag_ids.tolist()).values_list('id', 'name'))
+            self.tag_names = [names[tag_id] for tag_id in self.tag_ids.tolist()]
+            self.pair_products = pairs[:, 0]
+            self.version = version
+
+    def counts(self, product_ids):
+        """[(tag_id, tag_name, count)] of the tags carried by any of product_ids."""
+        self.refresh()
+        product_ids = np.fromiter(product_ids, dtype=np.int64)
+        with self.lock:
+            if not len(product_ids) or not len(self.pair_products):
+                return []
+            bitmap = np.zeros(max(product_ids.max(), self.pair_products.max()) + 1, dtype=bool)
+            bitmap[product_ids] = True
+            counts = np.bincount(self.pair_tags[bitmap[self.pair_products]], minlength=len(self.tag_ids))
+            return [(int(self.tag_ids[i]), self.tag_names[i], int(counts[i])) for i in np.flatnonzero(counts)]
+
+
+def tag_facets(product_ids=None, limit=DEFAULT_LIMIT):
+    """
+    [{'id', 'name', 'count'}] of the limit tags with the most products, among product_ids when given
+    or else the whole catalog, most products first and then by name.
+    """
+    if product_ids is not None:
+        counts = sorted(tag_index.counts(product_ids), key=lambda tag: (-tag[2], tag[1]))[:limit]
+    elif connection.vendor in MAINTAINED_VENDORS:
+        counts = TagCount.objects.filter(product_count__gt=0).order_by('-product_count', 'tag__name').values_list('tag_id', 'tag__name', 'product_count')[:limit]
+    else:
+        counts = Tag.objects.annotate(count=Count('producttag')).filter(count__gt=0).order_by('-count', 'name').values_list('id', 'name', 'count')[:limit]
+    return [{'id': tag_id, 'name': name, 'count': count} for tag_id, name, count in counts]
+
+
+def selected_tags(request):
+    """Tag ids of the repeatable ?tag= parameter."""
+    values = request.query_params.getlist(TAG_PARAM)
+    if not all(value.isdigit() for value in values):
+        raise ValidationError({TAG_PARAM: ['Tags are given by id.']})
+    return sorted({int(value) for value in values})
+
+
+class ProductTagFilter(filters.BaseFilterBackend):
+    """?tag=1&tag=2 keeps the products carrying every one of the given tags."""
+
+    def filter_queryset(self, request, queryset, view):
+        for tag_id in selected_tags(request):
+            queryset = queryset.filter(id__in=ProductTag.objects.filter(tag_id=tag_id).values('product_id'))
+        return queryset
+
+
+tag_index = TagIndex()
@@ -0,0 +1,56 @@
+"""Bookkeeping for incremental CSV imports."""
+import hashlib
+import os
+from .models import ImportLedger
+
+
+def hash_row(row):
+    """Content hash of a raw CSV row, taken before the row is touched by validation."""
+    return hashlib.sha1('\x1f'.join(str(value) for value in row.values()).encode()).hexdigest()
+
+
+def hash_file(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def open_ledger(file_path):
+    """
+    Fetch the ledger for a CSV file and work out where the import should start.
+    Returns the ledger and the row index to resume after. The ledger is None when the file
+    is byte for byte the one that was last imported in full, so there is nothing to do.
+    """
+    file_hash = hash_file(file_path)
+    ledger, _ = ImportLedger.objects.get_or_create(source=os.path.abspath(file_path))
+    if ledger.file_hash == file_hash and ledger.completed:
+        return None, 0
+
+    # An interrupted run of the same file picks up after its last committed chunk, and remembers what it rejected.
+    resume = ledger.file_hash == file_hash
+    resume_after = ledger.last_committed_row if resume else 0
+    ledger.file_hash = file_hash
+    ledger.last_committed_row = resume_after
+    ledger.had_rejections = ledger.had_rejections and resume
+    ledger.completed = False
+    ledger.save()
+
+    return ledger, resume_after
+
+
+def close_ledger(ledger, rejected_count=0):
+    """
+    Mark the import of the file as done. When this run, or an interrupted run it resumed, rejected rows
+    the ledger stays open from the first row instead, so the next run of the same file retries them
+    and skips the committed rows by hash.
+    """
+    if rejected_count or ledger.had_rejections:
+        ledger.completed = False
+        ledger.last_committed_row = 0
+    else:
+        ledger.completed = True
+    # The next run starts from the first row, where it meets every rejected row again.
+    ledger.had_rejections = False
+    ledger.save(update_fields=['completed', 'last_committed_row', 'had_rejections', 'updated_at'])
@@ -0,0 +1,122 @@
+"""Progress reporting, stage timers and the run summary of load_products_data."""
+import csv
+import json
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from django.db import connection
+from rest_framework.exceptions import ValidationError
+from shops.models import Shop
+from .models import Product, PriceSnapshot, Tag
+
+STAGES = ('parse', 'validate', 'write')
+DEFAULT_PROGRESS_INTERVAL = 5.0
+ERROR_FILE_COLUMNS = ['row', 'error']
+SUMMARY_TABLES = {'products': Product, 'price_snapshots': PriceSnapshot, 'shops': Shop, 'tags': Tag}
+
+
+def count_csv_rows(file_path):
+    """
+    Cheap row estimate for the ETA: newlines minus the header, counted on raw bytes.
+    Quoted values with line breaks make it an overestimate, which only makes the ETA pessimistic.
+    """
+    with open(file_path, 'rb') as file:
+        lines = sum(block.count(b'\n') for block in iter(lambda: file.read(1 << 20), b''))
+    return max(lines - 1, 0)
+
+
+def describe_error(error):
+    """Machine-readable reason for a rejected row; validation errors keep their per-field structure."""
+    if isinstance(error, ValidationError):
+        return json.dumps(error.detail)
+    return str(error)
+
+
+def table_counts():
+    """Record counts of the loaded tables in a single query."""
+    quote = connection.ops.quote_name
+    subqueries = [f'(SELECT COUNT(*) FROM {quote(model._meta.db_table)})' for model in SUMMARY_TABLES.values()]
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT {", ".join(subqueries)}')
+        return dict(zip(SUMMARY_TABLES, cursor.fetchone()))
+
+
+class IngestTelemetry:
+    """
+    Tracks one load: rows read, time spent per stage, and rejected rows.
+    Progress lines go to `write` at most once per `interval` seconds, rejected rows go to
+    `error_file` as CSV when one is given and to `write_error` otherwise.
+    Without any writers it only counts, which is what the loaders get by default.
+    """
+
+    def __init__(self, write=None, write_error=None, error_file=None, total_rows=None,
+                 interval=DEFAULT_PROGRESS_INTERVAL, clock=time.monotonic):
+        self.write = write
+        self.write_error = write_error
+        self.error_writer = None
+        if error_file is not None:
+            self.error_writer = csv.writer(error_file)
+            self.error_writer.writerow(ERROR_FILE_COLUMNS)
+        self.total_rows = total_rows
+        self.interval = interval
+        self.clock = clock
+        self.started = clock()
+        self.next_report = self.started + interval
+        self.stage_seconds = dict.fromkeys(STAGES, 0.0)
+        self.rows_read = 0
+        self.rows_rejected = 0
+
+    @contextmanager
+    def stage(self, name):
+        started = self.clock()
+        try:
+            yield
+        finally:
+            self.stage_seconds[name] += self.clock() - started
+
+    def read_rows(self, rows):
+        """Yield rows from a reader, charging the time spent reading them to the parse stage."""
+        iterator = iter(rows)
+        while True:
+            with self.stage('parse'):
+                row = next(iterator, None)
+            if row is None:
+                return
+
+            self.rows_read += 1
+            if self.write and self.interval > 0 and self.clock() >= self.next_report:
+                self.report_progress()
+            yield row
+
+    def report_progress(self):
+        now = self.clock()
+        elapsed = now - self.started
+        rate = self.rows_read / elapsed if elapsed > 0 else 0.0
+        if self.total_rows:
+            percent = min(self.rows_read / self.total_rows, 1) * 100
+            remaining = max(self.total_rows - self.rows_read, 0)
+            eta = str(timedelta(seconds=round(remaining / rate))) if rate else 'unknown'
+            self.write(f'{self.rows_read}/{self.total_rows} rows read ({percent:.1f}%), {rate:.0f} rows/s, ETA {eta}')
+        else:
+            self.write(f'{self.rows_read} rows read, {rate:.0f} rows/s')
+        self.next_report = now + self.interval
+
+    def reject(self, row_index, error):
+        self.rows_rejected += 1
+        if self.error_writer:
+            self.error_writer.writerow([row_index, describe_error(error)])
+        elif self.write_error:
+            self.write_error(f'Skipped row {row_index}: {error}')
+
+    def summary(self, rows_loaded, rows_skipped=0):
+        elapsed = self.clock() - self.started
+        return {
+            'rows_read': self.rows_read,
+            'rows_loaded': rows_loaded,
+            'rows_rejected': self.rows_rejected,
+            'rows_skipped': rows_skipped,
+            'seconds': round(elapsed, 3),
+            'rows_per_sec': round(self.rows_read / elapsed, 1) if elapsed > 0 else None,
+            'stage_seconds': {name: round(seconds, 3) for name, seconds in self.stage_seconds.items()},
+            'totals': table_counts(),
+        }
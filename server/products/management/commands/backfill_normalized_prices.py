@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from products.units import DEFAULT_BACKFILL_BATCH_SIZE, backfill_normalized_unit_prices
+
+
+class Command(BaseCommand):
+    help = 'Store the price per kg, litre or each of price snapshots that do not have one yet.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BACKFILL_BATCH_SIZE, help='Snapshots updated per transaction.')
+        parser.add_argument('--all', action='store_true', help='Recompute every snapshot, not only the missing ones.')
+
+    def handle(self, *args, **options):
+        count = backfill_normalized_unit_prices(
+            batch_size=options.get('batch_size', DEFAULT_BACKFILL_BATCH_SIZE), recompute=options.get('all', False),
+        )
+        self.stdout.write(f'Normalized {count} price snapshots.')
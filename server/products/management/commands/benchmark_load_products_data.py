@@ -0,0 +1,76 @@
+import json
+import os
+import tempfile
+from django.core.management.base import BaseCommand
+from django.core.management.color import no_style
+from django.db import connection
+from orders.models import Order, OrderItem, DailySpend, MonthlySpend
+from products.benchmark import LOADER_MODES, generate_csv, run_loader
+from products.models import PriceSnapshot, CurrentPrice, StoreSKU, ProductTag, TagCount, Product, Tag, ImportLedger, ImportedRow
+from products.search import SEARCH_TABLE
+from shops.models import Shop
+
+# Everything the loaders write, directly or through signals and triggers.
+BENCHMARK_MODELS = (
+    PriceSnapshot, CurrentPrice, StoreSKU, ProductTag, TagCount, Product, Tag, Shop, ImportLedger, ImportedRow,
+    Order, OrderItem, DailySpend, MonthlySpend,
+)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark load_products_data on synthetic CSVs. Runs against a throwaway test database, never the real one.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10000], help='Row counts to generate, e.g. 10000 100000 1000000.')
+        parser.add_argument('--modes', nargs='+', choices=list(LOADER_MODES), default=['batch', 'copy'], help='Loader modes to measure.')
+        parser.add_argument('--products', type=int, default=1000, help='Number of distinct products.')
+        parser.add_argument('--shops', type=int, default=20, help='Number of distinct shops.')
+        parser.add_argument('--tags', type=int, default=50, help='Number of distinct tags.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--json', action='store_true', help='Print results as one JSON document.')
+
+    def handle(self, *args, **options):
+        old_name = self._setup_database()
+        try:
+            results = self._run(options)
+        finally:
+            self._teardown_database(old_name)
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+        else:
+            for result in results:
+                self.stdout.write(
+                    f"{result['mode']:>8} {result['rows']:>9} rows  {result['rows_per_sec']:>10} rows/s  "
+                    f"{result['queries_per_row']:>8} queries/row  {result['peak_rss_mb']:>8} MB peak RSS"
+                )
+
+    def _run(self, options):
+        results = []
+        with tempfile.TemporaryDirectory() as output_dir:
+            for size in options['sizes']:
+                csv_path = generate_csv(
+                    os.path.join(output_dir, f'benchmark_{size}.csv'), size,
+                    products=options['products'], shops=options['shops'], tags=options['tags'], seed=options['seed'],
+                )
+                for mode in options['modes']:
+                    self._reset_tables()
+                    results.append(run_loader(mode, csv_path, size, batch_size=options['batch_size'], workers=options['workers']))
+
+        return results
+
+    def _reset_tables(self):
+        """Every run starts from empty tables so modes are measured on equal terms."""
+        # A flush skips the per-row signals and triggers, so the trigger-maintained search index is listed too.
+        tables = [model._meta.db_table for model in BENCHMARK_MODELS] + [SEARCH_TABLE]
+        connection.ops.execute_sql_flush(connection.ops.sql_flush(no_style(), tables, reset_sequences=True, allow_cascade=True))
+
+    def _setup_database(self):
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        return old_name
+
+    def _teardown_database(self, old_name):
+        connection.creation.destroy_test_db(old_name, verbosity=0)
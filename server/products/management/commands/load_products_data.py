@@ -1,12 +1,23 @@
 import csv
-from django.core.management.base import BaseCommand
-from products.csv_utils import resolve_csv_path
+import json
+from contextlib import nullcontext
+from django.core.management.base import BaseCommand, CommandError
+from products.csv_utils import resolve_csv_path, download_default_csv, record_download
+from products.bulk_loader import BulkCSVLoader, DEFAULT_BATCH_SIZE
+from products.parallel_loader import load_csv_in_parallel
+from products.import_ledger import open_ledger, close_ledger
+from products.copy_loader import load_csv_with_copy
+from products.ingest_telemetry import IngestTelemetry, DEFAULT_PROGRESS_INTERVAL, count_csv_rows
 from products.serializers import CSVRowSerializer
 
 
 class Command(BaseCommand):
     help = 'Load products data from a CSV file. If no path is provided, downloads the default CSV from Google Sheets.'
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.telemetry = IngestTelemetry()
+
     def add_arguments(self, parser):
         parser.add_argument(
             'csv_file',
@@ -15,40 +26,144 @@ class Command(BaseCommand):
             default=None,
             help='Path to local CSV file. If not provided, downloads default CSV from Google Sheets.'
         )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Write rows in chunks of this size with bulk inserts instead of one row at a time.'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Split the CSV by product name and load the parts in this many processes. Implies batched loading.'
+        )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Skip rows already imported from this file and resume an interrupted import. Implies batched loading.'
+        )
+        parser.add_argument(
+            '--copy',
+            action='store_true',
+            help='On PostgreSQL, stage rows with COPY and upsert them with set-based SQL. Falls back to batched loading elsewhere.'
+        )
+        parser.add_argument(
+            '--error-file',
+            type=str,
+            default=None,
+            help='Write rejected rows and their reasons to this CSV file instead of stderr.'
+        )
+        parser.add_argument(
+            '--progress-interval',
+            type=float,
+            default=DEFAULT_PROGRESS_INTERVAL,
+            help='Seconds between progress lines on stderr. 0 turns progress reporting off.'
+        )
+        parser.add_argument(
+            '--force-download',
+            action='store_true',
+            help='Download and import the default CSV even if it has not changed since the last download.'
+        )
 
     def handle(self, *args, **options):
         csv_path = options['csv_file']
-        
+        batch_size = options.get('batch_size')
+        workers = options.get('workers')
+        if sum(bool(mode) for mode in (workers, options.get('incremental'), options.get('copy'))) > 1:
+            raise CommandError('Only one of --workers, --incremental and --copy can be used at a time.')
+
+        if csv_path is None:
+            self.stderr.write('Downloading default CSV...')
+            file_path, changed = download_default_csv(force=options.get('force_download', False))
+            if not changed:
+                self.stderr.write('Default CSV has not changed since the last download, nothing to load.')
+                return
+        else:
+            file_path = resolve_csv_path(csv_path)
+
+        interval = options.get('progress_interval', DEFAULT_PROGRESS_INTERVAL)
+        error_file_path = options.get('error_file')
+        rows_skipped = 0
+        with open(error_file_path, 'w', newline='') if error_file_path else nullcontext() as error_file:
+            self.telemetry = IngestTelemetry(
+                write=self.stderr.write,
+                write_error=self.stderr.write,
+                error_file=error_file,
+                total_rows=count_csv_rows(file_path) if interval > 0 else None,
+                interval=interval,
+            )
+            if options.get('incremental'):
+                rows_loaded, rows_skipped = self._load_csv_incrementally(file_path, batch_size or DEFAULT_BATCH_SIZE)
+            elif options.get('copy'):
+                rows_loaded = self._report_rejected_rows(
+                    *load_csv_with_copy(file_path, batch_size or DEFAULT_BATCH_SIZE, telemetry=self.telemetry)
+                )
+            elif workers:
+                rows_loaded = self._report_rejected_rows(
+                    *load_csv_in_parallel(file_path, workers, batch_size or DEFAULT_BATCH_SIZE, telemetry=self.telemetry)
+                )
+            elif batch_size:
+                rows_loaded = self._load_csv_in_batches(file_path, batch_size).processed_count
+            else:
+                rows_loaded = self._load_csv(file_path)
         if csv_path is None:
-            self.stdout.write('Downloading default CSV...')
-        
-        file_path = resolve_csv_path(csv_path)
-        self._load_csv(file_path)
-        self._print_summary()
+            # Only now can an unchanged sheet be skipped, a failed import is downloaded and retried next time.
+            record_download(file_path)
+        self._print_summary(rows_loaded, rows_skipped)
 
     def _load_csv(self, file_path):
         """Load and process CSV file."""
+        rows_loaded = 0
         with open(file_path, 'r') as file:
             reader = csv.DictReader(file)
-            for row_index, row_data in enumerate(reader, start=2):
+            for row_index, row_data in enumerate(self.telemetry.read_rows(reader), start=2):
                 try:
                     self.process_row(row_data)
-                    self.stdout.write(f'Processed row {row_index}.')
+                    rows_loaded += 1
                 except Exception as e:
-                    self.stderr.write(f'Skipped row {row_index}: {e}')
+                    self.telemetry.reject(row_index, e)
+        return rows_loaded
+
+    def _load_csv_in_batches(self, file_path, batch_size, ledger=None, resume_after=0):
+        """Load the CSV file in chunks through the bulk loader."""
+        loader = BulkCSVLoader(batch_size=batch_size, ledger=ledger, telemetry=self.telemetry)
+        with open(file_path, 'r') as file:
+            reader = csv.DictReader(file)
+            for row_index, row_data in enumerate(self.telemetry.read_rows(reader), start=2):
+                if row_index > resume_after:
+                    loader.add(row_index, row_data)
+        loader.flush()
+        self._report_rejected_rows(loader.processed_count, sorted(loader.errors, key=lambda item: item[0]))
+        return loader
+
+    def _load_csv_incrementally(self, file_path, batch_size):
+        """Load only the rows that changed since the last import of this file. Returns loaded and unchanged row counts."""
+        ledger, resume_after = open_ledger(file_path)
+        if ledger is None:
+            self.stderr.write('CSV is unchanged since the last import, nothing to load.')
+            return 0, 0
+
+        if resume_after:
+            self.stderr.write(f'Resuming import after row {resume_after}.')
+        loader = self._load_csv_in_batches(file_path, batch_size, ledger=ledger, resume_after=resume_after)
+        close_ledger(ledger, len(loader.errors))
+        return loader.processed_count, loader.skipped_count
+
+    def _report_rejected_rows(self, processed_count, errors):
+        for row_index, error in errors:
+            self.telemetry.reject(row_index, error)
+        return processed_count
 
     def process_row(self, row):
         """Process a single CSV row."""
         row['source'] = 'CSV input'
         serializer = CSVRowSerializer(data=row)
-        serializer.is_valid(raise_exception=True)
-        serializer.save()
-
-    def _print_summary(self):
-        """Print summary of loaded data."""
-        self.stdout.write('Done! Here are the counts of the records in the db:')
-        from products.models import Product, PriceSnapshot, Shop, Tag
-        self.stdout.write(f'Products: {Product.objects.count()}')
-        self.stdout.write(f'PriceSnapshots: {PriceSnapshot.objects.count()}')
-        self.stdout.write(f'Shops: {Shop.objects.count()}')
-        self.stdout.write(f'Tags: {Tag.objects.count()}')
+        with self.telemetry.stage('validate'):
+            serializer.is_valid(raise_exception=True)
+        with self.telemetry.stage('write'):
+            serializer.save()
+
+    def _print_summary(self, rows_loaded, rows_skipped=0):
+        """Print the run summary as one JSON document."""
+        self.stdout.write(json.dumps(self.telemetry.summary(rows_loaded, rows_skipped)))
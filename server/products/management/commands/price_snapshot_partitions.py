@@ -0,0 +1,38 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from products.partitions import (
+    PartitioningError, partition_price_snapshots, create_partitions, detach_partitions, list_partitions,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Manage monthly date partitions of the price snapshot table on PostgreSQL: convert the table, '
+        'create partitions ahead of time and detach old ones. Run with --create regularly, e.g. from cron. '
+        '--partition changes the schema outside of migrations, see products.partitions before migrating a converted database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--partition', action='store_true', help='Convert the existing table into a partitioned one.')
+        parser.add_argument('--create', action='store_true', help='Create the missing partitions up to --months-ahead.')
+        parser.add_argument('--months-ahead', type=int, default=3, help='Months after the current one to have partitions for.')
+        parser.add_argument('--detach-before', type=date.fromisoformat, help='Detach partitions ending on or before this date (YYYY-MM-DD).')
+
+    def handle(self, *args, **options):
+        months_ahead = options.get('months_ahead', 3)
+        try:
+            if options.get('partition'):
+                partition_price_snapshots(months_ahead=months_ahead)
+                self.stdout.write('Partitioned price snapshots by month.')
+            if options.get('create'):
+                created = create_partitions(months_ahead=months_ahead)
+                self.stdout.write(f'Created {len(created)} partitions: {", ".join(created)}' if created else 'No partitions to create.')
+            if options.get('detach_before'):
+                detached = detach_partitions(options['detach_before'])
+                self.stdout.write(f'Detached {len(detached)} partitions: {", ".join(detached)}' if detached else 'No partitions to detach.')
+            partitions = list_partitions()
+        except PartitioningError as e:
+            raise CommandError(str(e))
+
+        for name, from_date, to_date in partitions:
+            self.stdout.write(f'{name}: {from_date} to {to_date}')
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from products.current_prices import rebuild_current_prices
+
+
+class Command(BaseCommand):
+    help = 'Recompute the current price of every product at every shop from the price snapshot history.'
+
+    def handle(self, *args, **options):
+        count = rebuild_current_prices()
+        self.stdout.write(f'Rebuilt {count} current prices.')
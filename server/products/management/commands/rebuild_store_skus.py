@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from products.skus import rebuild_skus
+
+
+class Command(BaseCommand):
+    help = 'Recompute the product every shop SKU stands for from the price snapshot history.'
+
+    def handle(self, *args, **options):
+        count = rebuild_skus()
+        self.stdout.write(f'Rebuilt {count} store SKUs.')
@@ -0,0 +1,170 @@
+"""
+Matching of free-text receipt items such as "Beef Ground (90/10)" to existing products.
+
+Item names and product names lose case and punctuation before they are compared. Every product is filed
+in memory under the character trigrams of its name and tags, so a batch of items only scores the
+CANDIDATES_PER_ITEM products sharing the most trigrams with each item, in one rapidfuzz process.cdist
+call spread over all cores. Each item gets its best matches scoring at least PRODUCT_MATCH_MIN_SCORE,
+and the results are cached per normalized item name until the index next changes.
+
+The index lives for the life of the process, so a Celery worker keeps it warm from one receipt to the next.
+Products have no updated_at, so a refresh compares the size and highest id of the product and product tag
+tables with what it has seen: new rows are read on their own, anything else reloads the index.
+A renamed product is therefore only picked up by the next reload.
+"""
+import re
+import threading
+from collections import OrderedDict
+import numpy as np
+from django.conf import settings
+from django.db.models import Count, Max
+from rapidfuzz import fuzz, process
+from .models import Product, ProductTag
+
+GRAM_LENGTH = 3
+CANDIDATES_PER_ITEM = 200
+CACHE_SIZE = 10000
+
+PUNCTUATION = re.compile(r'[^\w\s]')
+
+
+def normalize_item(name):
+    return ' '.join(PUNCTUATION.sub(' ', (name or '').casefold()).split())
+
+
+def item_grams(normalized):
+    """Trigrams of each word padded with spaces, so short words and word boundaries count too."""
+    return {
+        padded[i:i + GRAM_LENGTH]
+        for word in normalized.split()
+        for padded in [f' {word} ']
+        for i in range(len(padded) - GRAM_LENGTH + 1)
+    }
+
+
+class ProductMatcher:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self.ids = []
+        self.names = []
+        self.match_names = []
+        self.positions = {}
+        self.grams = {}
+        self.link_count = 0
+        self.cache = OrderedDict()
+        self.signature = None
+
+    def refresh(self):
+        """Bring the index up to date with the product and product tag tables."""
+        with self.lock:
+            signature = self._table_signature()
+            if signature == self.signature:
+                return
+            product_count, last_product_id, link_count, last_link_id = signature
+            # Rows are read up to the ids counted, so rows added meanwhile are left for the next refresh.
+            products = Product.objects.filter(id__lte=last_product_id or 0).order_by('id').values_list('id', 'name')
+            links = ProductTag.objects.filter(id__lte=last_link_id or 0).values_list('product_id', 'tag__name')
+            if self.signature is not None:
+                _, seen_product_id, _, seen_link_id = self.signature
+                self._apply(products.filter(id__gt=seen_product_id or 0))
+                self._apply_tags(links.filter(id__gt=seen_link_id or 0))
+            if self.signature is None or (len(self.ids), self.link_count) != (product_count, link_count):
+                self.clear()
+                self._apply(products)
+                self._apply_tags(links)
+            self.signature = signature
+            self.cache.clear()
+
+    def match(self, items, limit=None, min_score=None, refresh=True):
+        """
+        [[(product_id, product_name, score)]] for each item name, best first, at most limit of them
+        and only those scoring at least min_score (0-100). Equal scores go to the oldest product.
+        """
+        limit = settings.PRODUCT_MATCH_LIMIT if limit is None else limit
+        min_score = settings.PRODUCT_MATCH_MIN_SCORE if min_score is None else min_score
+        if refresh:
+            self.refresh()
+        queries = [normalize_item(item) for item in items]
+        with self.lock:
+            results = {}
+            for query in set(queries):
+                if (query, limit, min_score) in self.cache:
+                    self.cache.move_to_end((query, limit, min_score))
+                    results[query] = self.cache[(query, limit, min_score)]
+            pending = [query for query in dict.fromkeys(queries) if query not in results]
+            if pending:
+                for query, matches in zip(pending, self._score(pending, limit, min_score)):
+                    results[query] = self.cache[(query, limit, min_score)] = matches
+                while len(self.cache) > CACHE_SIZE:
+                    self.cache.popitem(last=False)
+        return [list(results[query]) for query in queries]
+
+    def _score(self, queries, limit, min_score):
+        candidates = sorted(set().union(*(self._candidates(query) for query in queries)))
+        if not candidates or limit <= 0:
+            return [[] for _ in queries]
+
+        # Positions follow product ids, so a stable sort on score alone leaves the oldest product first among equals.
+        scores = process.cdist(queries, [self.match_names[position] for position in candidates], scorer=fuzz.WRatio, workers=-1)
+        order = np.argsort(-scores, axis=1, kind='stable')[:, :limit]
+        return [
+            [
+                (self.ids[candidates[column]], self.names[candidates[column]], round(float(row[column]), 2))
+                for column in columns
+                if row[column] >= min_score
+            ]
+            for row, columns in zip(scores, order)
+        ]
+
+    def _candidates(self, query):
+        """Positions of the products sharing the most trigrams with query."""
+        postings = [self.grams[gram] for gram in item_grams(query) if gram in self.grams]
+        if not postings:
+            return set()
+        positions, hits = np.unique(np.fromiter((p for posting in postings for p in posting), dtype=np.int64), return_counts=True)
+        if len(positions) > CANDIDATES_PER_ITEM:
+            positions = positions[np.argsort(-hits, kind='stable')[:CANDIDATES_PER_ITEM]]
+        return set(positions.tolist())
+
+    def _table_signature(self):
+        products = Product.objects.aggregate(count=Count('id'), last_id=Max('id'))
+        links = ProductTag.objects.aggregate(count=Count('id'), last_id=Max('id'))
+        return products['count'], products['last_id'], links['count'], links['last_id']
+
+    def _file(self, position, text):
+        for gram in item_grams(text):
+            self.grams.setdefault(gram, set()).add(position)
+
+    def _apply(self, products):
+        for product_id, name in products:
+            position = self.positions[product_id] = len(self.ids)
+            self.ids.append(product_id)
+            self.names.append(name)
+            self.match_names.append(normalize_item(name))
+            self._file(position, self.match_names[position])
+
+    def _apply_tags(self, links):
+        for product_id, tag_name in links:
+            self.link_count += 1
+            position = self.positions.get(product_id)
+            if position is not None:
+                self._file(position, normalize_item(tag_name))
+
+
+def match_receipt_items(receipt_data, limit=None):
+    """[{'item': name, 'matches': [{'product_id', 'name', 'score'}]}] for the items of a parsed receipt."""
+    # The LLM may answer with a number or another non-string value for a name, which is matched as its text.
+    items = [str(item.get('item') or '') for item in receipt_data.get('items') or [] if isinstance(item, dict)]
+    return [
+        {
+            'item': item,
+            'matches': [{'product_id': product_id, 'name': name, 'score': score} for product_id, name, score in matches],
+        }
+        for item, matches in zip(items, product_matcher.match(items, limit=limit))
+    ]
+
+
+product_matcher = ProductMatcher()
@@ -0,0 +1,218 @@
+from django.db import migrations
+
+# products_product_search holds one row per product with its name and tag names, kept in sync by
+# triggers so every write path (ORM, bulk_create, COPY upserts) updates it without extra code.
+
+POSTGRESQL_TRIGRAM = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX products_product_search_text_trgm ON products_product_search USING gin (search_text gin_trgm_ops)',
+]
+
+POSTGRESQL_FORWARD = [
+    """
+    CREATE TABLE products_product_search (
+        product_id bigint PRIMARY KEY,
+        search_text text NOT NULL,
+        document tsvector NOT NULL
+    )
+    """,
+    'CREATE INDEX products_product_search_document ON products_product_search USING gin (document)',
+    """
+    CREATE FUNCTION products_product_search_refresh(product_ids bigint[]) RETURNS void AS $$
+        INSERT INTO products_product_search (product_id, search_text, document)
+        SELECT p.id,
+               p.name || ' ' || coalesce(string_agg(t.name, ' ' ORDER BY t.name), ''),
+               setweight(to_tsvector('simple', p.name), 'A')
+                   || setweight(to_tsvector('simple', coalesce(string_agg(t.name, ' '), '')), 'B')
+        FROM products_product p
+        LEFT JOIN products_producttag pt ON pt.product_id = p.id
+        LEFT JOIN products_tag t ON t.id = pt.tag_id
+        WHERE p.id = ANY(product_ids)
+        GROUP BY p.id, p.name
+        ON CONFLICT (product_id) DO UPDATE SET search_text = EXCLUDED.search_text, document = EXCLUDED.document
+    $$ LANGUAGE sql
+    """,
+    # Statement-level triggers with transition tables, so a bulk insert refreshes its products in one statement.
+    """
+    CREATE FUNCTION products_product_search_on_product() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            DELETE FROM products_product_search WHERE product_id IN (SELECT id FROM old_rows);
+        ELSE
+            PERFORM products_product_search_refresh(ARRAY(SELECT id FROM new_rows));
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE FUNCTION products_product_search_on_product_tag() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            PERFORM products_product_search_refresh(ARRAY(SELECT DISTINCT product_id FROM new_rows));
+        ELSIF TG_OP = 'DELETE' THEN
+            PERFORM products_product_search_refresh(ARRAY(SELECT DISTINCT product_id FROM old_rows));
+        ELSE
+            PERFORM products_product_search_refresh(ARRAY(
+                SELECT product_id FROM old_rows UNION SELECT product_id FROM new_rows
+            ));
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE FUNCTION products_product_search_on_tag() RETURNS trigger AS $$
+    BEGIN
+        PERFORM products_product_search_refresh(ARRAY(
+            SELECT DISTINCT pt.product_id FROM products_producttag pt WHERE pt.tag_id IN (SELECT id FROM new_rows)
+        ));
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER products_product_search_product_insert AFTER INSERT ON products_product
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION products_product_search_on_product()
+    """,
+    """
+    CREATE TRIGGER products_product_search_product_update AFTER UPDATE ON products_product
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION products_product_search_on_product()
+    """,
+    """
+    CREATE TRIGGER products_product_search_product_delete AFTER DELETE ON products_product
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION products_product_search_on_product()
+    """,
+    """
+    CREATE TRIGGER products_product_search_product_tag_insert AFTER INSERT ON products_producttag
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION products_product_search_on_product_tag()
+    """,
+    """
+    CREATE TRIGGER products_product_search_product_tag_update AFTER UPDATE ON products_producttag
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION products_product_search_on_product_tag()
+    """,
+    """
+    CREATE TRIGGER products_product_search_product_tag_delete AFTER DELETE ON products_producttag
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION products_product_search_on_product_tag()
+    """,
+    """
+    CREATE TRIGGER products_product_search_tag_update AFTER UPDATE ON products_tag
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION products_product_search_on_tag()
+    """,
+    'SELECT products_product_search_refresh(ARRAY(SELECT id FROM products_product))',
+]
+
+POSTGRESQL_BACKWARD = [
+    'DROP TRIGGER products_product_search_tag_update ON products_tag',
+    'DROP TRIGGER products_product_search_product_tag_delete ON products_producttag',
+    'DROP TRIGGER products_product_search_product_tag_update ON products_producttag',
+    'DROP TRIGGER products_product_search_product_tag_insert ON products_producttag',
+    'DROP TRIGGER products_product_search_product_delete ON products_product',
+    'DROP TRIGGER products_product_search_product_update ON products_product',
+    'DROP TRIGGER products_product_search_product_insert ON products_product',
+    'DROP FUNCTION products_product_search_on_tag()',
+    'DROP FUNCTION products_product_search_on_product_tag()',
+    'DROP FUNCTION products_product_search_on_product()',
+    'DROP FUNCTION products_product_search_refresh(bigint[])',
+    'DROP TABLE products_product_search',
+]
+
+SQLITE_TAG_NAMES = """
+    (SELECT coalesce(group_concat(t.name, ' '), '') FROM products_producttag pt
+     JOIN products_tag t ON t.id = pt.tag_id WHERE pt.product_id = {product_id})
+"""
+
+# The trigram tokenizer makes MATCH and LIKE work on substrings, like the icontains lookups it replaces.
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE products_product_search USING fts5(name, tags, tokenize='trigram')",
+    """
+    CREATE TRIGGER products_product_search_product_insert AFTER INSERT ON products_product BEGIN
+        INSERT INTO products_product_search (rowid, name, tags) VALUES (new.id, new.name, {tags});
+    END
+    """.format(tags=SQLITE_TAG_NAMES.format(product_id='new.id')),
+    """
+    CREATE TRIGGER products_product_search_product_update AFTER UPDATE OF name ON products_product BEGIN
+        UPDATE products_product_search SET name = new.name WHERE rowid = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER products_product_search_product_delete AFTER DELETE ON products_product BEGIN
+        DELETE FROM products_product_search WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER products_product_search_product_tag_insert AFTER INSERT ON products_producttag BEGIN
+        UPDATE products_product_search SET tags = {tags} WHERE rowid = new.product_id;
+    END
+    """.format(tags=SQLITE_TAG_NAMES.format(product_id='new.product_id')),
+    """
+    CREATE TRIGGER products_product_search_product_tag_update AFTER UPDATE ON products_producttag BEGIN
+        UPDATE products_product_search SET tags = {old_tags} WHERE rowid = old.product_id;
+        UPDATE products_product_search SET tags = {new_tags} WHERE rowid = new.product_id;
+    END
+    """.format(
+        old_tags=SQLITE_TAG_NAMES.format(product_id='old.product_id'),
+        new_tags=SQLITE_TAG_NAMES.format(product_id='new.product_id'),
+    ),
+    """
+    CREATE TRIGGER products_product_search_product_tag_delete AFTER DELETE ON products_producttag BEGIN
+        UPDATE products_product_search SET tags = {tags} WHERE rowid = old.product_id;
+    END
+    """.format(tags=SQLITE_TAG_NAMES.format(product_id='old.product_id')),
+    """
+    CREATE TRIGGER products_product_search_tag_update AFTER UPDATE OF name ON products_tag BEGIN
+        UPDATE products_product_search SET tags = {tags}
+        WHERE rowid IN (SELECT product_id FROM products_producttag WHERE tag_id = new.id);
+    END
+    """.format(tags=SQLITE_TAG_NAMES.format(product_id='products_product_search.rowid')),
+    """
+    INSERT INTO products_product_search (rowid, name, tags)
+    SELECT p.id, p.name, {tags} FROM products_product p
+    """.format(tags=SQLITE_TAG_NAMES.format(product_id='p.id')),
+]
+
+SQLITE_BACKWARD = [
+    'DROP TRIGGER products_product_search_tag_update',
+    'DROP TRIGGER products_product_search_product_tag_delete',
+    'DROP TRIGGER products_product_search_product_tag_update',
+    'DROP TRIGGER products_product_search_product_tag_insert',
+    'DROP TRIGGER products_product_search_product_delete',
+    'DROP TRIGGER products_product_search_product_update',
+    'DROP TRIGGER products_product_search_product_insert',
+    'DROP TABLE products_product_search',
+]
+
+STATEMENTS = {
+    'postgresql': (POSTGRESQL_FORWARD, POSTGRESQL_BACKWARD),
+    'sqlite': (SQLITE_FORWARD, SQLITE_BACKWARD),
+}
+
+
+def run_statements(direction):
+    def run(apps, schema_editor):
+        # Other databases have no search index and fall back to substring matching.
+        statements = STATEMENTS.get(schema_editor.connection.vendor, ([], []))[direction]
+        for statement in statements:
+            schema_editor.execute(statement)
+        if direction == 0 and schema_editor.connection.vendor == 'postgresql' and _trigram_available(schema_editor):
+            for statement in POSTGRESQL_TRIGRAM:
+                schema_editor.execute(statement)
+    return run
+
+
+def _trigram_available(schema_editor):
+    # pg_trgm ships with the contrib package; without it searches still work, just without the trigram index.
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_import_ledger'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_statements(0), run_statements(1)),
+    ]
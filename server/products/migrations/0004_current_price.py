@@ -0,0 +1,43 @@
+# Generated by Django 4.2.23 on 2026-10-18 11:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+BACKFILL_SQL = """
+INSERT INTO products_currentprice (product_id, shop_id, unit, unit_price, currency, date)
+SELECT product_id, shop_id, unit, unit_price, currency, date FROM (
+    SELECT product_id, shop_id, unit, unit_price, currency, date,
+           ROW_NUMBER() OVER (PARTITION BY product_id, shop_id, unit ORDER BY date DESC, id DESC) AS position
+    FROM products_pricesnapshot
+    WHERE shop_id IS NOT NULL
+) latest
+WHERE position = 1
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shops', '0001_initial'),
+        ('products', '0003_product_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CurrentPrice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('unit', models.CharField(max_length=255)),
+                ('unit_price', models.DecimalField(decimal_places=4, max_digits=10)),
+                ('currency', models.CharField(default='USD', max_length=3)),
+                ('date', models.DateField()),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='current_prices', to='products.product')),
+                ('shop', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='current_prices', to='shops.shop')),
+            ],
+            options={
+                'unique_together': {('product', 'shop', 'unit')},
+            },
+        ),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.23 on 2026-10-18 11:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_current_price'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pricesnapshot',
+            index=models.Index(fields=['product', '-date'], include=('id', 'unit', 'unit_price', 'shop'), name='pricesnapshot_product_date'),
+        ),
+        migrations.AddIndex(
+            model_name='pricesnapshot',
+            index=models.Index(fields=['shop', 'date'], include=('product', 'unit', 'unit_price'), name='pricesnapshot_shop_date'),
+        ),
+    ]
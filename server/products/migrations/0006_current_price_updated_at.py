@@ -0,0 +1,18 @@
+# Generated by Django 4.2.23 on 2026-10-18 11:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0005_price_snapshot_covering_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='currentprice',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.23 on 2026-10-18 11:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_current_price_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pricesnapshot',
+            name='normalized_unit',
+            field=models.CharField(blank=True, help_text='kg, l or ea, set from unit by products.units', max_length=2, null=True),
+        ),
+        migrations.AddField(
+            model_name='pricesnapshot',
+            name='normalized_unit_price',
+            field=models.DecimalField(blank=True, decimal_places=4, help_text='unit_price per normalized_unit', max_digits=16, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='pricesnapshot',
+            index=models.Index(fields=['product', 'normalized_unit', 'normalized_unit_price'], name='pricesnapshot_normalized'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.23 on 2026-10-18 12:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+BACKFILL_SQL = """
+INSERT INTO products_storesku (shop_id, store_product_id, product_id, date, updated_at)
+SELECT shop_id, store_product_id, product_id, date, CURRENT_TIMESTAMP FROM (
+    SELECT shop_id, store_product_id, product_id, date,
+           ROW_NUMBER() OVER (PARTITION BY shop_id, store_product_id ORDER BY date DESC, id DESC) AS position
+    FROM products_pricesnapshot
+    WHERE shop_id IS NOT NULL AND store_product_id IS NOT NULL AND store_product_id <> ''
+) latest
+WHERE position = 1
+"""
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shops', '0002_shop_grid_cell'),
+        ('products', '0007_price_snapshot_normalized_unit_price'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoreSKU',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('store_product_id', models.CharField(max_length=255)),
+                ('date', models.DateField(help_text='Date of the latest snapshot carrying this SKU')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skus', to='products.product')),
+                ('shop', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skus', to='shops.shop')),
+            ],
+            options={
+                'unique_together': {('shop', 'store_product_id')},
+            },
+        ),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,105 @@
+# Generated by Django 4.2.23 on 2026-10-18 12:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# products_tagcount holds the number of products per tag, kept in sync by triggers on products_producttag
+# like products_product_search, so every write path (ORM, bulk_create, COPY upserts) updates it.
+
+BACKFILL_SQL = """
+INSERT INTO products_tagcount (tag_id, product_count)
+SELECT tag_id, count(*) FROM products_producttag GROUP BY tag_id
+"""
+
+POSTGRESQL_FORWARD = [
+    # Statement-level triggers with transition tables, so a bulk insert or delete costs one statement per trigger.
+    """
+    CREATE FUNCTION products_tagcount_on_product_tag() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('DELETE', 'UPDATE') THEN
+            UPDATE products_tagcount c SET product_count = c.product_count - removed.count
+            FROM (SELECT tag_id, count(*) AS count FROM old_rows GROUP BY tag_id) removed
+            WHERE c.tag_id = removed.tag_id;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO products_tagcount (tag_id, product_count)
+            SELECT tag_id, count(*) FROM new_rows GROUP BY tag_id
+            ON CONFLICT (tag_id) DO UPDATE SET product_count = products_tagcount.product_count + EXCLUDED.product_count;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER products_tagcount_product_tag_insert AFTER INSERT ON products_producttag
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION products_tagcount_on_product_tag()
+    """,
+    """
+    CREATE TRIGGER products_tagcount_product_tag_update AFTER UPDATE ON products_producttag
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION products_tagcount_on_product_tag()
+    """,
+    """
+    CREATE TRIGGER products_tagcount_product_tag_delete AFTER DELETE ON products_producttag
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION products_tagcount_on_product_tag()
+    """,
+    BACKFILL_SQL,
+]
+
+POSTGRESQL_BACKWARD = [
+    'DROP TRIGGER products_tagcount_product_tag_delete ON products_producttag',
+    'DROP TRIGGER products_tagcount_product_tag_update ON products_producttag',
+    'DROP TRIGGER products_tagcount_product_tag_insert ON products_producttag',
+    'DROP FUNCTION products_tagcount_on_product_tag()',
+]
+
+SQLITE_INCREMENT = """
+    INSERT INTO products_tagcount (tag_id, product_count) VALUES (new.tag_id, 1)
+    ON CONFLICT (tag_id) DO UPDATE SET product_count = product_count + 1;
+"""
+SQLITE_DECREMENT = """
+    UPDATE products_tagcount SET product_count = product_count - 1 WHERE tag_id = old.tag_id;
+"""
+
+SQLITE_FORWARD = [
+    f"CREATE TRIGGER products_tagcount_product_tag_insert AFTER INSERT ON products_producttag BEGIN {SQLITE_INCREMENT} END",
+    f"CREATE TRIGGER products_tagcount_product_tag_update AFTER UPDATE OF tag_id ON products_producttag BEGIN {SQLITE_DECREMENT} {SQLITE_INCREMENT} END",
+    f"CREATE TRIGGER products_tagcount_product_tag_delete AFTER DELETE ON products_producttag BEGIN {SQLITE_DECREMENT} END",
+    BACKFILL_SQL,
+]
+
+SQLITE_BACKWARD = [
+    'DROP TRIGGER products_tagcount_product_tag_delete',
+    'DROP TRIGGER products_tagcount_product_tag_update',
+    'DROP TRIGGER products_tagcount_product_tag_insert',
+]
+
+STATEMENTS = {
+    'postgresql': (POSTGRESQL_FORWARD, POSTGRESQL_BACKWARD),
+    'sqlite': (SQLITE_FORWARD, SQLITE_BACKWARD),
+}
+
+
+def run_statements(direction):
+    def run(apps, schema_editor):
+        # Other databases have no triggers and count tags with GROUP BY instead, see products.facets.
+        for statement in STATEMENTS.get(schema_editor.connection.vendor, ([], []))[direction]:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0008_store_sku'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TagCount',
+            fields=[
+                ('tag', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='product_count', serialize=False, to='products.tag')),
+                ('product_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(run_statements(0), run_statements(1)),
+    ]
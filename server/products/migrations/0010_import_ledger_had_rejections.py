@@ -0,0 +1,18 @@
+# Generated by Django 4.2.23 on 2026-10-18 12:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0009_tag_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importledger',
+            name='had_rejections',
+            field=models.BooleanField(default=False, help_text='Whether rows were rejected since the import last started from the first row'),
+        ),
+    ]
@@ -8,10 +8,24 @@ class Tag(models.Model):
     def __str__(self):
         return self.name
 
+class ProductQuerySet(models.QuerySet):
+    def with_tags(self):
+        """Prefetches the tags of every product in id order, the order they are listed in."""
+        return self.prefetch_related(models.Prefetch('tags', queryset=Tag.objects.order_by('id')))
+
+    def with_recent_snapshots(self, limit):
+        """Prefetches the limit most recent price snapshots of every product as recent_price_snapshots."""
+        return self.prefetch_related(models.Prefetch(
+            'pricesnapshot_set', queryset=PriceSnapshot.objects.order_by('-date', '-id')[:limit], to_attr='recent_price_snapshots',
+        ))
+
+
 class Product(models.Model):
     name = models.CharField(max_length=255, unique=True)
     tags = models.ManyToManyField(Tag, through='ProductTag', related_name='products')
 
+    objects = ProductQuerySet.as_manager()
+
     def __str__(self):
         return self.name[:50]
 
@@ -26,6 +40,15 @@ class ProductTag(models.Model):
         return f"{self.product} - TAGGED: {self.tag}"
 
 
+class TagCount(models.Model):
+    """Number of products carrying a tag, kept in sync with ProductTag by the triggers of migration 0009."""
+    tag = models.OneToOneField(Tag, on_delete=models.CASCADE, primary_key=True, related_name='product_count')
+    product_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.tag} - {self.product_count} PRODUCTS"
+
+
 class PriceSnapshot(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     store_product_id = models.CharField(max_length=255, blank=True, null=True, help_text="Optional store-specific product ID")
@@ -35,10 +58,76 @@ class PriceSnapshot(models.Model):
     currency = models.CharField(max_length=3, default="USD")
     source = models.CharField(max_length=255, default="manual input")
     shop = models.ForeignKey(Shop, on_delete=models.SET_NULL, null=True)
+    normalized_unit = models.CharField(max_length=2, blank=True, null=True, help_text="kg, l or ea, set from unit by products.units")
+    normalized_unit_price = models.DecimalField(max_digits=16, decimal_places=4, blank=True, null=True, help_text="unit_price per normalized_unit")
 
     class Meta:
         unique_together = ('product', 'date', 'unit', 'unit_price', 'currency', 'shop')
         ordering = ['-date']
+        # Covering indexes for a product's history newest first and a shop's snapshots by date.
+        # INCLUDE only applies on PostgreSQL; elsewhere they are plain two-column indexes.
+        indexes = [
+            models.Index(fields=['product', '-date'], include=['id', 'unit', 'unit_price', 'shop'], name='pricesnapshot_product_date'),
+            models.Index(fields=['shop', 'date'], include=['product', 'unit', 'unit_price'], name='pricesnapshot_shop_date'),
+            # A product's cheapest prices per kg, litre or each, read straight off the index.
+            models.Index(fields=['product', 'normalized_unit', 'normalized_unit_price'], name='pricesnapshot_normalized'),
+        ]
 
     def __str__(self):
         return f"{self.product} - FOR {self.unit_price:.2f} {self.currency} / {self.unit} - ON {self.date} {f'FROM {self.shop}' if self.shop else ''}"
+
+
+class CurrentPrice(models.Model):
+    """Latest snapshot price of a product at a shop for one unit, maintained by products.current_prices."""
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='current_prices')
+    shop = models.ForeignKey(Shop, on_delete=models.CASCADE, related_name='current_prices')
+    unit = models.CharField(max_length=255)
+    unit_price = models.DecimalField(max_digits=10, decimal_places=4)
+    currency = models.CharField(max_length=3, default="USD")
+    date = models.DateField()
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        unique_together = ('product', 'shop', 'unit')
+
+    def __str__(self):
+        return f"{self.product} - NOW {self.unit_price:.2f} {self.currency} / {self.unit} - SINCE {self.date} FROM {self.shop}"
+
+
+class StoreSKU(models.Model):
+    """Product a shop's own product id (SKU) stands for, as of its latest price snapshot, maintained by products.skus."""
+    shop = models.ForeignKey(Shop, on_delete=models.CASCADE, related_name='skus')
+    store_product_id = models.CharField(max_length=255)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='skus')
+    date = models.DateField(help_text="Date of the latest snapshot carrying this SKU")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('shop', 'store_product_id')
+
+    def __str__(self):
+        return f"{self.shop} - SKU {self.store_product_id}: {self.product}"
+
+
+class ImportLedger(models.Model):
+    source = models.CharField(max_length=1024, unique=True, help_text="Absolute path of the imported CSV file")
+    file_hash = models.CharField(max_length=64, blank=True)
+    last_committed_row = models.PositiveIntegerField(default=0)
+    completed = models.BooleanField(default=False)
+    had_rejections = models.BooleanField(default=False, help_text="Whether rows were rejected since the import last started from the first row")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"ImportLedger: {self.source} # LAST ROW: {self.last_committed_row} # {'COMPLETED' if self.completed else 'IN PROGRESS'}"
+
+
+class ImportedRow(models.Model):
+    ledger = models.ForeignKey(ImportLedger, on_delete=models.CASCADE, related_name='rows')
+    row_hash = models.CharField(max_length=40)
+
+    class Meta:
+        unique_together = ('ledger', 'row_hash')
+
+    def __str__(self):
+        return f"{self.ledger.source} - ROW: {self.row_hash}"
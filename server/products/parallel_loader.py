@@ -0,0 +1,94 @@
+"""Multi-process variant of the bulk loader, partitioned by product name."""
+import csv
+import os
+import tempfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+import django
+from django.db import connection, connections, transaction
+from .bulk_loader import BulkCSVLoader, DEFAULT_BATCH_SIZE
+from .ingest_telemetry import IngestTelemetry
+
+ROW_INDEX_FIELD = '_row_index'
+
+
+def partition_for(product_name, workers):
+    """Stable partition number for a product, so all of its rows land on the same worker."""
+    return zlib.crc32(product_name.strip().encode()) % workers
+
+
+def partition_csv(file_path, workers, output_dir, telemetry=None):
+    """
+    Split the CSV into one file per worker and collect the distinct shop keys.
+    Each partition row keeps its original row index so errors still point at the source file.
+    """
+    paths = [os.path.join(output_dir, f'partition_{i}.csv') for i in range(workers)]
+    shop_keys = set()
+    telemetry = telemetry or IngestTelemetry()
+
+    with open(file_path, 'r') as file:
+        reader = csv.DictReader(file)
+        fieldnames = [ROW_INDEX_FIELD] + list(reader.fieldnames or [])
+        outputs = [open(path, 'w', newline='') for path in paths]
+        try:
+            writers = [csv.DictWriter(output, fieldnames=fieldnames, extrasaction='ignore') for output in outputs]
+            for writer in writers:
+                writer.writeheader()
+
+            for row_index, row in enumerate(telemetry.read_rows(reader), start=2):
+                writers[partition_for(row.get('product_name') or '', workers)].writerow({ROW_INDEX_FIELD: row_index, **row})
+                store_name = (row.get('store_name') or '').strip()
+                if store_name:
+                    shop_keys.add((store_name, (row.get('store_location') or '').strip()))
+        finally:
+            for output in outputs:
+                output.close()
+
+    return paths, shop_keys
+
+
+def load_partition(partition_path, batch_size, shop_ids):
+    loader = BulkCSVLoader(batch_size=batch_size)
+    loader.shop_ids.update(shop_ids)
+    with open(partition_path, 'r') as file:
+        for row in csv.DictReader(file):
+            row_index = int(row.pop(ROW_INDEX_FIELD))
+            loader.add(row_index, row)
+    loader.flush()
+
+    # Exceptions are turned into messages because they have to travel back to the parent process.
+    return loader.processed_count, [(row_index, str(error)) for row_index, error in loader.errors]
+
+
+def load_csv_in_parallel(file_path, workers, batch_size=DEFAULT_BATCH_SIZE, telemetry=None):
+    """
+    Load the CSV with one process and one database connection per partition.
+    Products, their tags and their snapshots never cross partitions, so workers cannot
+    conflict on Product.name or the PriceSnapshot unique_together. Shops are shared and have
+    no unique constraint, so they are created up front by the parent and handed to every worker.
+    Returns the total number of loaded rows and the merged, sorted list of skipped rows.
+    Workers validate and write at the same time, so their wall time is charged to the write stage.
+    """
+    telemetry = telemetry or IngestTelemetry()
+    with tempfile.TemporaryDirectory() as output_dir:
+        paths, shop_keys = partition_csv(file_path, workers, output_dir, telemetry=telemetry)
+        with telemetry.stage('write'):
+            with transaction.atomic():
+                shop_ids = BulkCSVLoader().resolve_shops(shop_keys)
+
+            if _supports_concurrent_writers():
+                # Workers must open their own connections instead of inheriting the parent's.
+                connections.close_all()
+                with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as executor:
+                    results = list(executor.map(load_partition, paths, [batch_size] * workers, [shop_ids] * workers))
+            else:
+                results = [load_partition(path, batch_size, shop_ids) for path in paths]
+
+    processed_count = sum(count for count, _ in results)
+    errors = sorted(error for _, partition_errors in results for error in partition_errors)
+    return processed_count, errors
+
+
+def _supports_concurrent_writers():
+    # SQLite allows a single writer, so partitions run one after another in this process.
+    return connection.vendor != 'sqlite'
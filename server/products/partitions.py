@@ -0,0 +1,269 @@
+"""
+Optional monthly range partitioning of PriceSnapshot by date on PostgreSQL.
+
+partition_price_snapshots() converts the table in place, in one transaction. Partitions are named
+<table>_pYYYY_MM, and a default partition catches dates without one. PostgreSQL requires the partition
+key in every unique constraint, so the primary key becomes (id, date). Ids stay unique because they
+still come from one identity sequence, and the ORM keeps addressing rows by id alone.
+
+A foreign key into a partitioned table must also cover date, which OrderItem.price_snapshot does not.
+Each foreign key into the table is therefore replaced by a pair of deferred constraint triggers under
+the same name: one on the referencing table rejects rows pointing at a missing snapshot, one on the
+snapshot table rejects deleting a snapshot that is still referenced. Like Django's own foreign keys,
+both are checked at commit, so the ORM's cascading deletes keep working.
+
+The conversion is an out-of-band schema change: it is made by the price_snapshot_partitions command,
+not by a migration, so Django's migration state still describes an unpartitioned table with a plain id
+primary key. Migrations that alter products_pricesnapshot have to be checked against the partitioned
+table before they are applied to a database that was converted.
+"""
+import re
+from datetime import date
+from django.db import connection, transaction
+from .models import PriceSnapshot
+
+TABLE = PriceSnapshot._meta.db_table
+DEFAULT_PARTITION = f'{TABLE}_default'
+PARTITION_NAME = TABLE + '_p{year:04d}_{month:02d}'
+BOUND_PATTERN = re.compile(r"FROM \('(\d{4}-\d{2}-\d{2})'\) TO \('(\d{4}-\d{2}-\d{2})'\)")
+
+
+# Stand-ins for foreign keys into the partitioned table, see the module docstring. Arguments name the
+# referencing column, and for the check on the snapshot table also the referencing table.
+REFERENCE_FUNCTIONS = [
+    """
+    CREATE OR REPLACE FUNCTION {table}_reference_exists() RETURNS trigger AS $$
+    DECLARE
+        snapshot_id bigint := (to_jsonb(NEW) ->> TG_ARGV[0])::bigint;
+        still_referencing boolean;
+    BEGIN
+        IF snapshot_id IS NULL OR EXISTS (SELECT 1 FROM {table} WHERE id = snapshot_id) THEN
+            RETURN NULL;
+        END IF;
+        -- The check runs at commit, when the referencing row may have been deleted as well.
+        EXECUTE format('SELECT EXISTS (SELECT 1 FROM %s WHERE id = $1 AND %I = $2)', TG_RELID::regclass, TG_ARGV[0])
+            INTO still_referencing USING NEW.id, snapshot_id;
+        IF still_referencing THEN
+            RAISE EXCEPTION 'insert or update on table "%" violates foreign key constraint "%"', TG_TABLE_NAME, TG_NAME
+                USING ERRCODE = 'foreign_key_violation',
+                      DETAIL = format('Key (%s)=(%s) is not present in table "{table}".', TG_ARGV[0], snapshot_id);
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION {table}_unreferenced() RETURNS trigger AS $$
+    DECLARE
+        referenced boolean;
+    BEGIN
+        -- Moving a row to another partition deletes it from the old one.
+        IF EXISTS (SELECT 1 FROM {table} WHERE id = OLD.id) THEN
+            RETURN NULL;
+        END IF;
+        EXECUTE format('SELECT EXISTS (SELECT 1 FROM %s WHERE %I = $1)', TG_ARGV[0], TG_ARGV[1]) INTO referenced USING OLD.id;
+        IF referenced THEN
+            RAISE EXCEPTION 'update or delete on table "{table}" violates foreign key constraint "%" on table "%"', TG_NAME, TG_ARGV[0]
+                USING ERRCODE = 'foreign_key_violation',
+                      DETAIL = format('Key (id)=(%s) is still referenced from table "%s".', OLD.id, TG_ARGV[0]);
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+]
+
+
+class PartitioningError(Exception):
+    pass
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def add_months(day, months):
+    month_index = day.year * 12 + day.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def is_partitioned():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass", [TABLE])
+        return cursor.fetchone() is not None
+
+
+def list_partitions():
+    """(name, from_date, to_date) of the attached monthly partitions, oldest first. The default partition is left out."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+            FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = %s::regclass
+            """,
+            [TABLE],
+        )
+        rows = cursor.fetchall()
+
+    partitions = []
+    for name, bound in rows:
+        match = BOUND_PATTERN.search(bound)
+        if match:
+            partitions.append((name, date.fromisoformat(match.group(1)), date.fromisoformat(match.group(2))))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def partition_price_snapshots(months_ahead=3, today=None):
+    """Convert PriceSnapshot into a partitioned table with a partition per month of existing data and months_ahead more."""
+    _require_postgresql()
+    if is_partitioned():
+        raise PartitioningError(f'{TABLE} is already partitioned.')
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        # Deferred foreign key checks still pending on the table would block ALTER TABLE.
+        cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+        constraints, indexes, referencing = _table_definitions(cursor)
+        for referencing_table, constraint_name, _ in referencing:
+            cursor.execute(f'ALTER TABLE {_quote(referencing_table)} DROP CONSTRAINT {_quote(constraint_name)}')
+
+        old_table = f'{TABLE}_unpartitioned'
+        cursor.execute(f'ALTER TABLE {_quote(TABLE)} RENAME TO {_quote(old_table)}')
+        cursor.execute(
+            f'CREATE TABLE {_quote(TABLE)} (LIKE {_quote(old_table)} INCLUDING DEFAULTS INCLUDING IDENTITY) '
+            f'PARTITION BY RANGE (date)'
+        )
+        cursor.execute(f'CREATE TABLE {_quote(DEFAULT_PARTITION)} PARTITION OF {_quote(TABLE)} DEFAULT')
+
+        cursor.execute(f'SELECT min(date) FROM {_quote(old_table)}')
+        first_day = cursor.fetchone()[0] or (today or date.today())
+        _create_monthly_partitions(cursor, month_start(first_day), add_months(today or date.today(), months_ahead + 1))
+
+        cursor.execute(f'INSERT INTO {_quote(TABLE)} OVERRIDING SYSTEM VALUE SELECT * FROM {_quote(old_table)}')
+        cursor.execute(f"SELECT setval(pg_get_serial_sequence(%s, 'id'), coalesce(max(id), 0) + 1, false) FROM {_quote(TABLE)}", [TABLE])
+        cursor.execute(f'DROP TABLE {_quote(old_table)}')
+
+        cursor.execute(f'ALTER TABLE {_quote(TABLE)} ADD CONSTRAINT {_quote(TABLE + "_pkey")} PRIMARY KEY (id, date)')
+        for name, definition in constraints:
+            cursor.execute(f'ALTER TABLE {_quote(TABLE)} ADD CONSTRAINT {_quote(name)} {definition}')
+        for definition in indexes:
+            cursor.execute(definition)
+        _add_reference_triggers(cursor, referencing)
+
+    return list_partitions()
+
+
+def create_partitions(months_ahead=3, today=None):
+    """Add the missing monthly partitions up to months_ahead months after today. Returns the names of new partitions."""
+    _require_partitioned()
+    partitions = list_partitions()
+    start = partitions[-1][2] if partitions else month_start(today or date.today())
+    with transaction.atomic(), connection.cursor() as cursor:
+        return _create_monthly_partitions(cursor, start, add_months(today or date.today(), months_ahead + 1))
+
+
+def detach_partitions(before):
+    """
+    Detach the monthly partitions that end on or before the given date. Their rows stay in standalone
+    tables of the same name, out of every query on PriceSnapshot. Returns the names of detached partitions.
+    A partition holding snapshots that other rows (order items) still point at is refused, as its rows
+    would disappear from under them.
+    """
+    _require_partitioned()
+    detached = []
+    with transaction.atomic(), connection.cursor() as cursor:
+        for name, _, to_date in list_partitions():
+            if to_date <= before:
+                _require_unreferenced(cursor, name)
+                cursor.execute(f'ALTER TABLE {_quote(TABLE)} DETACH PARTITION {_quote(name)}')
+                detached.append(name)
+    return detached
+
+
+def _create_monthly_partitions(cursor, start, end):
+    # Rows already caught by the default partition are moved into the new partition before it is attached,
+    # since PostgreSQL refuses to attach a range the default partition still holds rows for.
+    created = []
+    month = start
+    while month < end:
+        name, next_month = PARTITION_NAME.format(year=month.year, month=month.month), add_months(month, 1)
+        cursor.execute(f'CREATE TABLE {_quote(name)} (LIKE {_quote(TABLE)} INCLUDING DEFAULTS)')
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM {_quote(DEFAULT_PARTITION)} WHERE date >= %s AND date < %s RETURNING *) '
+            f'INSERT INTO {_quote(name)} SELECT * FROM moved',
+            [month, next_month],
+        )
+        cursor.execute(f'ALTER TABLE {_quote(TABLE)} ATTACH PARTITION {_quote(name)} FOR VALUES FROM (%s) TO (%s)', [month, next_month])
+        created.append(name)
+        month = next_month
+    return created
+
+
+def _add_reference_triggers(cursor, referencing):
+    for statement in REFERENCE_FUNCTIONS:
+        cursor.execute(statement.format(table=TABLE))
+    for referencing_table, constraint_name, column in referencing:
+        cursor.execute(
+            f'CREATE CONSTRAINT TRIGGER {_quote(constraint_name)} AFTER INSERT OR UPDATE ON {_quote(referencing_table)} '
+            f'DEFERRABLE INITIALLY DEFERRED FOR EACH ROW EXECUTE FUNCTION {TABLE}_reference_exists(%s)',
+            [column],
+        )
+        cursor.execute(
+            f'CREATE CONSTRAINT TRIGGER {_quote(constraint_name)} AFTER DELETE OR UPDATE OF id ON {_quote(TABLE)} '
+            f'DEFERRABLE INITIALLY DEFERRED FOR EACH ROW EXECUTE FUNCTION {TABLE}_unreferenced(%s, %s)',
+            [referencing_table, column],
+        )
+
+
+def _require_unreferenced(cursor, partition):
+    for relation in PriceSnapshot._meta.related_objects:
+        referencing_table = relation.related_model._meta.db_table
+        cursor.execute(
+            f'SELECT EXISTS (SELECT 1 FROM {_quote(referencing_table)} r JOIN {_quote(partition)} p ON p.id = r.{_quote(relation.field.column)})'
+        )
+        if cursor.fetchone()[0]:
+            raise PartitioningError(f'{partition} holds snapshots still referenced from {referencing_table}, it cannot be detached.')
+
+
+def _table_definitions(cursor):
+    """Constraints other than the primary key, indexes not backing a constraint, and foreign keys pointing at the table."""
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = %s::regclass AND contype <> 'p' ORDER BY conname",
+        [TABLE],
+    )
+    constraints = cursor.fetchall()
+    cursor.execute(
+        """
+        SELECT pg_get_indexdef(indexrelid) FROM pg_index
+        WHERE indrelid = %s::regclass
+          AND NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conindid = indexrelid)
+        ORDER BY indexrelid
+        """,
+        [TABLE],
+    )
+    indexes = [definition for definition, in cursor.fetchall()]
+    cursor.execute(
+        """
+        SELECT conrelid::regclass::text, conname, attname
+        FROM pg_constraint JOIN pg_attribute ON attrelid = conrelid AND attnum = conkey[1]
+        WHERE confrelid = %s::regclass AND contype = 'f'
+        """,
+        [TABLE],
+    )
+    referencing = cursor.fetchall()
+    return constraints, indexes, referencing
+
+
+def _require_postgresql():
+    if connection.vendor != 'postgresql':
+        raise PartitioningError('Partitioning PriceSnapshot is only supported on PostgreSQL.')
+
+
+def _require_partitioned():
+    _require_postgresql()
+    if not is_partitioned():
+        raise PartitioningError(f'{TABLE} is not partitioned, run with --partition first.')
+
+
+def _quote(name):
+    return connection.ops.quote_name(name)
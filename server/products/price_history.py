@@ -0,0 +1,36 @@
+"""Price history downsampled into day, week or month buckets by the database."""
+from django.db.models import Avg, Count, DateField, F, Max, Min, Window
+from django.db.models.functions import FirstValue, RowNumber, TruncDay, TruncMonth, TruncWeek
+
+BUCKETS = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+
+def bucket_prices(snapshots, bucket='day'):
+    """
+    One row per bucket and unit with the min, avg, max and last price of the given snapshots in it.
+    Prices of different units are never mixed. Each aggregate is a window over the bucket, and only
+    the bucket's latest snapshot is kept, so the database returns one row per bucket however long the history.
+    """
+    def window(expression, **kwargs):
+        return Window(expression, partition_by=[BUCKETS[bucket]('date', output_field=DateField()), F('unit')], **kwargs)
+
+    latest_first = [F('date').desc(), F('id').desc()]
+    return (
+        snapshots
+        .annotate(
+            bucket_start=BUCKETS[bucket]('date', output_field=DateField()),
+            min_price=window(Min('unit_price')),
+            avg_price=window(Avg('unit_price')),
+            max_price=window(Max('unit_price')),
+            last_price=window(FirstValue('unit_price'), order_by=latest_first),
+            snapshot_count=window(Count('id')),
+            position=window(RowNumber(), order_by=latest_first),
+        )
+        .filter(position=1)
+        .order_by('bucket_start', 'unit')
+        .values('bucket_start', 'unit', 'min_price', 'avg_price', 'max_price', 'last_price', 'snapshot_count')
+    )
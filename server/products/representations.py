@@ -0,0 +1,48 @@
+"""
+Plain-dict builders for the hot product read endpoints, producing the same JSON as ProductListSerializer
+and ProductDetailSerializer from .values() rows, without instantiating models or serializer fields.
+Prices become floats here, which is what the JSON renderer turns the serializers' Decimals into, so the
+rendered bytes are identical and the encoder never falls back to its Python default() hook.
+"""
+from .models import Tag, PriceSnapshot
+
+PRODUCT_FIELDS = ['id', 'name']
+SNAPSHOT_FIELDS = ['id', 'product_id', 'shop_id', 'date', 'unit', 'unit_price', 'currency', 'source', 'normalized_unit', 'normalized_unit_price']
+
+
+def tags_by_product(product_ids):
+    """{product_id: [tag dicts]} in one query, each product's tags in id order."""
+    tags = {product_id: [] for product_id in product_ids}
+    rows = Tag.objects.filter(producttag__product_id__in=product_ids).order_by('id').values_list('producttag__product_id', 'id', 'name')
+    for product_id, tag_id, name in rows:
+        tags[product_id].append({'id': tag_id, 'name': name})
+    return tags
+
+
+def product_dicts(rows):
+    """List representations of product rows that have at least PRODUCT_FIELDS."""
+    tags = tags_by_product([row['id'] for row in rows])
+    return [{'id': row['id'], 'name': row['name'], 'tags': tags[row['id']]} for row in rows]
+
+
+def snapshot_dict(row):
+    return {
+        'id': row['id'],
+        'product': row['product_id'],
+        'shop': row['shop_id'],
+        'date': row['date'].isoformat(),
+        'unit': row['unit'],
+        'unit_price': float(row['unit_price']),
+        'currency': row['currency'],
+        'source': row['source'],
+        'normalized_unit': row['normalized_unit'],
+        'normalized_unit_price': float(row['normalized_unit_price']) if row['normalized_unit_price'] is not None else None,
+    }
+
+
+def product_detail_dict(row, snapshot_limit):
+    """Detail representation of a product row with its snapshot_limit most recent snapshots."""
+    data = product_dicts([row])[0]
+    snapshots = PriceSnapshot.objects.filter(product_id=row['id']).order_by('-date', '-id').values(*SNAPSHOT_FIELDS)
+    data['price_snapshots'] = [snapshot_dict(snapshot) for snapshot in snapshots[:snapshot_limit]]
+    return data
@@ -0,0 +1,131 @@
+"""Ranked product search over the products_product_search index maintained by migration 0003."""
+from functools import lru_cache
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, FloatField, Q, Value, When
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+from rest_framework import filters
+
+SEARCH_TABLE = 'products_product_search'
+RANK_FIELD = 'search_rank'
+# Shortest term the SQLite trigram tokenizer can MATCH; shorter terms are matched with LIKE.
+TRIGRAM_LENGTH = 3
+
+
+def escape_like(term):
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def substring_rank(terms):
+    """Rank for matches without a full text score: per term, a name equal to it, then starting with it, then containing it."""
+    rank = Value(0.0, output_field=FloatField())
+    for term in terms:
+        rank = rank + Case(
+            When(name__iexact=term, then=Value(3.0)),
+            When(name__istartswith=term, then=Value(2.0)),
+            When(name__icontains=term, then=Value(1.0)),
+            default=Value(0.0),
+            output_field=FloatField(),
+        )
+    return rank
+
+
+class SubstringSearchBackend:
+    """Unindexed fallback with the matching rules of DRF's SearchFilter, ranked by substring_rank."""
+
+    def search(self, queryset, terms):
+        for term in terms:
+            queryset = queryset.filter(Q(name__icontains=term) | Q(tags__name__icontains=term))
+        return queryset.distinct().annotate(**{RANK_FIELD: substring_rank(terms)})
+
+
+class PostgreSQLSearchBackend:
+    """
+    Every term must occur in the product name or one of its tag names, checked with ILIKE against
+    search_text, which the pg_trgm GIN index answers without scanning products.
+    Rank is the ts_rank of the weighted tsvector (name above tags) plus the trigram similarity of the name.
+    Without pg_trgm the ILIKE checks run unindexed and the rank is the ts_rank alone.
+    """
+
+    def search(self, queryset, terms):
+        like_clauses = ' AND '.join(["search_text ILIKE %s ESCAPE '\\'"] * len(terms))
+        matches = RawSQL(
+            f'SELECT product_id FROM {SEARCH_TABLE} WHERE {like_clauses}',
+            [f'%{escape_like(term)}%' for term in terms],
+        )
+        query = ' '.join(terms)
+        rank_sql, rank_params = "ts_rank(document, websearch_to_tsquery('simple', %s))", [query]
+        if _trigram_installed():
+            rank_sql, rank_params = f'{rank_sql} + similarity(products_product.name, %s)', [query, query]
+        # Cast to double precision so the rank round-trips exactly through the pagination cursor.
+        rank = RawSQL(
+            f'SELECT ({rank_sql})::double precision FROM {SEARCH_TABLE} WHERE product_id = products_product.id',
+            rank_params,
+            output_field=FloatField(),
+        )
+        return queryset.filter(id__in=matches).annotate(**{RANK_FIELD: rank})
+
+
+class SQLiteSearchBackend:
+    """
+    FTS5 table with the trigram tokenizer: terms of three or more characters are MATCHed as phrases
+    and ranked with bm25, shorter ones are checked with LIKE on the same table.
+    """
+
+    def search(self, queryset, terms):
+        long_terms = [term for term in terms if len(term) >= TRIGRAM_LENGTH]
+        short_terms = [term for term in terms if len(term) < TRIGRAM_LENGTH]
+        match = ' AND '.join('"{}"'.format(term.replace('"', '""')) for term in long_terms)
+
+        clauses, params = [], []
+        if match:
+            clauses.append(f'{SEARCH_TABLE} MATCH %s')
+            params.append(match)
+        for term in short_terms:
+            clauses.append("(name LIKE %s ESCAPE '\\' OR tags LIKE %s ESCAPE '\\')")
+            params.extend([f'%{escape_like(term)}%'] * 2)
+        matches = RawSQL(f'SELECT rowid FROM {SEARCH_TABLE} WHERE {" AND ".join(clauses)}', params)
+
+        if match:
+            # bm25 is lower for better matches.
+            rank = RawSQL(
+                f'SELECT -bm25({SEARCH_TABLE}, 10.0, 1.0) FROM {SEARCH_TABLE} '
+                f'WHERE {SEARCH_TABLE} MATCH %s AND rowid = products_product.id',
+                [match],
+                output_field=FloatField(),
+            )
+        else:
+            rank = substring_rank(short_terms)
+        return queryset.filter(id__in=matches).annotate(**{RANK_FIELD: rank})
+
+
+@lru_cache(maxsize=None)
+def _trigram_installed():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+BACKENDS = {
+    'postgresql': PostgreSQLSearchBackend,
+    'sqlite': SQLiteSearchBackend,
+}
+
+
+def get_search_backend():
+    """The backend named by settings.PRODUCT_SEARCH_BACKEND, or the one that fits the database."""
+    backend_path = getattr(settings, 'PRODUCT_SEARCH_BACKEND', None)
+    if backend_path:
+        return import_string(backend_path)()
+    return BACKENDS.get(connection.vendor, SubstringSearchBackend)()
+
+
+class ProductSearchFilter(filters.SearchFilter):
+    """Same ?search= parameter as SearchFilter, answered by the search backend and annotated with a rank."""
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        return get_search_backend().search(queryset, terms)
@@ -1,7 +1,11 @@
+from django.conf import settings
 from rest_framework import serializers
-from .models import Product, Tag, PriceSnapshot
+from .models import Product, Tag, PriceSnapshot, CurrentPrice
 from shops.models import Shop
-from .utils import format_date, convert_price_to_float, validate_unit
+from shops.resolver import shop_resolver
+from .facets import DEFAULT_LIMIT, MAX_LIMIT
+from .price_history import BUCKETS
+from .utils import VALID_UNITS, format_date, convert_price_to_float, validate_unit
 
 class CSVRowSerializer(serializers.Serializer):
     store_product_id = serializers.CharField(required=False, allow_blank=True)
@@ -23,13 +27,12 @@ class CSVRowSerializer(serializers.Serializer):
         product, _ = Product.objects.get_or_create(name=validated_data['product_name'])
         tags = self._create_tags(validated_data)
         product.tags.set(tags)
-        product.save()
         
-        shop, _ = Shop.objects.get_or_create(name=validated_data['store_name'], address=validated_data['store_location'])
+        shop_id = shop_resolver.resolve_or_create(validated_data['store_name'], validated_data['store_location'])
         
         PriceSnapshot.objects.get_or_create(
             product=product,
-            shop=shop,
+            shop_id=shop_id,
             date=format_date(validated_data['date']),
             unit=validated_data['unit'],
             unit_price=convert_price_to_float(validated_data['unit_price']),
@@ -50,29 +53,54 @@ class CSVRowSerializer(serializers.Serializer):
     def _create_tags(self, validated_data):
         return [Tag.objects.get_or_create(name=tag_name)[0] for tag_name in validated_data.pop('tags').split(' ')]
 
+class TagSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Tag
+        fields = ['id', 'name']
+        read_only_fields = ['id'] 
+
+class PriceSnapshotSerializer(serializers.ModelSerializer):    
+    class Meta:
+        model = PriceSnapshot
+        fields = ['id', 'product', 'shop', 'date', 'unit', 'unit_price', 'currency', 'source', 'normalized_unit', 'normalized_unit_price']
+        read_only_fields = ['id', 'normalized_unit', 'normalized_unit_price']
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        data['unit_price'] = convert_price_to_float(data['unit_price'])
+        if data['normalized_unit_price'] is not None:
+            data['normalized_unit_price'] = convert_price_to_float(data['normalized_unit_price'])
+        return data
+
 class ProductBaseSerializer(serializers.ModelSerializer):
+    tags = serializers.SerializerMethodField()
+
     class Meta:
         model = Product
         fields = ['id', 'name', 'tags']
         read_only_fields = ['id']
 
-    def to_representation(self, instance):
-        data = super().to_representation(instance)
-        data['tags'] = TagSerializer(instance.tags.all(), many=True).data
-        return data
+    def get_tags(self, product):
+        # Sorted here rather than in SQL, so tags prefetched with Product.objects.with_tags() are read without a query.
+        return TagSerializer(sorted(product.tags.all(), key=lambda tag: tag.id), many=True).data
 
 class ProductListSerializer(ProductBaseSerializer):
     class Meta(ProductBaseSerializer.Meta):
         pass
     
 class ProductDetailSerializer(ProductBaseSerializer):
+    """The product with its PRODUCT_DETAIL_SNAPSHOT_LIMIT most recent snapshots, like products.representations.product_detail_dict."""
+    price_snapshots = serializers.SerializerMethodField()
+
     class Meta(ProductBaseSerializer.Meta):
-        pass
-    
-    def to_representation(self, instance):
-        data = super().to_representation(instance)
-        data['price_snapshots'] = PriceSnapshotSerializer(PriceSnapshot.objects.filter(product=instance), many=True).data
-        return data
+        fields = ProductBaseSerializer.Meta.fields + ['price_snapshots']
+
+    def get_price_snapshots(self, product):
+        # Prefetched by Product.objects.with_recent_snapshots(), or else read for this product alone.
+        snapshots = getattr(product, 'recent_price_snapshots', None)
+        if snapshots is None:
+            snapshots = product.pricesnapshot_set.order_by('-date', '-id')[:settings.PRODUCT_DETAIL_SNAPSHOT_LIMIT]
+        return PriceSnapshotSerializer(snapshots, many=True).data
 
 class ShopSerializer(serializers.ModelSerializer):
     class Meta:
@@ -80,21 +108,70 @@ class ShopSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'address']
         read_only_fields = ['id']
 
+class CurrentPriceSerializer(serializers.ModelSerializer):
+    shop = ShopSerializer(read_only=True)
 
-class PriceSnapshotSerializer(serializers.ModelSerializer):    
     class Meta:
-        model = PriceSnapshot
-        fields = ['id', 'product', 'shop', 'date', 'unit', 'unit_price', 'currency', 'source']
-        read_only_fields = ['id']
+        model = CurrentPrice
+        fields = ['shop', 'unit', 'unit_price', 'currency', 'date']
 
     def to_representation(self, instance):
         data = super().to_representation(instance)
         data['unit_price'] = convert_price_to_float(data['unit_price'])
         return data
 
+class PriceHistoryQuerySerializer(serializers.Serializer):
+    since = serializers.DateField(required=False)
+    until = serializers.DateField(required=False)
+    shop = serializers.IntegerField(required=False)
+    bucket = serializers.ChoiceField(choices=list(BUCKETS), default='day')
 
-class TagSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = Tag
-        fields = ['id', 'name']
-        read_only_fields = ['id'] 
+    def validate(self, attrs):
+        if 'since' in attrs and 'until' in attrs and attrs['since'] > attrs['until']:
+            raise serializers.ValidationError("since must not be after until")
+        return attrs
+
+class PriceHistoryBucketSerializer(serializers.Serializer):
+    PRICE_FIELDS = ['min', 'avg', 'max', 'last']
+
+    date = serializers.DateField(source='bucket_start')
+    unit = serializers.CharField()
+    count = serializers.IntegerField(source='snapshot_count')
+    min = serializers.DecimalField(source='min_price', max_digits=10, decimal_places=4)
+    avg = serializers.DecimalField(source='avg_price', max_digits=10, decimal_places=4)
+    max = serializers.DecimalField(source='max_price', max_digits=10, decimal_places=4)
+    last = serializers.DecimalField(source='last_price', max_digits=10, decimal_places=4)
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        for field in self.PRICE_FIELDS:
+            data[field] = convert_price_to_float(data[field])
+        return data
+
+class SnapshotBulkRowSerializer(serializers.Serializer):
+    """One row posted to the snapshot bulk endpoint. Products and shops are named, like in the CSV import."""
+    product_name = serializers.CharField(max_length=255)
+    tags = serializers.CharField(required=False, allow_blank=True)
+    store_name = serializers.CharField(max_length=255)
+    store_location = serializers.CharField(max_length=255, required=False, allow_blank=True)
+    date = serializers.DateField()
+    unit = serializers.ChoiceField(choices=VALID_UNITS)
+    unit_price = serializers.DecimalField(max_digits=10, decimal_places=4, min_value=0)
+    store_product_id = serializers.CharField(max_length=255, required=False, allow_blank=True, allow_null=True)
+    currency = serializers.CharField(max_length=3, required=False)
+    source = serializers.CharField(max_length=255, required=False)
+
+class SkuResolveItemSerializer(serializers.Serializer):
+    """One item to resolve: by its shop's SKU when that is known, otherwise by name."""
+    shop = serializers.IntegerField(required=False, allow_null=True)
+    store_product_id = serializers.CharField(max_length=255, required=False, allow_blank=True, allow_null=True)
+    name = serializers.CharField(required=False, allow_blank=True, default='')
+
+class SkuResolveSerializer(serializers.Serializer):
+    MAX_ITEMS = 1000
+
+    items = serializers.ListField(child=SkuResolveItemSerializer(), max_length=MAX_ITEMS)
+
+class TagFacetQuerySerializer(serializers.Serializer):
+    facets = serializers.ChoiceField(choices=['tags'], required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=MAX_LIMIT, default=DEFAULT_LIMIT)
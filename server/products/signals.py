@@ -0,0 +1,62 @@
+from django.db.models.signals import pre_save, post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from core.response_cache import invalidate_responses
+from .current_prices import update_current_prices, refresh_current_prices
+from .models import Product, Tag, ProductTag, PriceSnapshot
+from .skus import update_skus, refresh_skus
+from .units import normalize_unit_price
+
+
+@receiver(pre_save, sender=PriceSnapshot)
+def normalize_unit_price_on_save(sender, instance, **kwargs):
+    instance.normalized_unit, instance.normalized_unit_price = normalize_unit_price(instance.unit, instance.unit_price)
+
+
+@receiver(pre_save, sender=PriceSnapshot)
+def remember_snapshot_before_save(sender, instance, **kwargs):
+    # What the stored row counted for, so moving a snapshot to another product, shop, unit or SKU refreshes the old keys too.
+    instance._stored_before = PriceSnapshot.objects.filter(pk=instance.pk).values('product_id', 'shop_id', 'unit', 'store_product_id').first() if instance.pk else None
+
+
+@receiver(post_save, sender=PriceSnapshot)
+def update_current_price_on_save(sender, instance, created, **kwargs):
+    if created:
+        update_current_prices([instance])
+    else:
+        keys = {(instance.product_id, instance.shop_id, instance.unit)}
+        stored = getattr(instance, '_stored_before', None)
+        if stored:
+            keys.add((stored['product_id'], stored['shop_id'], stored['unit']))
+        refresh_current_prices(keys)
+
+
+@receiver(post_delete, sender=PriceSnapshot)
+def refresh_current_price_on_delete(sender, instance, **kwargs):
+    refresh_current_prices([(instance.product_id, instance.shop_id, instance.unit)])
+
+
+@receiver(post_save, sender=PriceSnapshot)
+def update_sku_on_save(sender, instance, created, **kwargs):
+    if created:
+        update_skus([instance])
+    else:
+        keys = {(instance.shop_id, instance.store_product_id)}
+        stored = getattr(instance, '_stored_before', None)
+        if stored:
+            keys.add((stored['shop_id'], stored['store_product_id']))
+        refresh_skus(keys)
+
+
+@receiver(post_delete, sender=PriceSnapshot)
+def refresh_sku_on_delete(sender, instance, **kwargs):
+    refresh_skus([(instance.shop_id, instance.store_product_id)])
+
+
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=Tag)
+@receiver([post_save, post_delete], sender=ProductTag)
+@receiver([post_save, post_delete], sender=PriceSnapshot)
+@receiver(m2m_changed, sender=Product.tags.through)
+def invalidate_product_responses(sender, **kwargs):
+    # Bulk writes skip these signals and invalidate from the loaders instead.
+    invalidate_responses('products')
@@ -0,0 +1,122 @@
+"""
+Maintenance of StoreSKU, the product each shop's own product id (SKU) stands for, and lookups in it.
+Like products.current_prices, only newer (or equally old, later) snapshots move a SKU to another product,
+so snapshots can be applied in any order and a chunk of them costs one statement per UPSERT_BATCH_SIZE SKUs.
+Snapshots without a shop or with a blank store_product_id have no SKU.
+"""
+from django.db import connection, transaction
+from django.utils import timezone
+from .matching import product_matcher
+from .models import StoreSKU, PriceSnapshot
+
+UPSERT_BATCH_SIZE = 1000
+SKU_SCORE = 100.0
+
+UPSERT_SQL = """
+INSERT INTO {table} (shop_id, store_product_id, product_id, date, updated_at)
+VALUES {values}
+ON CONFLICT (shop_id, store_product_id) DO UPDATE
+SET product_id = excluded.product_id, date = excluded.date, updated_at = excluded.updated_at
+WHERE excluded.date >= {table}.date
+"""
+
+REBUILD_SQL = """
+INSERT INTO {table} (shop_id, store_product_id, product_id, date, updated_at)
+SELECT shop_id, store_product_id, product_id, date, %s FROM (
+    SELECT shop_id, store_product_id, product_id, date,
+           ROW_NUMBER() OVER (PARTITION BY shop_id, store_product_id ORDER BY date DESC, id DESC) AS position
+    FROM {snapshot_table}
+    WHERE shop_id IS NOT NULL AND store_product_id IS NOT NULL AND store_product_id <> ''
+) latest
+WHERE position = 1
+"""
+
+_date_field = PriceSnapshot._meta.get_field('date')
+
+
+def latest_skus(snapshots):
+    """The product of the latest of the given snapshots per (shop, SKU) as (key, product_id, date). Later snapshots win ties."""
+    latest = {}
+    for snapshot in snapshots:
+        if snapshot.shop_id is None or not snapshot.store_product_id:
+            continue
+        key = (snapshot.shop_id, snapshot.store_product_id)
+        date = _date_field.to_python(snapshot.date)
+        if key not in latest or date >= latest[key][2]:
+            latest[key] = (key, snapshot.product_id, date)
+
+    return list(latest.values())
+
+
+def update_skus(snapshots):
+    """Point the SKUs of the given newly inserted snapshots at their products where the snapshots are newer."""
+    rows = latest_skus(snapshots)
+    table = connection.ops.quote_name(StoreSKU._meta.db_table)
+    updated_at = connection.ops.adapt_datetimefield_value(timezone.now())
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+            batch = rows[start:start + UPSERT_BATCH_SIZE]
+            values = ', '.join(['(%s, %s, %s, %s, %s)'] * len(batch))
+            params = []
+            for (shop_id, store_product_id), product_id, date in batch:
+                params.extend([shop_id, store_product_id, product_id, connection.ops.adapt_datefield_value(date), updated_at])
+            cursor.execute(UPSERT_SQL.format(table=table, values=values), params)
+
+
+def refresh_skus(keys):
+    """Recompute the given (shop_id, store_product_id) keys from history, after snapshots were changed or deleted."""
+    for shop_id, store_product_id in keys:
+        if shop_id is None or not store_product_id:
+            continue
+        latest = PriceSnapshot.objects.filter(shop_id=shop_id, store_product_id=store_product_id).order_by('-date', '-id').first()
+        if latest is None:
+            StoreSKU.objects.filter(shop_id=shop_id, store_product_id=store_product_id).delete()
+        else:
+            StoreSKU.objects.update_or_create(
+                shop_id=shop_id, store_product_id=store_product_id,
+                defaults={'product_id': latest.product_id, 'date': latest.date},
+            )
+
+
+def rebuild_skus():
+    """Recompute the whole table from PriceSnapshot history. Returns the number of SKUs."""
+    with transaction.atomic():
+        StoreSKU.objects.all().delete()
+        with connection.cursor() as cursor:
+            cursor.execute(REBUILD_SQL.format(
+                table=connection.ops.quote_name(StoreSKU._meta.db_table),
+                snapshot_table=connection.ops.quote_name(PriceSnapshot._meta.db_table),
+            ), [connection.ops.adapt_datetimefield_value(timezone.now())])
+    return StoreSKU.objects.count()
+
+
+def resolve_skus(keys):
+    """{(shop_id, store_product_id): (product_id, product_name)} for the keys with a known SKU, in one query."""
+    keys = {(shop_id, store_product_id) for shop_id, store_product_id in keys if shop_id is not None and store_product_id}
+    if not keys:
+        return {}
+    rows = StoreSKU.objects.filter(
+        shop_id__in={shop_id for shop_id, _ in keys}, store_product_id__in={store_product_id for _, store_product_id in keys},
+    ).values_list('shop_id', 'store_product_id', 'product_id', 'product__name')
+    # Shops and SKUs are filtered separately, so pairs that were not asked for are dropped here.
+    return {(shop_id, store_product_id): (product_id, name) for shop_id, store_product_id, product_id, name in rows if (shop_id, store_product_id) in keys}
+
+
+def resolve_products(items, limit=None):
+    """
+    [(matched_by, [(product_id, product_name, score)])] for (shop_id, store_product_id, name) items.
+    Items with a known SKU get its product alone, matched_by 'sku'; the rest fall back to
+    products.matching on their name, matched_by 'name', or None when nothing matches.
+    """
+    items = list(items)
+    skus = resolve_skus((shop_id, store_product_id) for shop_id, store_product_id, _ in items)
+    unresolved = [position for position, (shop_id, store_product_id, _) in enumerate(items) if (shop_id, store_product_id) not in skus]
+    matches = dict(zip(unresolved, product_matcher.match([items[position][2] for position in unresolved], limit=limit))) if unresolved else {}
+
+    results = []
+    for position, (shop_id, store_product_id, _) in enumerate(items):
+        if position in matches:
+            results.append(('name' if matches[position] else None, matches[position]))
+        else:
+            results.append(('sku', [(*skus[(shop_id, store_product_id)], SKU_SCORE)]))
+    return results
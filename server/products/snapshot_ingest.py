@@ -0,0 +1,175 @@
+"""
+Bulk ingestion of price snapshots posted as JSON rows to /products/snapshots/bulk/.
+
+Rows are validated a batch at a time, column by column, with SnapshotBulkRowSerializer as the reference
+for every row the fast path cannot judge on its own, and written through BulkCSVLoader's chunk writer,
+which keeps the name -> id caches and the derived current and normalized prices up to date.
+"""
+import re
+from datetime import date
+from decimal import Decimal
+import numpy as np
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.exceptions import ErrorDetail
+from rest_framework.settings import api_settings
+from .bulk_loader import BulkCSVLoader
+from .columnar_validator import UNSAFE_CHARACTERS
+from .serializers import SnapshotBulkRowSerializer
+from .utils import VALID_UNITS
+
+API_SOURCE = 'API input'
+
+ISO_DATE_PATTERN = re.compile(r'[0-9]{4}-[0-9]{2}-[0-9]{2}')
+# Prices that fit the unit_price column as they are: at most 6 integer and 4 decimal digits.
+PRICE_PATTERN = re.compile(r'[0-9]{1,6}(?:\.[0-9]{1,4})?')
+
+_fields = SnapshotBulkRowSerializer().fields
+FIELD_NAMES = list(_fields)
+REQUIRED_FIELDS = [name for name, field in _fields.items() if field.required]
+MAX_LENGTHS = {name: field.max_length for name, field in _fields.items() if getattr(field, 'max_length', None)}
+# The fields that strip surrounding whitespace before validating; ChoiceField and DateField take values as they are.
+STRIPPED_FIELDS = [
+    name for name, field in _fields.items()
+    if getattr(field, 'trim_whitespace', False) or isinstance(field, serializers.DecimalField)
+]
+BLANK_FIELDS = [name for name, field in _fields.items() if getattr(field, 'allow_blank', False)]
+_missing = object()
+
+
+def parse_snapshot_row(row):
+    """Reference path: validate one row with SnapshotBulkRowSerializer and convert it into a loader record."""
+    if isinstance(row, ValueError):
+        # The row could not even be decoded from the request body.
+        raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [ErrorDetail(str(row), code='parse_error')]})
+    serializer = SnapshotBulkRowSerializer(data=row)
+    serializer.is_valid(raise_exception=True)
+    data = serializer.validated_data
+    return _record(data)
+
+
+def validate_snapshot_rows(indexed_rows):
+    """
+    Validate a batch of (index, row) pairs. Returns (index, record) pairs for valid rows and
+    (index, error) pairs for the rest, in input order, like columnar_validator.validate_rows.
+    """
+    rows = [row for _, row in indexed_rows]
+    results = [None] * len(rows)
+    columns, fast_path = _fast_path_columns(rows)
+    dates = _parse_dates(columns['date'], fast_path)
+
+    for position in range(len(rows)):
+        if fast_path[position] and dates[position] is not None:
+            results[position] = _record({name: column[position] for name, column in columns.items()}, dates[position])
+        else:
+            try:
+                results[position] = parse_snapshot_row(rows[position])
+            except Exception as e:
+                results[position] = e
+
+    records, errors = [], []
+    for (index, _), result in zip(indexed_rows, results):
+        if isinstance(result, Exception):
+            errors.append((index, result))
+        else:
+            records.append((index, result))
+    return records, errors
+
+
+class SnapshotBulkLoader(BulkCSVLoader):
+    """BulkCSVLoader for rows posted as JSON objects instead of read from a CSV file."""
+
+    def validate(self, chunk):
+        return validate_snapshot_rows(chunk)
+
+
+def ingest_snapshots(rows, max_rows=None, batch_size=None):
+    """
+    Load an iterable of decoded rows, one batch of batch_size rows per transaction, reading at most max_rows of them.
+    Returns (row_count, errors, truncated): the number of rows read, {index: exception} of the rejected ones,
+    and whether rows were left unread.
+    """
+    max_rows = settings.SNAPSHOT_BULK_MAX_ROWS if max_rows is None else max_rows
+    loader = SnapshotBulkLoader(batch_size=batch_size or settings.SNAPSHOT_BULK_BATCH_SIZE)
+    row_count, truncated = 0, False
+    for row in rows:
+        if row_count == max_rows:
+            truncated = True
+            break
+        loader.add(row_count, row)
+        row_count += 1
+    loader.flush()
+    return row_count, dict(loader.errors), truncated
+
+
+def _record(data, row_date=None):
+    return {
+        'product_name': data['product_name'],
+        # Rows without tags leave the product's tags as they are.
+        'tags': (data.get('tags') or '').split() or None,
+        'shop': (data['store_name'], data.get('store_location') or ''),
+        'date': row_date or data['date'],
+        'unit': data['unit'],
+        'unit_price': data['unit_price'],
+        'store_product_id': data.get('store_product_id') or None,
+        'currency': data.get('currency') or 'USD',
+        'source': data.get('source') or API_SOURCE,
+    }
+
+
+def _fast_path_columns(rows):
+    """
+    String columns of the rows, stripped where the serializer strips them, and a mask of the rows
+    that are valid apart from their date's calendar check.
+    """
+    mask = np.fromiter((type(row) is dict for row in rows), dtype=bool, count=len(rows))
+    columns = {}
+    for name in FIELD_NAMES:
+        values = [row.get(name, _missing) if type(row) is dict else _missing for row in rows]
+        if name == 'unit_price':
+            # JSON numbers are checked in the same decimal notation as strings; floats in exponent notation are not.
+            values = [str(value) if type(value) in (int, float) else value for value in values]
+        present = np.fromiter((type(value) is str and not UNSAFE_CHARACTERS.search(value) for value in values), dtype=bool, count=len(rows))
+        absent = np.fromiter(
+            (value is _missing or (value is None and _fields[name].allow_null) for value in values), dtype=bool, count=len(rows),
+        )
+        column = np.array([value if type(value) is str else '' for value in values], dtype=str)
+        if name in STRIPPED_FIELDS:
+            column = np.char.strip(column)
+        lengths = np.char.str_len(column)
+        filled = present if name in BLANK_FIELDS else present & (lengths > 0)
+
+        if name in REQUIRED_FIELDS:
+            mask &= filled
+        else:
+            mask &= filled | absent
+        if name in MAX_LENGTHS:
+            mask &= lengths <= MAX_LENGTHS[name]
+        columns[name] = column.tolist()
+
+    mask &= np.isin(np.array(columns['unit'], dtype=str), VALID_UNITS)
+    mask &= np.fromiter((bool(ISO_DATE_PATTERN.fullmatch(value)) for value in columns['date']), dtype=bool, count=len(rows))
+    mask &= np.fromiter((bool(PRICE_PATTERN.fullmatch(value)) for value in columns['unit_price']), dtype=bool, count=len(rows))
+    columns['unit_price'] = [Decimal(value) if selected else None for value, selected in zip(columns['unit_price'], mask)]
+    return columns, mask
+
+
+def _parse_dates(column, mask):
+    """Dates of the masked rows, or None for dates the calendar rejects."""
+    selected = np.flatnonzero(mask)
+    results = [None] * len(column)
+    try:
+        parsed = np.array([column[i] for i in selected], dtype='datetime64[D]').astype(object)
+    except ValueError:
+        parsed = [_iso_date_or_none(column[i]) for i in selected]
+    for i, value in zip(selected, parsed):
+        # Years numpy parses but Python dates cannot hold come back as plain numbers.
+        results[i] = value if isinstance(value, date) else None
+    return results
+
+
+def _iso_date_or_none(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return None
@@ -0,0 +1,174 @@
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from products.bulk_loader import BulkCSVLoader
+from products.current_prices import update_current_prices, rebuild_current_prices
+from products.models import Product, PriceSnapshot, CurrentPrice
+from shops.models import Shop
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+
+class CurrentPriceMaintenanceTest(TestCase):
+    def setUp(self):
+        self.product = Product.objects.create(name="Bananas")
+        self.shop = Shop.objects.create(name="Costco", address="Pearland")
+
+    def snapshot(self, unit_price, day, unit='lb', shop=None):
+        return PriceSnapshot.objects.create(
+            product=self.product, shop=shop or self.shop, unit=unit, unit_price=unit_price, date=date(2025, 2, day)
+        )
+
+    def current_price(self, unit='lb'):
+        return CurrentPrice.objects.get(product=self.product, shop=self.shop, unit=unit).unit_price
+
+    def test_new_snapshot_becomes_current_price(self):
+        self.snapshot('1.49', 20)
+
+        self.assertEqual(self.current_price(), Decimal('1.49'))
+
+    def test_newer_snapshot_replaces_current_price(self):
+        self.snapshot('1.49', 20)
+        self.snapshot('1.29', 21)
+
+        self.assertEqual(self.current_price(), Decimal('1.29'))
+
+    def test_older_snapshot_does_not_replace_current_price(self):
+        self.snapshot('1.49', 20)
+        self.snapshot('1.99', 10)
+
+        self.assertEqual(self.current_price(), Decimal('1.49'))
+
+    def test_current_prices_are_kept_per_unit(self):
+        self.snapshot('1.49', 20, unit='lb')
+        self.snapshot('0.25', 20, unit='each')
+
+        self.assertEqual((self.current_price('lb'), self.current_price('each')), (Decimal('1.49'), Decimal('0.25')))
+
+    def test_snapshot_without_shop_has_no_current_price(self):
+        PriceSnapshot.objects.create(product=self.product, unit_price='1.49', date=date(2025, 2, 20))
+
+        self.assertFalse(CurrentPrice.objects.exists())
+
+    def test_deleting_latest_snapshot_falls_back_to_previous_one(self):
+        self.snapshot('1.49', 20)
+        self.snapshot('1.29', 21).delete()
+
+        self.assertEqual(self.current_price(), Decimal('1.49'))
+
+    def test_deleting_only_snapshot_removes_current_price(self):
+        self.snapshot('1.49', 20).delete()
+
+        self.assertFalse(CurrentPrice.objects.exists())
+
+    def test_editing_snapshot_date_recomputes_current_price(self):
+        older = self.snapshot('1.49', 20)
+        self.snapshot('1.29', 21)
+        older.date = date(2025, 2, 22)
+        older.save()
+
+        self.assertEqual(self.current_price(), Decimal('1.49'))
+
+    def test_moving_snapshot_to_another_shop_drops_current_price_it_left(self):
+        other = Shop.objects.create(name="HEB", address="Katy")
+        snapshot = self.snapshot('1.49', 20)
+        snapshot.shop = other
+        snapshot.save()
+
+        self.assertEqual(list(CurrentPrice.objects.values_list('shop_id', 'unit_price')), [(other.id, Decimal('1.49'))])
+
+    def test_update_current_prices_applies_a_batch_in_one_query(self):
+        other_shop = Shop.objects.create(name="HEB", address="Pearland")
+        snapshots = [
+            PriceSnapshot(product=self.product, shop=self.shop, unit='lb', unit_price='1.49', date='2025-02-20'),
+            PriceSnapshot(product=self.product, shop=self.shop, unit='lb', unit_price='1.29', date='2025-02-21'),
+            PriceSnapshot(product=self.product, shop=other_shop, unit='lb', unit_price='1.39', date='2025-02-20'),
+        ]
+        with self.assertNumQueries(1):
+            update_current_prices(snapshots)
+
+        self.assertEqual(self.current_price(), Decimal('1.29'))
+        self.assertEqual(CurrentPrice.objects.count(), 2)
+
+    def test_bulk_loader_maintains_current_prices(self):
+        loader = BulkCSVLoader()
+        row = {'store_product_id': '1', 'date': '2/20/2025', 'product_name': 'Bananas', 'tags': 'fruit', 'unit': 'lb', 'units_per_pack': '1', 'packs_bought': '1', 'sale_price': '$1.49', 'unit_price': '$1.49', 'store_name': 'Costco', 'store_location': 'Pearland'}
+        loader.add(2, row)
+        loader.add(3, {**row, 'date': '2/21/2025', 'unit_price': '$1.19'})
+        loader.add(4, {**row, 'date': '2/19/2025', 'unit_price': '$1.99'})
+        loader.flush()
+
+        self.assertEqual(self.current_price(), Decimal('1.19'))
+
+    def test_bulk_loader_reloading_a_duplicate_leaves_current_price_alone(self):
+        row = {'store_product_id': '1', 'date': '2/20/2025', 'product_name': 'Bananas', 'tags': 'fruit', 'unit': 'lb', 'units_per_pack': '1', 'packs_bought': '1', 'sale_price': '$1.49', 'unit_price': '$1.49', 'store_name': 'Costco', 'store_location': 'Pearland'}
+        for rows in ([row], [{**row, 'unit_price': '$1.29'}], [row]):
+            loader = BulkCSVLoader()
+            for row_index, each in enumerate(rows, start=2):
+                loader.add(row_index, each)
+            loader.flush()
+
+        self.assertEqual(PriceSnapshot.objects.count(), 2)
+        self.assertEqual(self.current_price(), Decimal('1.29'))
+        rebuild_current_prices()
+        self.assertEqual(self.current_price(), Decimal('1.29'))
+
+    def test_rebuild_recomputes_current_prices_from_history(self):
+        self.snapshot('1.49', 20)
+        self.snapshot('1.29', 21)
+        CurrentPrice.objects.all().delete()
+
+        self.assertEqual(rebuild_current_prices(), 1)
+        self.assertEqual(self.current_price(), Decimal('1.29'))
+
+    def test_rebuild_command_reports_number_of_current_prices(self):
+        self.snapshot('1.49', 20)
+        stdout = StringIO()
+        call_command('rebuild_current_prices', stdout=stdout)
+
+        self.assertEqual(stdout.getvalue().strip(), 'Rebuilt 1 current prices.')
+
+
+class CurrentPriceViewsTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.product = Product.objects.create(name="Bananas")
+        self.costco = Shop.objects.create(name="Costco", address="Pearland")
+        self.heb = Shop.objects.create(name="HEB", address="Houston")
+        PriceSnapshot.objects.create(product=self.product, shop=self.costco, unit='lb', unit_price='1.49', date=date(2025, 2, 20))
+        PriceSnapshot.objects.create(product=self.product, shop=self.heb, unit='lb', unit_price='1.59', date=date(2025, 2, 20))
+        PriceSnapshot.objects.create(product=self.product, shop=self.heb, unit='lb', unit_price='1.29', date=date(2025, 2, 21))
+        PriceSnapshot.objects.create(product=self.product, shop=self.costco, unit='each', unit_price='0.25', date=date(2025, 2, 20))
+
+    def test_current_prices_returns_latest_price_per_shop_cheapest_first(self):
+        response = self.client.get(reverse('product-current-prices', args=[self.product.id]))
+
+        self.assertEqual(
+            [(price['shop']['name'], price['unit'], price['unit_price']) for price in response.data],
+            [("Costco", 'each', Decimal('0.2500')), ("HEB", 'lb', Decimal('1.2900')), ("Costco", 'lb', Decimal('1.4900'))],
+        )
+
+    def test_current_prices_can_be_filtered_by_unit(self):
+        response = self.client.get(reverse('product-current-prices', args=[self.product.id]), {'unit': 'each'})
+
+        self.assertEqual([price['unit'] for price in response.data], ['each'])
+
+    def test_current_prices_does_not_read_price_history(self):
+        with self.assertNumQueries(2):
+            self.client.get(reverse('product-current-prices', args=[self.product.id]))
+
+    def test_cheapest_prices_returns_cheapest_shop_per_unit(self):
+        response = self.client.get(reverse('product-cheapest-prices', args=[self.product.id]))
+
+        self.assertEqual(
+            [(price['unit'], price['shop']['name'], price['date']) for price in response.data],
+            [('each', "Costco", '2025-02-20'), ('lb', "HEB", '2025-02-21')],
+        )
+
+    def test_cheapest_prices_returns_not_found_if_product_does_not_exist(self):
+        response = self.client.get(reverse('product-cheapest-prices', args=[999]))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,126 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from products.facets import tag_facets, tag_index
+from products.models import Product, Tag, ProductTag, TagCount
+
+
+class TagCountMaintenanceTest(TestCase):
+    def setUp(self):
+        self.fruit = Tag.objects.create(name="fruit")
+        self.snack = Tag.objects.create(name="snack")
+        self.bananas = Product.objects.create(name="Bananas")
+        self.chips = Product.objects.create(name="Banana Chips")
+
+    def counts(self):
+        return dict(TagCount.objects.filter(product_count__gt=0).values_list('tag__name', 'product_count'))
+
+    def test_tagging_products_counts_them(self):
+        self.bananas.tags.add(self.fruit)
+        self.chips.tags.add(self.fruit, self.snack)
+
+        self.assertEqual(self.counts(), {'fruit': 2, 'snack': 1})
+
+    def test_untagging_and_setting_tags_update_counts(self):
+        self.chips.tags.add(self.fruit, self.snack)
+        self.bananas.tags.add(self.fruit)
+
+        self.chips.tags.remove(self.fruit)
+        self.bananas.tags.set([self.snack])
+
+        self.assertEqual(self.counts(), {'snack': 2})
+
+    def test_bulk_writes_update_counts(self):
+        ProductTag.objects.bulk_create([
+            ProductTag(product=self.bananas, tag=self.fruit),
+            ProductTag(product=self.chips, tag=self.fruit),
+            ProductTag(product=self.chips, tag=self.snack),
+        ])
+        ProductTag.objects.filter(product=self.bananas).update(tag=self.snack)
+        self.assertEqual(self.counts(), {'fruit': 1, 'snack': 2})
+
+        ProductTag.objects.filter(product=self.chips).delete()
+        self.assertEqual(self.counts(), {'snack': 1})
+
+    def test_deleting_a_product_uncounts_it(self):
+        self.bananas.tags.add(self.fruit)
+        self.chips.tags.add(self.fruit)
+
+        self.chips.delete()
+
+        self.assertEqual(self.counts(), {'fruit': 1})
+
+
+class TagFacetsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        tag_index.clear()
+        self.addCleanup(tag_index.clear)
+        self.client = APIClient()
+        self.fruit = Tag.objects.create(name="fruit")
+        self.snack = Tag.objects.create(name="snack")
+        self.dairy = Tag.objects.create(name="dairy")
+        self.bananas = Product.objects.create(name="Bananas")
+        self.bananas.tags.add(self.fruit)
+        self.chips = Product.objects.create(name="Banana Chips")
+        self.chips.tags.add(self.fruit, self.snack)
+        self.milk = Product.objects.create(name="Whole Milk")
+        self.milk.tags.add(self.dairy)
+
+    def facet(self, tag, count):
+        return {'id': tag.id, 'name': tag.name, 'count': count}
+
+    def test_catalog_counts_come_most_products_first_then_by_name(self):
+        self.assertEqual(tag_facets(), [self.facet(self.fruit, 2), self.facet(self.dairy, 1), self.facet(self.snack, 1)])
+
+    def test_counts_over_product_ids_only_count_those_products(self):
+        self.assertEqual(tag_facets([self.chips.id, self.milk.id]), [self.facet(self.dairy, 1), self.facet(self.fruit, 1), self.facet(self.snack, 1)])
+        self.assertEqual(tag_facets([self.bananas.id, 10 ** 6]), [self.facet(self.fruit, 1)])
+        self.assertEqual(tag_facets([]), [])
+
+    def test_limit_keeps_the_tags_with_most_products(self):
+        self.assertEqual(tag_facets(limit=1), [self.facet(self.fruit, 2)])
+        self.assertEqual(tag_facets([self.bananas.id, self.chips.id], limit=1), [self.facet(self.fruit, 2)])
+
+    def test_index_reloads_once_products_change(self):
+        self.assertEqual(tag_facets([self.milk.id]), [self.facet(self.dairy, 1)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.milk.tags.add(self.snack)
+
+        self.assertEqual(tag_facets([self.milk.id]), [self.facet(self.dairy, 1), self.facet(self.snack, 1)])
+
+    def test_facets_endpoint_counts_matching_products(self):
+        response = self.client.get(reverse('product-tag-facets'), {'search': 'banana'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [self.facet(self.fruit, 2), self.facet(self.snack, 1)])
+
+    def test_facets_endpoint_without_filters_counts_the_catalog(self):
+        response = self.client.get(reverse('product-tag-facets'), {'limit': 2})
+
+        self.assertEqual(response.data['results'], [self.facet(self.fruit, 2), self.facet(self.dairy, 1)])
+
+    def test_tag_filter_keeps_products_with_every_tag(self):
+        response = self.client.get(reverse('products'), {'tag': [self.fruit.id, self.snack.id]})
+
+        self.assertEqual([product['name'] for product in response.data['results']], ["Banana Chips"])
+
+    def test_list_with_tag_facets_counts_all_matching_products(self):
+        response = self.client.get(reverse('products'), {'tag': self.fruit.id, 'facets': 'tags', 'page_size': 1})
+
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['facets'], {'tags': [self.facet(self.fruit, 2), self.facet(self.snack, 1)]})
+
+    def test_list_leaves_facets_out_unless_asked(self):
+        response = self.client.get(reverse('products'))
+
+        self.assertNotIn('facets', response.data)
+
+    def test_invalid_facet_parameters_are_rejected(self):
+        for params in ({'facets': 'shops'}, {'facets': 'tags', 'limit': 0}, {'tag': 'fruit'}):
+            response = self.client.get(reverse('products'), params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
@@ -0,0 +1,23 @@
+"""CSV files for the load_products_data tests."""
+import os
+import tempfile
+
+HEADER = 'store_product_id,date,product_name,tags,unit,units_per_pack,packs_bought,sale_price,unit_price,store_name,store_location\n'
+
+
+def make_line(product_name, date='2/20/2025', tags='fruit', unit='lb', unit_price='$1.49', store_name='Costco'):
+    return f'1,{date},{product_name},{tags},{unit},1,1,$1.49,{unit_price},{store_name},Pearland\n'
+
+
+class CSVFileMixin:
+    """A temporary directory per test, with csv_path inside it and write_csv() to fill that file."""
+
+    def setUp(self):
+        super().setUp()
+        self.output_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.output_dir.cleanup)
+        self.csv_path = os.path.join(self.output_dir.name, 'input.csv')
+
+    def write_csv(self, *lines):
+        with open(self.csv_path, 'w') as f:
+            f.write(HEADER + ''.join(lines))
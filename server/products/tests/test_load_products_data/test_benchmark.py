@@ -0,0 +1,120 @@
+from django.test import TestCase, TransactionTestCase
+from django.db import connection
+from django.core.management import call_command
+from products.benchmark import CSV_COLUMNS, generate_csv, run_loader, QueryCounter, PeakRSSSampler
+from products.management.commands.benchmark_load_products_data import BENCHMARK_MODELS, Command
+from products.models import Product, PriceSnapshot
+from products.search import SEARCH_TABLE
+from unittest.mock import patch
+import csv
+import io
+import json
+import os
+import tempfile
+
+
+class GenerateCSVTest(TestCase):
+    def setUp(self):
+        self.output_dir = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.output_dir.name, 'benchmark.csv')
+
+    def tearDown(self):
+        self.output_dir.cleanup()
+
+    def read_rows(self):
+        with open(self.csv_path) as f:
+            return list(csv.DictReader(f))
+
+    def test_generate_csv_writes_requested_number_of_rows_in_sheet_layout(self):
+        generate_csv(self.csv_path, 50)
+        with open(self.csv_path) as f:
+            header = next(csv.reader(f))
+
+        self.assertEqual(header, CSV_COLUMNS)
+        self.assertEqual(len(self.read_rows()), 50)
+
+    def test_generate_csv_respects_product_shop_and_tag_cardinalities(self):
+        generate_csv(self.csv_path, 500, products=7, shops=3, tags=4)
+        rows = self.read_rows()
+
+        self.assertLessEqual(len({row['product_name'] for row in rows}), 7)
+        self.assertLessEqual(len({row['store_name'] for row in rows}), 3)
+        self.assertLessEqual(len({tag for row in rows for tag in row['tags'].split(' ')}), 4)
+
+    def test_generate_csv_is_deterministic_for_a_seed(self):
+        generate_csv(self.csv_path, 20, seed=3)
+        first = self.read_rows()
+        generate_csv(self.csv_path, 20, seed=3)
+
+        self.assertEqual(self.read_rows(), first)
+
+    def test_generated_rows_load_without_errors(self):
+        generate_csv(self.csv_path, 100, products=10)
+        result = run_loader('batch', self.csv_path, 100)
+
+        self.assertEqual(PriceSnapshot.objects.count(), 100 - self._duplicate_count())
+        self.assertEqual(Product.objects.count(), len({row['product_name'] for row in self.read_rows()}))
+        self.assertEqual(result['rows'], 100)
+
+    def _duplicate_count(self):
+        keys = [(row['product_name'], row['date'], row['unit'], row['unit_price'], row['store_name']) for row in self.read_rows()]
+        return len(keys) - len(set(keys))
+
+
+class MeasurementTest(TestCase):
+    def test_query_counter_counts_queries_on_connection(self):
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            Product.objects.count()
+            Product.objects.exists()
+
+        self.assertEqual(counter.count, 2)
+
+    def test_peak_rss_sampler_reports_positive_peak(self):
+        with PeakRSSSampler() as sampler:
+            pass
+
+        self.assertGreater(sampler.peak_bytes, 0)
+
+    def test_run_loader_reports_throughput_queries_and_memory(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            csv_path = generate_csv(os.path.join(output_dir, 'benchmark.csv'), 30)
+            result = run_loader('rows', csv_path, 30)
+
+        self.assertEqual(result['mode'], 'rows')
+        self.assertGreater(result['rows_per_sec'], 0)
+        self.assertGreater(result['queries_per_row'], 1)
+        self.assertGreater(result['peak_rss_mb'], 0)
+
+
+class BenchmarkCommandTest(TransactionTestCase):
+    # The command resets tables between runs outside any transaction, and Postgres refuses to TRUNCATE inside one with pending FK checks.
+    def run_command(self, *args):
+        stdout = io.StringIO()
+        with patch.object(Command, '_setup_database', return_value='old'), patch.object(Command, '_teardown_database') as mock_teardown:
+            call_command(Command(), *args, stdout=stdout)
+        return stdout.getvalue(), mock_teardown
+
+    def test_command_reports_one_result_per_size_and_mode(self):
+        output, _ = self.run_command('--sizes', '20', '30', '--modes', 'batch', 'copy', '--json')
+        results = json.loads(output)
+
+        self.assertEqual([(result['rows'], result['mode']) for result in results], [(20, 'batch'), (20, 'copy'), (30, 'batch'), (30, 'copy')])
+
+    def test_command_tears_down_benchmark_database(self):
+        _, mock_teardown = self.run_command('--sizes', '10', '--modes', 'batch')
+
+        mock_teardown.assert_called_once_with('old')
+
+    def test_reset_empties_every_table_the_loaders_write(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            run_loader('batch', generate_csv(os.path.join(output_dir, 'benchmark.csv'), 30), 30)
+        self.assertTrue(PriceSnapshot.objects.exists())
+
+        Command()._reset_tables()
+
+        for model in BENCHMARK_MODELS:
+            self.assertFalse(model.objects.exists(), model.__name__)
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM {SEARCH_TABLE}')
+            self.assertEqual(cursor.fetchone()[0], 0)
@@ -0,0 +1,136 @@
+from django.test import TestCase
+from products.bulk_loader import BulkCSVLoader
+from products.models import Product, Tag, ProductTag, PriceSnapshot
+from shops.models import Shop
+from shops.resolver import shop_resolver
+from decimal import Decimal
+from django.db import IntegrityError
+from unittest.mock import patch
+
+
+class BulkCSVLoaderTest(TestCase):
+    def setUp(self):
+        shop_resolver.clear()
+        self.addCleanup(shop_resolver.clear)
+        self.loader = BulkCSVLoader(batch_size=100)
+        self.valid_row = {'store_product_id': '30669', 'date': '2/20/2025', 'product_name': 'bananas', 'tags': 'banana fruit', 'unit': 'lb', 'units_per_pack': '3', 'packs_bought': '1', 'sale_price': '$1.49', 'unit_price': '$0.4967', 'store_name': 'Costco Wholesale Pearland  #1221', 'store_location': '3500 Business Center Drive, Pearland TX 77584',}
+
+    def make_row(self, **overrides):
+        row = self.valid_row.copy()
+        row.update(overrides)
+        return row
+
+    def load(self, *rows):
+        for row_index, row in enumerate(rows, start=2):
+            self.loader.add(row_index, row)
+        self.loader.flush()
+
+    def test_load_valid_row_creates_product_shop_tags_and_snapshot(self):
+        self.load(self.make_row())
+
+        self.assertEqual(Product.objects.count(), 1)
+        self.assertEqual(Shop.objects.count(), 1)
+        self.assertEqual(Tag.objects.count(), 2)
+        self.assertEqual(PriceSnapshot.objects.count(), 1)
+
+    def test_load_valid_row_stores_parsed_snapshot_values(self):
+        self.load(self.make_row())
+        snapshot = PriceSnapshot.objects.get()
+
+        self.assertEqual(snapshot.unit_price, Decimal('0.4967'))
+        self.assertEqual(str(snapshot.date), '2025-02-20')
+        self.assertEqual(snapshot.source, 'CSV input')
+        self.assertEqual(snapshot.shop.address, self.valid_row['store_location'])
+
+    def test_load_same_row_twice_does_not_duplicate_records(self):
+        self.load(self.make_row(), self.make_row())
+        self.load(self.make_row())
+
+        self.assertEqual(Product.objects.count(), 1)
+        self.assertEqual(Shop.objects.count(), 1)
+        self.assertEqual(ProductTag.objects.count(), 2)
+        self.assertEqual(PriceSnapshot.objects.count(), 1)
+
+    def test_load_two_dates_of_same_product_creates_two_snapshots_for_one_product(self):
+        self.load(self.make_row(), self.make_row(date='2/21/2025', unit_price='$1.50'))
+
+        self.assertEqual(Product.objects.count(), 1)
+        self.assertEqual(PriceSnapshot.objects.count(), 2)
+
+    def test_load_later_row_replaces_tags_of_product(self):
+        self.load(self.make_row())
+        self.load(self.make_row(tags='banana yellow'))
+        product = Product.objects.get()
+
+        self.assertEqual(sorted(tag.name for tag in product.tags.all()), ['banana', 'yellow'])
+
+    def test_load_reuses_existing_shop_with_same_name_and_address(self):
+        shop = Shop.objects.create(name=self.valid_row['store_name'], address=self.valid_row['store_location'])
+        self.load(self.make_row())
+
+        self.assertEqual(Shop.objects.count(), 1)
+        self.assertEqual(PriceSnapshot.objects.get().shop, shop)
+
+    def test_load_same_shop_name_with_different_address_creates_two_shops(self):
+        self.load(self.make_row(), self.make_row(product_name='apples', store_location='Other address'))
+
+        self.assertEqual(Shop.objects.count(), 2)
+
+    def test_invalid_row_is_recorded_as_error_and_valid_rows_are_loaded(self):
+        self.load(self.make_row(unit='invalid unit'), self.make_row())
+
+        self.assertEqual([row_index for row_index, _ in self.loader.errors], [2])
+        self.assertEqual(self.loader.processed_count, 1)
+        self.assertEqual(PriceSnapshot.objects.count(), 1)
+
+    def test_add_flushes_automatically_when_batch_is_full(self):
+        self.loader = BulkCSVLoader(batch_size=2)
+        self.loader.add(2, self.make_row())
+        self.loader.add(3, self.make_row(product_name='apples'))
+
+        self.assertEqual(self.loader.pending, [])
+        self.assertEqual(Product.objects.count(), 2)
+
+    def test_flushed_chunk_populates_caches(self):
+        self.load(self.make_row())
+
+        self.assertIn('bananas', self.loader.product_ids)
+        self.assertEqual(set(self.loader.tag_ids), {'banana', 'fruit'})
+        self.assertIn((self.valid_row['store_name'], self.valid_row['store_location']), self.loader.shop_ids)
+
+    def test_failed_chunk_marks_all_rows_as_errors_and_leaves_caches_empty(self):
+        self.loader.add(2, self.make_row())
+        with patch.object(PriceSnapshot.objects, 'bulk_create', side_effect=IntegrityError('fail')):
+            self.loader.flush()
+
+        self.assertEqual(len(self.loader.errors), 1)
+        self.assertEqual(self.loader.product_ids, {})
+        self.assertEqual(Product.objects.count(), 0)
+
+    def test_store_name_variants_resolve_to_existing_shop(self):
+        shop = Shop.objects.create(name='Costco Wholesale Pearland', address=self.valid_row['store_location'])
+        self.load(self.make_row(store_name='COSTCO WHOLESALE PEARLAND #1221'))
+
+        self.assertEqual(Shop.objects.count(), 1)
+        self.assertEqual(PriceSnapshot.objects.get().shop_id, shop.id)
+
+    def test_store_name_variants_within_a_chunk_create_one_shop(self):
+        self.load(self.make_row(), self.make_row(store_name='costco wholesale pearland', date='2/21/2025'))
+
+        self.assertEqual(Shop.objects.count(), 1)
+        self.assertEqual(PriceSnapshot.objects.count(), 2)
+
+    def test_chunk_query_count_does_not_depend_on_number_of_rows(self):
+        rows = [self.make_row(product_name=f'product {i}', store_name=f'shop {i}', tags=f'tag{i} common') for i in range(50)]
+        for row_index, row in enumerate(rows, start=2):
+            self.loader.add(row_index, row)
+
+        with self.assertNumQueries(14):
+            self.loader.flush()
+
+    def test_chunk_with_only_cached_keys_skips_lookup_queries(self):
+        self.load(self.make_row())
+        self.loader.add(3, self.make_row(date='2/21/2025'))
+
+        with self.assertNumQueries(7):
+            self.loader.flush()
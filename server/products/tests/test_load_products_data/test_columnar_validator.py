@@ -0,0 +1,98 @@
+from django.test import TestCase
+from products.columnar_validator import validate_rows, parse_row
+from decimal import Decimal
+from datetime import date
+
+
+class ColumnarValidatorTest(TestCase):
+    def setUp(self):
+        self.valid_row = {'store_product_id': '30669', 'date': '2/20/2025', 'product_name': 'bananas', 'tags': 'banana fruit', 'unit': 'lb', 'units_per_pack': '3', 'packs_bought': '1', 'sale_price': '$1.49', 'unit_price': '$0.4967', 'store_name': 'Costco Wholesale Pearland  #1221', 'store_location': '3500 Business Center Drive, Pearland TX 77584',}
+
+    def make_row(self, **overrides):
+        row = self.valid_row.copy()
+        row.update(overrides)
+        return {key: value for key, value in row.items() if value is not ...}
+
+    def reference_result(self, row):
+        try:
+            return parse_row(row.copy())
+        except Exception as e:
+            return (type(e), str(e))
+
+    def columnar_results(self, rows):
+        records, errors = validate_rows(list(enumerate((row.copy() for row in rows), start=2)))
+        results = dict(records)
+        results.update({row_index: (type(e), str(e)) for row_index, e in errors})
+        return [results[row_index] for row_index in sorted(results)]
+
+    def assert_same_as_serializer(self, *rows):
+        self.assertEqual(self.columnar_results(rows), [self.reference_result(row) for row in rows])
+
+    def test_valid_row_produces_typed_record(self):
+        records, errors = validate_rows([(2, self.make_row())])
+
+        self.assertEqual(errors, [])
+        self.assertEqual(records[0][1]['date'], date(2025, 2, 20))
+        self.assertEqual(records[0][1]['unit_price'], Decimal('0.4967'))
+        self.assertEqual(records[0][1]['tags'], ['banana', 'fruit'])
+        self.assertEqual(records[0][1]['source'], 'CSV input')
+
+    def test_results_keep_input_order_and_row_indexes(self):
+        records, errors = validate_rows([(5, self.make_row()), (6, self.make_row(unit='bad')), (7, self.make_row(product_name='apples'))])
+
+        self.assertEqual([row_index for row_index, _ in records], [5, 7])
+        self.assertEqual([row_index for row_index, _ in errors], [6])
+
+    def test_empty_chunk_returns_no_records_and_no_errors(self):
+        self.assertEqual(validate_rows([]), ([], []))
+
+    def test_valid_rows_match_serializer(self):
+        self.assert_same_as_serializer(
+            self.make_row(),
+            self.make_row(date='12/31/2024', unit_price='12'),
+            self.make_row(date='02/29/2024', unit='ea', currency=' CAD '),
+            self.make_row(product_name='  padded name  ', tags=' a  b ', store_location=''),
+        )
+
+    def test_blank_and_missing_fields_match_serializer(self):
+        self.assert_same_as_serializer(
+            self.make_row(product_name=''),
+            self.make_row(product_name='   ', store_name=''),
+            self.make_row(product_name=...),
+            self.make_row(unit=None),
+            self.make_row(tags=...),
+            self.make_row(store_location=...),
+            self.make_row(store_product_id=...),
+        )
+
+    def test_invalid_units_match_serializer(self):
+        self.assert_same_as_serializer(self.make_row(unit='Lb'), self.make_row(unit='pounds'), self.make_row(unit=' kg '))
+
+    def test_invalid_dates_match_serializer(self):
+        self.assert_same_as_serializer(
+            self.make_row(date='2/30/2025'),
+            self.make_row(date='2/29/2023'),
+            self.make_row(date='13/01/2025'),
+            self.make_row(date='2025-02-20'),
+            self.make_row(date='2/20/25'),
+            self.make_row(date='0/1/0000'),
+            self.make_row(date='2/ 1/2025'),
+        )
+
+    def test_unusual_prices_match_serializer(self):
+        self.assert_same_as_serializer(
+            self.make_row(unit_price='abc'),
+            self.make_row(unit_price='$1,000.00'),
+            self.make_row(unit_price='-1.5'),
+            self.make_row(unit_price='.5'),
+            self.make_row(unit_price='1e2'),
+        )
+
+    def test_null_characters_match_serializer(self):
+        self.assert_same_as_serializer(self.make_row(product_name='ban\x00anas'))
+
+    def test_field_errors_take_precedence_over_unit_date_and_price_errors(self):
+        self.assert_same_as_serializer(self.make_row(product_name='', unit='bad', date='bad', unit_price='bad'))
+
+    def test_date_errors_take_precedence_over_price_errors(self):
+        self.assert_same_as_serializer(self.make_row(date='bad', unit_price='bad'))
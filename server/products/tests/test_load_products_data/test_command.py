@@ -1,13 +1,16 @@
 from django.test import TestCase
 from django.core.management.base import CommandError
 from products.management.commands.load_products_data import Command
+from products.bulk_loader import DEFAULT_BATCH_SIZE
 from unittest.mock import patch
+import io
 import tempfile
 import os
 
 class CommandHandleTest(TestCase):
     def setUp(self):
-        self.command = Command()
+        # The run summary goes to stdout, which is kept out of the test runner's output.
+        self.command = Command(stdout=io.StringIO())
         self.tempfile = tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False)
         self.tempfile_path = self.tempfile.name
         self._write_csv_content('store_product_id,product_name\n1,Apple\n2,Banana\n')
@@ -23,11 +26,16 @@ class CommandHandleTest(TestCase):
 
     def test_add_arguments_adds_csv_file_argument(self):
         parser = self.command.create_parser('manage.py', 'load_products_data')
-        self.command.add_arguments(parser)
-        args = parser.parse_args(['load_products_data', 'some_file.csv'])
+        args = parser.parse_args(['some_file.csv'])
 
         self.assertEqual(args.csv_file, 'some_file.csv')
 
+    def test_add_arguments_adds_batch_size_argument(self):
+        parser = self.command.create_parser('manage.py', 'load_products_data')
+        args = parser.parse_args(['some_file.csv', '--batch-size', '500'])
+
+        self.assertEqual(args.batch_size, 500)
+
     def test_handle_raises_command_error_if_file_not_found(self):
         with self.assertRaises(CommandError):
             self.command.handle(csv_file='not_a_real_file.csv')
@@ -45,3 +53,39 @@ class CommandHandleTest(TestCase):
                 self.command.handle(csv_file=self.tempfile_path)
 
                 mock_stderr.write.assert_called()
+
+    def test_add_arguments_adds_workers_argument(self):
+        parser = self.command.create_parser('manage.py', 'load_products_data')
+        args = parser.parse_args(['some_file.csv', '--workers', '4'])
+
+        self.assertEqual(args.workers, 4)
+
+    def test_handle_with_batch_size_loads_rows_through_bulk_loader(self):
+        with patch('products.management.commands.load_products_data.BulkCSVLoader') as mock_loader:
+            mock_loader.return_value.errors = []
+            mock_loader.return_value.processed_count = 2
+            self.command.handle(csv_file=self.tempfile_path, batch_size=500)
+
+            mock_loader.assert_called_once_with(batch_size=500, ledger=None, telemetry=self.command.telemetry)
+            self.assertEqual(mock_loader.return_value.add.call_count, 2)
+            mock_loader.return_value.flush.assert_called_once()
+
+    def test_handle_with_batch_size_writes_skipped_rows_to_stderr(self):
+        self._write_csv_content('store_product_id,product_name\n1,Apple\n')
+        with patch.object(self.command, 'stderr') as mock_stderr:
+            self.command.handle(csv_file=self.tempfile_path, batch_size=500)
+
+            mock_stderr.write.assert_called()
+
+    def test_handle_with_workers_loads_csv_in_parallel_with_default_batch_size(self):
+        with patch('products.management.commands.load_products_data.load_csv_in_parallel', return_value=(2, [])) as mock_load:
+            self.command.handle(csv_file=self.tempfile_path, workers=4)
+
+            mock_load.assert_called_once_with(self.tempfile_path, 4, DEFAULT_BATCH_SIZE, telemetry=self.command.telemetry)
+
+    def test_handle_with_workers_writes_merged_errors_to_stderr(self):
+        with patch('products.management.commands.load_products_data.load_csv_in_parallel', return_value=(1, [(3, 'fail')])):
+            with patch.object(self.command, 'stderr') as mock_stderr:
+                self.command.handle(csv_file=self.tempfile_path, workers=2, batch_size=10)
+
+                mock_stderr.write.assert_called_once_with('Skipped row 3: fail')
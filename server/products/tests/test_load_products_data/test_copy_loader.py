@@ -0,0 +1,122 @@
+from django.db import connection
+from django.test import TestCase
+from django.core.management.base import CommandError
+from products.copy_loader import load_csv_with_copy
+from products.management.commands.load_products_data import Command
+from products.models import Product, Tag, PriceSnapshot, CurrentPrice, StoreSKU
+from shops.models import Shop
+from decimal import Decimal
+from unittest import skipUnless
+from unittest.mock import patch, ANY
+import io
+from .csv_fixtures import CSVFileMixin, make_line
+
+
+class CopyLoaderTest(CSVFileMixin, TestCase):
+    def test_load_csv_with_copy_loads_products_shops_tags_and_snapshots(self):
+        self.write_csv(make_line('bananas', tags='banana fruit'), make_line('apples'))
+        processed_count, errors = load_csv_with_copy(self.csv_path)
+
+        self.assertEqual((processed_count, errors), (2, []))
+        self.assertEqual(Product.objects.count(), 2)
+        self.assertEqual(Shop.objects.count(), 1)
+        self.assertEqual(Tag.objects.count(), 2)
+        self.assertEqual(PriceSnapshot.objects.count(), 2)
+
+    def test_load_csv_with_copy_stores_parsed_snapshot_values(self):
+        self.write_csv(make_line('bananas', unit_price='$0.4967'))
+        load_csv_with_copy(self.csv_path)
+        snapshot = PriceSnapshot.objects.get()
+
+        self.assertEqual(snapshot.unit_price, Decimal('0.4967'))
+        self.assertEqual(str(snapshot.date), '2025-02-20')
+        self.assertEqual(snapshot.source, 'CSV input')
+
+    def test_load_csv_with_copy_stores_normalized_unit_price(self):
+        self.write_csv(make_line('bananas', unit='oz', unit_price='$1.00'))
+        load_csv_with_copy(self.csv_path)
+        snapshot = PriceSnapshot.objects.get()
+
+        self.assertEqual((snapshot.normalized_unit, snapshot.normalized_unit_price), ('kg', Decimal('35.2740')))
+
+    def test_load_csv_with_copy_resolves_store_name_variants_to_one_shop(self):
+        Shop.objects.create(name='Costco', address='Pearland')
+        self.write_csv(make_line('bananas', store_name='COSTCO #12'), make_line('apples', store_name='costco'))
+        load_csv_with_copy(self.csv_path)
+
+        self.assertEqual(Shop.objects.count(), 1)
+        self.assertEqual(PriceSnapshot.objects.values('shop').distinct().count(), 1)
+
+    def test_load_csv_with_copy_twice_does_not_duplicate_records(self):
+        self.write_csv(make_line('bananas'), make_line('bananas'))
+        load_csv_with_copy(self.csv_path)
+        load_csv_with_copy(self.csv_path)
+
+        self.assertEqual(Product.objects.count(), 1)
+        self.assertEqual(Shop.objects.count(), 1)
+        self.assertEqual(PriceSnapshot.objects.count(), 1)
+
+    def test_load_csv_with_copy_gives_product_the_tags_of_its_last_row(self):
+        self.write_csv(make_line('bananas', tags='banana fruit'), make_line('bananas', tags='banana yellow', unit_price='$2.00'))
+        load_csv_with_copy(self.csv_path)
+
+        self.assertEqual(sorted(tag.name for tag in Product.objects.get().tags.all()), ['banana', 'yellow'])
+
+    def test_load_csv_with_copy_keeps_price_of_last_row_as_current_price(self):
+        self.write_csv(make_line('bananas', unit_price='$1.49'), make_line('bananas', unit_price='$1.29'))
+        load_csv_with_copy(self.csv_path)
+
+        self.assertEqual(CurrentPrice.objects.get().unit_price, Decimal('1.29'))
+
+    def test_load_csv_with_copy_reloading_a_duplicate_leaves_current_price_alone(self):
+        self.write_csv(make_line('bananas', unit_price='$1.49'), make_line('bananas', unit_price='$1.29'))
+        load_csv_with_copy(self.csv_path)
+        self.write_csv(make_line('bananas', unit_price='$1.49'))
+        load_csv_with_copy(self.csv_path)
+
+        self.assertEqual(PriceSnapshot.objects.count(), 2)
+        self.assertEqual(CurrentPrice.objects.get().unit_price, Decimal('1.29'))
+
+    def test_load_csv_with_copy_points_sku_at_product_of_last_row(self):
+        self.write_csv(make_line('bananas'), make_line('organic bananas'))
+        load_csv_with_copy(self.csv_path)
+
+        self.assertEqual(StoreSKU.objects.get().product.name, 'organic bananas')
+
+    def test_load_csv_with_copy_reports_invalid_rows(self):
+        self.write_csv(make_line('bananas', unit='bad'), make_line('apples'))
+        processed_count, errors = load_csv_with_copy(self.csv_path)
+
+        self.assertEqual(processed_count, 1)
+        self.assertEqual([row_index for row_index, _ in errors], [2])
+
+    def test_load_csv_with_copy_falls_back_to_bulk_loader_outside_postgresql(self):
+        self.write_csv(make_line('bananas'))
+        with patch('products.copy_loader.connection') as mock_connection, \
+                patch('products.copy_loader._load_csv_with_bulk_loader', return_value=(1, [])) as mock_fallback:
+            mock_connection.vendor = 'sqlite'
+            load_csv_with_copy(self.csv_path, batch_size=10)
+
+            mock_fallback.assert_called_once_with(self.csv_path, 10, ANY)
+
+    @skipUnless(connection.vendor == 'postgresql', 'COPY is only available on PostgreSQL')
+    def test_load_csv_with_copy_drops_staging_table(self):
+        self.write_csv(make_line('bananas'))
+        load_csv_with_copy(self.csv_path)
+
+        self.assertFalse([table for table in connection.introspection.table_names() if table.startswith('products_import_staging_')])
+
+
+class CopyCommandTest(CSVFileMixin, TestCase):
+    def test_handle_with_copy_loads_csv_with_copy_loader(self):
+        self.write_csv(make_line('bananas'))
+        with patch('products.management.commands.load_products_data.load_csv_with_copy', return_value=(1, [])) as mock_load:
+            command = Command(stdout=io.StringIO())
+            command.handle(csv_file=self.csv_path, copy=True, batch_size=50)
+
+            mock_load.assert_called_once_with(self.csv_path, 50, telemetry=command.telemetry)
+
+    def test_copy_cannot_be_combined_with_workers(self):
+        self.write_csv(make_line('bananas'))
+        with self.assertRaises(CommandError):
+            Command().handle(csv_file=self.csv_path, copy=True, workers=2)
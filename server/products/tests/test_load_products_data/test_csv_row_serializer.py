@@ -142,3 +142,10 @@ class CSVRowSerializerTest(TestCase):
         price_snapshot = PriceSnapshot.objects.get(product=Product.objects.get(name=self.valid_row['product_name']))
 
         self.assertEqual(price_snapshot.source, 'CSV input')
+
+    def test_serializer_resolves_store_name_variants_to_one_shop(self):
+        self.serialize_and_save(self.valid_row)
+        self.serialize_and_save({**self.valid_row, 'store_name': 'COSTCO WHOLESALE PEARLAND #1222', 'date': '2/21/2025'})
+
+        self.assertEqual(Shop.objects.count(), 1)
+        self.assertEqual(PriceSnapshot.objects.values('shop').distinct().count(), 1)
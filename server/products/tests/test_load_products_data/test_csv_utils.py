@@ -0,0 +1,186 @@
+from django.test import TestCase, override_settings
+from django.core.management.base import CommandError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from products.csv_utils import download_default_csv, get_default_csv_path, get_cache_metadata_path, record_download, resolve_csv_path
+from products.management.commands.load_products_data import Command
+from products.models import PriceSnapshot
+from unittest.mock import patch
+import json
+import os
+import tempfile
+import threading
+from .csv_fixtures import HEADER, make_line
+
+LINE = make_line('bananas')
+
+
+class SheetStandIn(BaseHTTPRequestHandler):
+    """Serves one CSV body and answers conditional requests the way Google Sheets would."""
+    body = b''
+    etag = None
+    last_modified = None
+    status = 200
+    requests = []
+
+    def do_GET(self):
+        type(self).requests.append(dict(self.headers))
+        if self.status != 200:
+            self.send_response(self.status)
+            self.end_headers()
+            return
+
+        if self.etag and self.headers.get('If-None-Match') == self.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/csv')
+        self.send_header('Content-Length', str(len(self.body)))
+        if self.etag:
+            self.send_header('ETag', self.etag)
+        if self.last_modified:
+            self.send_header('Last-Modified', self.last_modified)
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        pass
+
+
+class DownloadDefaultCSVTest(TestCase):
+    def setUp(self):
+        self.base_dir = tempfile.TemporaryDirectory()
+        settings_override = override_settings(BASE_DIR=self.base_dir.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.handler = type('Handler', (SheetStandIn,), {'body': (HEADER + LINE).encode(), 'etag': '"v1"', 'requests': []})
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self.handler)
+        threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.01}, daemon=True).start()
+        self.url = f'http://127.0.0.1:{self.server.server_port}/export?format=csv'
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.base_dir.cleanup()
+
+    def download_and_import(self):
+        csv_path, changed = download_default_csv(self.url)
+        record_download(csv_path)
+        return csv_path, changed
+
+    def read_metadata(self):
+        with open(get_cache_metadata_path(get_default_csv_path())) as f:
+            return json.load(f)
+
+    def test_first_download_writes_csv_and_cache_metadata_once_imported(self):
+        csv_path, changed = download_default_csv(self.url)
+
+        self.assertTrue(changed)
+        with open(csv_path) as f:
+            self.assertEqual(f.read(), HEADER + LINE)
+        self.assertFalse(os.path.exists(get_cache_metadata_path(csv_path)))
+        record_download(csv_path)
+        self.assertEqual(self.read_metadata()['etag'], '"v1"')
+        self.assertEqual(self.read_metadata()['size'], len(HEADER + LINE))
+
+    def test_second_download_sends_etag_and_reports_unchanged_on_304(self):
+        self.download_and_import()
+        csv_path, changed = download_default_csv(self.url)
+
+        self.assertFalse(changed)
+        self.assertEqual(self.handler.requests[-1]['If-None-Match'], '"v1"')
+        self.assertTrue(os.path.exists(csv_path))
+
+    def test_download_sends_last_modified_when_server_provides_it(self):
+        self.handler.last_modified = 'Wed, 19 Feb 2025 10:00:00 GMT'
+        self.download_and_import()
+        download_default_csv(self.url)
+
+        self.assertEqual(self.handler.requests[-1]['If-Modified-Since'], 'Wed, 19 Feb 2025 10:00:00 GMT')
+
+    def test_download_without_etag_reports_unchanged_when_body_is_identical(self):
+        self.handler.etag = None
+        self.download_and_import()
+
+        self.assertFalse(download_default_csv(self.url)[1])
+
+    def test_download_replaces_cached_csv_when_sheet_changed(self):
+        self.download_and_import()
+        self.handler.etag = '"v2"'
+        self.handler.body = (HEADER + LINE + LINE.replace('bananas', 'apples')).encode()
+        csv_path, changed = self.download_and_import()
+
+        self.assertTrue(changed)
+        with open(csv_path) as f:
+            self.assertIn('apples', f.read())
+        self.assertEqual(self.read_metadata()['etag'], '"v2"')
+
+    def test_forced_download_sends_no_conditional_headers(self):
+        download_default_csv(self.url)
+        _, changed = download_default_csv(self.url, force=True)
+
+        self.assertTrue(changed)
+        self.assertNotIn('If-None-Match', self.handler.requests[-1])
+
+    def test_download_without_import_is_not_reported_unchanged_next_time(self):
+        download_default_csv(self.url)
+        _, changed = download_default_csv(self.url)
+
+        self.assertTrue(changed)
+        self.assertNotIn('If-None-Match', self.handler.requests[-1])
+
+    def test_download_ignores_metadata_when_cached_csv_is_missing(self):
+        self.download_and_import()
+        os.remove(get_default_csv_path())
+        _, changed = download_default_csv(self.url)
+
+        self.assertTrue(changed)
+        self.assertNotIn('If-None-Match', self.handler.requests[-1])
+
+    def test_failed_download_raises_command_error_and_keeps_cached_csv(self):
+        download_default_csv(self.url)
+        self.handler.status = 500
+
+        with self.assertRaises(CommandError):
+            download_default_csv(self.url, force=True)
+        self.assertTrue(os.path.exists(get_default_csv_path()))
+        self.assertFalse(os.path.exists(get_default_csv_path() + '.part'))
+
+    def test_resolve_csv_path_downloads_default_csv_when_no_path_given(self):
+        with patch('products.csv_utils.download_default_csv', return_value=('/tmp/receipts_data.csv', True)):
+            self.assertEqual(resolve_csv_path(), '/tmp/receipts_data.csv')
+
+    def test_handle_skips_import_when_default_csv_is_unchanged(self):
+        command = Command()
+        with patch('products.management.commands.load_products_data.download_default_csv', return_value=(get_default_csv_path(), False)), \
+                patch.object(command, 'stdout') as mock_stdout, patch.object(command, 'stderr') as mock_stderr:
+            command.handle(csv_file=None)
+
+        mock_stdout.write.assert_not_called()
+        mock_stderr.write.assert_called_with('Default CSV has not changed since the last download, nothing to load.')
+        self.assertEqual(PriceSnapshot.objects.count(), 0)
+
+    def test_handle_loads_default_csv_when_it_changed(self):
+        csv_path, _ = download_default_csv(self.url)
+        command = Command()
+        with patch('products.management.commands.load_products_data.download_default_csv', return_value=(csv_path, True)) as mock_download, \
+                patch.object(command, 'stdout'), patch.object(command, 'stderr'):
+            command.handle(csv_file=None, force_download=True)
+
+        mock_download.assert_called_once_with(force=True)
+        self.assertEqual(PriceSnapshot.objects.count(), 1)
+        self.assertEqual(self.read_metadata()['etag'], '"v1"')
+
+    def test_handle_does_not_record_download_when_import_fails(self):
+        csv_path, _ = download_default_csv(self.url)
+        command = Command()
+        with patch('products.management.commands.load_products_data.download_default_csv', return_value=(csv_path, True)), \
+                patch.object(command, '_load_csv', side_effect=RuntimeError('database went away')), \
+                patch.object(command, 'stdout'), patch.object(command, 'stderr'):
+            with self.assertRaises(RuntimeError):
+                command.handle(csv_file=None)
+
+        self.assertFalse(os.path.exists(get_cache_metadata_path(csv_path)))
+        self.assertTrue(download_default_csv(self.url)[1])
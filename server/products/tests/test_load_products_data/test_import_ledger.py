@@ -0,0 +1,165 @@
+from django.test import TestCase
+from django.core.management.base import CommandError
+from products.bulk_loader import BulkCSVLoader
+from products.import_ledger import hash_row, open_ledger, close_ledger
+from products.management.commands.load_products_data import Command
+from products.models import ImportLedger, ImportedRow, PriceSnapshot
+from unittest.mock import patch
+import json
+import os
+from .csv_fixtures import CSVFileMixin, make_line
+
+
+class ImportLedgerTest(CSVFileMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.write_csv(make_line('bananas'), make_line('apples'))
+
+    def make_row(self, product_name='bananas'):
+        return {'store_product_id': '1', 'date': '2/20/2025', 'product_name': product_name, 'tags': 'fruit', 'unit': 'lb', 'units_per_pack': '1', 'packs_bought': '1', 'sale_price': '$1.49', 'unit_price': '$1.49', 'store_name': 'Costco', 'store_location': 'Pearland'}
+
+    def test_hash_row_is_stable_for_same_content(self):
+        self.assertEqual(hash_row(self.make_row()), hash_row(self.make_row()))
+
+    def test_hash_row_changes_when_content_changes(self):
+        self.assertNotEqual(hash_row(self.make_row()), hash_row(self.make_row('apples')))
+
+    def test_open_ledger_creates_ledger_for_new_file_and_starts_from_beginning(self):
+        ledger, resume_after = open_ledger(self.csv_path)
+
+        self.assertEqual(ledger.source, os.path.abspath(self.csv_path))
+        self.assertEqual(resume_after, 0)
+        self.assertFalse(ledger.completed)
+
+    def test_open_ledger_returns_none_for_file_that_was_already_fully_imported(self):
+        ledger, _ = open_ledger(self.csv_path)
+        close_ledger(ledger)
+
+        self.assertEqual(open_ledger(self.csv_path), (None, 0))
+
+    def test_open_ledger_restarts_from_beginning_when_file_changed(self):
+        ledger, _ = open_ledger(self.csv_path)
+        ImportLedger.objects.filter(pk=ledger.pk).update(last_committed_row=3)
+        self.write_csv(make_line('bananas'), make_line('pears'))
+        ledger, resume_after = open_ledger(self.csv_path)
+
+        self.assertEqual(resume_after, 0)
+        self.assertEqual(ledger.last_committed_row, 0)
+
+    def test_open_ledger_resumes_interrupted_import_of_same_file(self):
+        ledger, _ = open_ledger(self.csv_path)
+        ImportLedger.objects.filter(pk=ledger.pk).update(last_committed_row=3)
+
+        self.assertEqual(open_ledger(self.csv_path)[1], 3)
+
+    def test_loader_with_ledger_records_row_hashes_and_last_committed_row(self):
+        ledger, _ = open_ledger(self.csv_path)
+        loader = BulkCSVLoader(ledger=ledger)
+        loader.add(2, self.make_row())
+        loader.add(3, self.make_row('apples'))
+        loader.flush()
+        ledger.refresh_from_db()
+
+        self.assertEqual(ImportedRow.objects.filter(ledger=ledger).count(), 2)
+        self.assertEqual(ledger.last_committed_row, 3)
+
+    def test_loader_with_ledger_skips_rows_committed_in_previous_run(self):
+        ledger, _ = open_ledger(self.csv_path)
+        first_loader = BulkCSVLoader(ledger=ledger)
+        first_loader.add(2, self.make_row())
+        first_loader.flush()
+        loader = BulkCSVLoader(ledger=ledger)
+        loader.add(2, self.make_row())
+        loader.add(3, self.make_row('apples'))
+
+        self.assertEqual(loader.skipped_count, 1)
+        self.assertEqual(len(loader.pending), 1)
+
+    def test_loader_with_ledger_does_not_record_rows_that_failed_validation(self):
+        ledger, _ = open_ledger(self.csv_path)
+        loader = BulkCSVLoader(ledger=ledger)
+        row = self.make_row()
+        row['unit'] = 'bad'
+        loader.add(2, row)
+        loader.flush()
+
+        self.assertEqual(ImportedRow.objects.count(), 0)
+
+
+class IncrementalCommandTest(ImportLedgerTest):
+    def run_command(self):
+        command = Command()
+        with patch.object(command, 'stdout') as mock_stdout, patch.object(command, 'stderr') as mock_stderr:
+            command.handle(csv_file=self.csv_path, incremental=True)
+        self.messages = [call.args[0] for call in mock_stderr.write.call_args_list]
+        return [call.args[0] for call in mock_stdout.write.call_args_list]
+
+    def summary(self, output):
+        return json.loads(output[-1])
+
+    def test_incremental_run_loads_all_rows_of_new_file(self):
+        output = self.run_command()
+
+        self.assertEqual(PriceSnapshot.objects.count(), 2)
+        self.assertEqual(self.summary(output)['rows_loaded'], 2)
+
+    def test_second_incremental_run_of_unchanged_file_loads_nothing(self):
+        self.run_command()
+        self.run_command()
+
+        self.assertIn('CSV is unchanged since the last import, nothing to load.', self.messages)
+
+    def test_incremental_run_of_changed_file_only_loads_new_rows(self):
+        self.run_command()
+        self.write_csv(make_line('bananas'), make_line('apples'), make_line('pears'))
+        output = self.run_command()
+
+        self.assertEqual(self.summary(output)['rows_loaded'], 1)
+        self.assertEqual(self.summary(output)['rows_skipped'], 2)
+        self.assertEqual(PriceSnapshot.objects.count(), 3)
+
+    def test_incremental_run_resumes_after_last_committed_row(self):
+        ledger, _ = open_ledger(self.csv_path)
+        ImportLedger.objects.filter(pk=ledger.pk).update(last_committed_row=2)
+        output = self.run_command()
+
+        self.assertIn('Resuming import after row 2.', self.messages)
+        self.assertEqual(len(output), 1)
+        self.assertEqual(PriceSnapshot.objects.get().product.name, 'apples')
+
+    def test_incremental_run_marks_ledger_completed(self):
+        self.run_command()
+
+        self.assertTrue(ImportLedger.objects.get().completed)
+
+    def test_incremental_run_with_rejected_rows_retries_them_on_the_next_run(self):
+        self.write_csv(make_line('bananas'), make_line('apples', unit_price='not a price'))
+        self.run_command()
+        ledger = ImportLedger.objects.get()
+        self.assertFalse(ledger.completed)
+        self.assertEqual(ledger.last_committed_row, 0)
+
+        with patch.object(BulkCSVLoader, 'add', autospec=True, side_effect=BulkCSVLoader.add) as add:
+            output = self.run_command()
+
+        self.assertNotIn('CSV is unchanged since the last import, nothing to load.', self.messages)
+        self.assertEqual(add.call_count, 2)
+        self.assertEqual(self.summary(output)['rows_skipped'], 1)
+
+    def test_run_resumed_after_a_crash_retries_rows_the_crashed_run_rejected(self):
+        self.write_csv(make_line('bananas', unit_price='not a price'), make_line('apples'))
+        with patch('products.management.commands.load_products_data.close_ledger', side_effect=RuntimeError('crash')):
+            with self.assertRaises(RuntimeError):
+                self.run_command()
+        self.run_command()
+        ledger = ImportLedger.objects.get()
+
+        self.assertIn('Resuming import after row 3.', self.messages)
+        self.assertEqual((ledger.completed, ledger.last_committed_row, ledger.had_rejections), (False, 0, False))
+        with patch.object(BulkCSVLoader, 'add', autospec=True, side_effect=BulkCSVLoader.add) as add:
+            self.run_command()
+        self.assertEqual(add.call_count, 2)
+
+    def test_incremental_cannot_be_combined_with_workers(self):
+        with self.assertRaises(CommandError):
+            Command().handle(csv_file=self.csv_path, incremental=True, workers=2)
@@ -0,0 +1,149 @@
+from django.test import TestCase
+from products.ingest_telemetry import IngestTelemetry, count_csv_rows, describe_error, table_counts
+from products.management.commands.load_products_data import Command
+from products.models import PriceSnapshot
+from rest_framework.exceptions import ErrorDetail, ValidationError
+from unittest.mock import patch
+import csv
+import io
+import json
+import os
+from .csv_fixtures import CSVFileMixin, make_line
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class IngestTelemetryTest(TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.lines = []
+
+    def make_telemetry(self, **kwargs):
+        return IngestTelemetry(write=self.lines.append, clock=self.clock, **kwargs)
+
+    def read_slowly(self, rows, seconds_per_row):
+        for row in rows:
+            self.clock.now += seconds_per_row
+            yield row
+
+    def test_stage_accumulates_elapsed_time_per_stage(self):
+        telemetry = self.make_telemetry()
+        for _ in range(2):
+            with telemetry.stage('validate'):
+                self.clock.now += 1.5
+
+        self.assertEqual(telemetry.stage_seconds, {'parse': 0.0, 'validate': 3.0, 'write': 0.0})
+
+    def test_read_rows_counts_rows_and_charges_reading_to_parse_stage(self):
+        telemetry = self.make_telemetry()
+        rows = list(telemetry.read_rows(self.read_slowly(range(4), 0.5)))
+
+        self.assertEqual(rows, [0, 1, 2, 3])
+        self.assertEqual(telemetry.rows_read, 4)
+        self.assertEqual(telemetry.stage_seconds['parse'], 2.0)
+
+    def test_read_rows_reports_rate_and_eta_once_per_interval(self):
+        telemetry = self.make_telemetry(total_rows=100, interval=5)
+        list(telemetry.read_rows(self.read_slowly(range(40), 0.25)))
+
+        self.assertEqual(self.lines, ['20/100 rows read (20.0%), 4 rows/s, ETA 0:00:20', '40/100 rows read (40.0%), 4 rows/s, ETA 0:00:15'])
+
+    def test_read_rows_reports_without_eta_when_total_is_unknown(self):
+        telemetry = self.make_telemetry(interval=1)
+        list(telemetry.read_rows(self.read_slowly(range(2), 1)))
+
+        self.assertEqual(self.lines, ['1 rows read, 1 rows/s', '2 rows read, 1 rows/s'])
+
+    def test_read_rows_does_not_report_when_interval_is_zero(self):
+        telemetry = self.make_telemetry(interval=0)
+        list(telemetry.read_rows(self.read_slowly(range(5), 10)))
+
+        self.assertEqual(self.lines, [])
+
+    def test_reject_writes_row_and_structured_reason_to_error_file(self):
+        error_file = io.StringIO()
+        telemetry = self.make_telemetry(error_file=error_file)
+        telemetry.reject(3, ValidationError({'unit': [ErrorDetail('This field may not be blank.', code='blank')]}))
+
+        rows = list(csv.reader(io.StringIO(error_file.getvalue())))
+        self.assertEqual(rows, [['row', 'error'], ['3', '{"unit": ["This field may not be blank."]}']])
+        self.assertEqual(telemetry.rows_rejected, 1)
+
+    def test_reject_without_error_file_uses_write_error(self):
+        errors = []
+        telemetry = IngestTelemetry(write_error=errors.append)
+        telemetry.reject(3, Exception('fail'))
+
+        self.assertEqual(errors, ['Skipped row 3: fail'])
+
+    def test_describe_error_falls_back_to_message_for_other_exceptions(self):
+        self.assertEqual(describe_error(ValueError('Invalid unit')), 'Invalid unit')
+
+    def test_table_counts_uses_a_single_query(self):
+        with self.assertNumQueries(1):
+            counts = table_counts()
+
+        self.assertEqual(counts, {'products': 0, 'price_snapshots': 0, 'shops': 0, 'tags': 0})
+
+    def test_summary_reports_rows_stage_times_and_table_totals(self):
+        telemetry = self.make_telemetry()
+        list(telemetry.read_rows(self.read_slowly(range(8), 0.125)))
+        telemetry.reject(2, Exception('fail'))
+        summary = telemetry.summary(rows_loaded=7)
+
+        self.assertEqual(summary['rows_read'], 8)
+        self.assertEqual(summary['rows_loaded'], 7)
+        self.assertEqual(summary['rows_rejected'], 1)
+        self.assertEqual(summary['rows_per_sec'], 8.0)
+        self.assertEqual(summary['stage_seconds']['parse'], 1.0)
+        self.assertEqual(summary['totals']['products'], 0)
+
+
+class CommandTelemetryTest(CSVFileMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.error_path = os.path.join(self.output_dir.name, 'errors.csv')
+        self.write_csv(make_line('bananas'), make_line('apples', unit='bad'), make_line('pears'))
+
+    def run_command(self, **options):
+        command = Command()
+        with patch.object(command, 'stdout') as mock_stdout, patch.object(command, 'stderr') as mock_stderr:
+            command.handle(csv_file=self.csv_path, **options)
+        return [call.args[0] for call in mock_stdout.write.call_args_list], [call.args[0] for call in mock_stderr.write.call_args_list]
+
+    def test_count_csv_rows_excludes_header(self):
+        self.assertEqual(count_csv_rows(self.csv_path), 3)
+
+    def test_handle_prints_only_json_summary_on_stdout(self):
+        stdout, _ = self.run_command()
+        summary = json.loads(stdout[0])
+
+        self.assertEqual(len(stdout), 1)
+        self.assertEqual((summary['rows_read'], summary['rows_loaded'], summary['rows_rejected']), (3, 2, 1))
+        self.assertEqual(summary['totals']['price_snapshots'], PriceSnapshot.objects.count())
+
+    def test_process_row_times_validate_and_write_stages(self):
+        clock = FakeClock()
+        command = Command()
+        command.telemetry = IngestTelemetry(clock=clock)
+        with patch('products.management.commands.load_products_data.CSVRowSerializer') as mock_serializer:
+            mock_serializer.return_value.is_valid.side_effect = lambda **kwargs: setattr(clock, 'now', clock.now + 1)
+            mock_serializer.return_value.save.side_effect = lambda: setattr(clock, 'now', clock.now + 2)
+            command.process_row({})
+
+        self.assertEqual(command.telemetry.stage_seconds, {'parse': 0.0, 'validate': 1.0, 'write': 2.0})
+
+    def test_handle_with_error_file_writes_rejected_rows_there_instead_of_stderr(self):
+        _, stderr = self.run_command(batch_size=10, error_file=self.error_path)
+        with open(self.error_path) as f:
+            rows = list(csv.reader(f))
+
+        self.assertEqual(stderr, [])
+        self.assertEqual([row[0] for row in rows], ['row', '3'])
+        self.assertIn('Invalid unit', rows[1][1])
@@ -0,0 +1,98 @@
+from django.test import TestCase
+from products.parallel_loader import partition_for, partition_csv, load_csv_in_parallel, ROW_INDEX_FIELD
+from products.models import Product, PriceSnapshot
+from shops.models import Shop
+from unittest.mock import patch
+import csv
+import os
+from .csv_fixtures import CSVFileMixin, make_line
+
+
+class InlineExecutor:
+    def __init__(self, max_workers, initializer):
+        self.max_workers = max_workers
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def map(self, fn, *iterables):
+        return map(fn, *iterables)
+
+
+class ParallelLoaderTest(CSVFileMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        # Worker processes cannot see the test transaction, so partitions run in-process by default.
+        self._writers_patch = patch('products.parallel_loader._supports_concurrent_writers', return_value=False)
+        self._writers_patch.start()
+
+    def tearDown(self):
+        self._writers_patch.stop()
+
+    def read_partition(self, path):
+        with open(path) as f:
+            return list(csv.DictReader(f))
+
+    def test_partition_for_is_stable_and_within_range(self):
+        self.assertEqual(partition_for('bananas', 4), partition_for('bananas', 4))
+        self.assertTrue(all(0 <= partition_for(f'product {i}', 4) < 4 for i in range(100)))
+
+    def test_partition_for_ignores_surrounding_whitespace(self):
+        self.assertEqual(partition_for(' bananas ', 8), partition_for('bananas', 8))
+
+    def test_partition_csv_writes_one_file_per_worker(self):
+        self.write_csv(make_line('bananas'))
+        paths, _ = partition_csv(self.csv_path, 3, self.output_dir.name)
+
+        self.assertEqual(len(paths), 3)
+        self.assertTrue(all(os.path.exists(path) for path in paths))
+
+    def test_partition_csv_keeps_rows_of_same_product_together_with_original_row_index(self):
+        self.write_csv(make_line('bananas'), make_line('apples'), make_line('bananas', date='2/21/2025'))
+        paths, _ = partition_csv(self.csv_path, 4, self.output_dir.name)
+        rows = self.read_partition(paths[partition_for('bananas', 4)])
+        banana_rows = [row for row in rows if row['product_name'] == 'bananas']
+
+        self.assertEqual([row[ROW_INDEX_FIELD] for row in banana_rows], ['2', '4'])
+
+    def test_partition_csv_collects_distinct_shop_keys(self):
+        self.write_csv(make_line('bananas'), make_line('apples'), make_line('pears', store_name='HEB'))
+        _, shop_keys = partition_csv(self.csv_path, 2, self.output_dir.name)
+
+        self.assertEqual(shop_keys, {('Costco', 'Pearland'), ('HEB', 'Pearland')})
+
+    def test_load_csv_in_parallel_loads_all_partitions(self):
+        self.write_csv(*[make_line(f'product {i}') for i in range(10)])
+        processed_count, errors = load_csv_in_parallel(self.csv_path, 3, batch_size=2)
+
+        self.assertEqual(processed_count, 10)
+        self.assertEqual(errors, [])
+        self.assertEqual(Product.objects.count(), 10)
+        self.assertEqual(PriceSnapshot.objects.count(), 10)
+
+    def test_load_csv_in_parallel_creates_shared_shop_once(self):
+        self.write_csv(*[make_line(f'product {i}') for i in range(10)])
+        load_csv_in_parallel(self.csv_path, 3)
+
+        self.assertEqual(Shop.objects.count(), 1)
+
+    def test_load_csv_in_parallel_returns_merged_errors_sorted_by_row_index(self):
+        self.write_csv(make_line('bananas', unit='bad'), make_line('apples'), make_line('pears', unit='bad'))
+        processed_count, errors = load_csv_in_parallel(self.csv_path, 3)
+
+        self.assertEqual(processed_count, 1)
+        self.assertEqual([row_index for row_index, _ in errors], [2, 4])
+        self.assertTrue(all(isinstance(message, str) for _, message in errors))
+
+    def test_load_csv_in_parallel_uses_process_pool_when_database_supports_concurrent_writers(self):
+        self.write_csv(*[make_line(f'product {i}') for i in range(4)])
+        with patch('products.parallel_loader._supports_concurrent_writers', return_value=True), \
+                patch('products.parallel_loader.ProcessPoolExecutor', InlineExecutor), \
+                patch('products.parallel_loader.connections') as mock_connections:
+            processed_count, _ = load_csv_in_parallel(self.csv_path, 2)
+
+            mock_connections.close_all.assert_called_once()
+        self.assertEqual(processed_count, 4)
@@ -0,0 +1,103 @@
+from django.test import TestCase, override_settings
+from products.matching import ProductMatcher, normalize_item, item_grams, match_receipt_items, product_matcher
+from products.models import Product, Tag, ProductTag
+
+
+class NormalizationTest(TestCase):
+    def test_normalize_item_drops_case_and_punctuation(self):
+        self.assertEqual(normalize_item('Beef Ground (90/10)'), 'beef ground 90 10')
+        self.assertEqual(normalize_item(None), '')
+
+    def test_item_grams_pad_each_word(self):
+        self.assertEqual(item_grams('ab cd'), {' ab', 'ab ', ' cd', 'cd '})
+
+
+class ProductMatcherTest(TestCase):
+    def setUp(self):
+        self.matcher = ProductMatcher()
+        self.beef = Product.objects.create(name='Ground Beef 90/10')
+        self.bananas = Product.objects.create(name='Bananas')
+
+    def test_receipt_item_variants_match_their_product_first(self):
+        results = self.matcher.match(['Beef Ground (90/10)', 'KS ORGANIC BANANAS', 'bananas'])
+
+        self.assertEqual([matches[0][0] for matches in results], [self.beef.id, self.bananas.id, self.bananas.id])
+        self.assertEqual(results[0][0], (self.beef.id, 'Ground Beef 90/10', 95.0))
+
+    def test_items_without_a_good_enough_match_get_none(self):
+        self.assertEqual(self.matcher.match(['Paper Towels', '']), [[], []])
+
+    def test_limit_keeps_the_best_matches_oldest_first_among_equals(self):
+        older = Product.objects.create(name='Banana Chips')
+        newer = Product.objects.create(name='Banana Bread')
+
+        results = self.matcher.match(['banana'], limit=3)
+
+        self.assertEqual(results, [[(self.bananas.id, 'Bananas', 92.31), (older.id, 'Banana Chips', 90.0), (newer.id, 'Banana Bread', 90.0)]])
+
+    @override_settings(PRODUCT_MATCH_MIN_SCORE=100)
+    def test_min_score_limits_how_different_a_match_may_be(self):
+        self.assertEqual(self.matcher.match(['Banana']), [[]])
+
+    def test_tags_widen_the_candidates(self):
+        ProductTag.objects.create(product=self.beef, tag=Tag.objects.create(name='hamburger'))
+        self.matcher.refresh()
+
+        candidates = self.matcher._candidates(normalize_item('HAMBURGER MEAT'))
+
+        self.assertEqual([self.matcher.ids[position] for position in candidates], [self.beef.id])
+
+    def test_products_created_after_first_match_are_found(self):
+        self.matcher.match(['Bananas'])
+        apples = Product.objects.create(name='Gala Apples')
+
+        self.assertEqual(self.matcher.match(['GALA APPLES'])[0][0][0], apples.id)
+
+    def test_refresh_reloads_after_products_are_deleted(self):
+        self.matcher.refresh()
+        self.bananas.delete()
+
+        self.assertEqual(self.matcher.match(['Bananas']), [[]])
+        self.assertEqual(self.matcher.ids, [self.beef.id])
+
+    def test_unchanged_tables_cost_one_query_per_table_and_reuse_cached_results(self):
+        self.matcher.match(['Bananas'])
+        self.matcher.cache[('bananas', 5, 70.0)] = [('cached', 'Bananas', 100.0)]
+
+        with self.assertNumQueries(2):
+            results = self.matcher.match(['BANANAS!'])
+
+        self.assertEqual(results, [[('cached', 'Bananas', 100.0)]])
+
+    def test_new_products_clear_cached_results(self):
+        self.matcher.match(['Bananas'])
+        self.matcher.cache[('bananas', 5, 70.0)] = [('cached', 'Bananas', 100.0)]
+        Product.objects.create(name='Plantains')
+
+        self.assertEqual(self.matcher.match(['Bananas'])[0][0][0], self.bananas.id)
+
+
+class MatchReceiptItemsTest(TestCase):
+    def setUp(self):
+        product_matcher.clear()
+        self.addCleanup(product_matcher.clear)
+
+    def test_matches_every_item_of_a_receipt_in_order(self):
+        beef = Product.objects.create(name='Ground Beef 90/10')
+        receipt = {'items': [{'item': 'Beef Ground (90/10)', 'quantity': 1.5}, {'item': 'Zzzz'}, 'not an item']}
+
+        self.assertEqual(match_receipt_items(receipt), [
+            {'item': 'Beef Ground (90/10)', 'matches': [{'product_id': beef.id, 'name': 'Ground Beef 90/10', 'score': 95.0}]},
+            {'item': 'Zzzz', 'matches': []},
+        ])
+
+    def test_item_names_that_are_not_strings_are_matched_as_text(self):
+        milk = Product.objects.create(name='2% Milk')
+
+        self.assertEqual(match_receipt_items({'items': [{'item': 2}, {'item': None}]}), [
+            {'item': '2', 'matches': [{'product_id': milk.id, 'name': '2% Milk', 'score': 90.0}]},
+            {'item': '', 'matches': []},
+        ])
+
+    def test_receipt_without_items_has_no_matches(self):
+        self.assertEqual(match_receipt_items({}), [])
@@ -0,0 +1,140 @@
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase
+from core.models import User
+from orders.models import Order, OrderItem
+from products.models import Product, PriceSnapshot
+from products.partitions import (
+    TABLE, DEFAULT_PARTITION, PartitioningError, add_months, is_partitioned, list_partitions,
+    partition_price_snapshots, create_partitions, detach_partitions,
+)
+from shops.models import Shop
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from unittest import skipIf, skipUnless
+
+
+class MonthArithmeticTest(TestCase):
+    def test_add_months_rolls_over_year_and_returns_first_of_month(self):
+        self.assertEqual(add_months(date(2025, 11, 15), 3), date(2026, 2, 1))
+
+
+@skipIf(connection.vendor == 'postgresql', 'PostgreSQL supports partitioning')
+class PartitioningUnsupportedTest(TestCase):
+    def test_command_refuses_to_partition_outside_postgresql(self):
+        with self.assertRaises(CommandError):
+            call_command('price_snapshot_partitions', partition=True, stdout=StringIO())
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Partitioning is only available on PostgreSQL')
+class PriceSnapshotPartitionsTest(TestCase):
+    today = date(2025, 3, 10)
+
+    def setUp(self):
+        self.product = Product.objects.create(name="Bananas")
+        self.shop = Shop.objects.create(name="Costco", address="Pearland")
+        self.snapshots = [
+            PriceSnapshot.objects.create(product=self.product, shop=self.shop, unit_price='1.49', date=date(2025, 1, 20)),
+            PriceSnapshot.objects.create(product=self.product, shop=self.shop, unit_price='1.29', date=date(2025, 2, 20)),
+        ]
+
+    def partition_rows(self, partition):
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT count(*) FROM {connection.ops.quote_name(partition)}')
+            return cursor.fetchone()[0]
+
+    def test_partitioning_creates_monthly_partitions_from_oldest_snapshot_to_months_ahead(self):
+        partition_price_snapshots(months_ahead=1, today=self.today)
+
+        self.assertTrue(is_partitioned())
+        self.assertEqual([name for name, _, _ in list_partitions()], [f'{TABLE}_p2025_01', f'{TABLE}_p2025_02', f'{TABLE}_p2025_03', f'{TABLE}_p2025_04'])
+        self.assertEqual(self.partition_rows(f'{TABLE}_p2025_01'), 1)
+
+    def test_orm_reads_and_writes_work_unchanged_after_partitioning(self):
+        partition_price_snapshots(months_ahead=0, today=self.today)
+        created = PriceSnapshot.objects.create(product=self.product, shop=self.shop, unit_price='1.19', date=date(2025, 3, 1))
+
+        self.assertGreater(created.id, self.snapshots[-1].id)
+        self.assertEqual(PriceSnapshot.objects.get(id=self.snapshots[0].id).unit_price, Decimal('1.49'))
+        self.assertEqual([snapshot.date for snapshot in PriceSnapshot.objects.all()], [date(2025, 3, 1), date(2025, 2, 20), date(2025, 1, 20)])
+        PriceSnapshot.objects.bulk_create([PriceSnapshot(product=self.product, shop=self.shop, unit_price='1.29', date=date(2025, 2, 20))], ignore_conflicts=True)
+        self.assertEqual(PriceSnapshot.objects.count(), 3)
+
+    def test_rows_outside_partitions_land_in_default_partition_until_their_partition_is_created(self):
+        partition_price_snapshots(months_ahead=0, today=self.today)
+        PriceSnapshot.objects.create(product=self.product, shop=self.shop, unit_price='1.19', date=date(2025, 5, 2))
+        self.assertEqual(self.partition_rows(DEFAULT_PARTITION), 1)
+
+        created = create_partitions(months_ahead=2, today=self.today)
+
+        self.assertEqual(created, [f'{TABLE}_p2025_04', f'{TABLE}_p2025_05'])
+        self.assertEqual((self.partition_rows(DEFAULT_PARTITION), self.partition_rows(f'{TABLE}_p2025_05')), (0, 1))
+
+    def test_detaching_old_partitions_hides_their_rows(self):
+        partition_price_snapshots(months_ahead=0, today=self.today)
+
+        self.assertEqual(detach_partitions(date(2025, 2, 1)), [f'{TABLE}_p2025_01'])
+        self.assertEqual(list(PriceSnapshot.objects.values_list('unit_price', flat=True)), [Decimal('1.29')])
+        self.assertEqual(self.partition_rows(f'{TABLE}_p2025_01'), 1)
+
+    def check_deferred_constraints(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+            cursor.execute('SET CONSTRAINTS ALL DEFERRED')
+
+    def create_order_item(self, **fields):
+        order = Order.objects.create(ordered_by=User.objects.create_user(username=f'shopper{Order.objects.count()}'))
+        return OrderItem.objects.create(order=order, quantity='1', **fields)
+
+    def test_order_item_foreign_key_is_still_enforced_after_partitioning(self):
+        self.create_order_item(price_snapshot=self.snapshots[0])
+        partition_price_snapshots(months_ahead=0, today=self.today)
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.create_order_item(price_snapshot_id=10 ** 9)
+            self.check_deferred_constraints()
+        with self.assertRaises(IntegrityError), transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {TABLE} WHERE id = %s', [self.snapshots[0].id])
+            self.check_deferred_constraints()
+
+    def test_orm_cascades_and_date_changes_still_pass_the_foreign_key_after_partitioning(self):
+        item = self.create_order_item(price_snapshot=self.snapshots[0])
+        partition_price_snapshots(months_ahead=0, today=self.today)
+
+        PriceSnapshot.objects.filter(id=self.snapshots[0].id).update(date=date(2025, 2, 1))
+        self.check_deferred_constraints()
+        self.snapshots[0].delete()
+        self.check_deferred_constraints()
+
+        self.assertFalse(OrderItem.objects.filter(id=item.id).exists())
+
+    def test_detaching_partition_with_referenced_snapshots_is_refused(self):
+        self.create_order_item(price_snapshot=self.snapshots[0])
+        partition_price_snapshots(months_ahead=0, today=self.today)
+
+        with self.assertRaises(PartitioningError):
+            detach_partitions(date(2025, 2, 1))
+        self.assertEqual(PriceSnapshot.objects.count(), 2)
+
+    def test_partitioning_twice_is_refused(self):
+        partition_price_snapshots(months_ahead=0, today=self.today)
+
+        with self.assertRaises(PartitioningError):
+            partition_price_snapshots(months_ahead=0, today=self.today)
+
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Partitioning is only available on PostgreSQL')
+class PriceSnapshotPartitionsCommandTest(TestCase):
+    def test_command_partitions_empty_table_from_current_month_and_lists_partitions(self):
+        stdout = StringIO()
+        call_command('price_snapshot_partitions', partition=True, months_ahead=0, stdout=stdout)
+        month = date.today().replace(day=1)
+
+        self.assertIn(f'{TABLE}_p{month:%Y_%m}: {month} to {add_months(month, 1)}', stdout.getvalue())
+
+    def test_command_refuses_to_create_partitions_before_table_is_partitioned(self):
+        with self.assertRaises(CommandError):
+            call_command('price_snapshot_partitions', create=True, stdout=StringIO())
@@ -0,0 +1,85 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from products.models import Product, PriceSnapshot
+from shops.models import Shop
+from datetime import date
+from decimal import Decimal
+
+
+class PriceHistoryViewTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.product = Product.objects.create(name="Bananas")
+        self.costco = Shop.objects.create(name="Costco", address="Pearland")
+        self.heb = Shop.objects.create(name="HEB", address="Houston")
+        self.url = reverse('product-price-history', args=[self.product.id])
+
+    def snapshot(self, unit_price, day, month=2, shop=None, unit='lb'):
+        return PriceSnapshot.objects.create(
+            product=self.product, shop=shop or self.costco, unit=unit, unit_price=unit_price, date=date(2025, month, day)
+        )
+
+    def history(self, **params):
+        response = self.client.get(self.url, params)
+        return response.data['results']
+
+    def test_daily_buckets_aggregate_snapshots_of_the_same_day(self):
+        self.snapshot('1.00', 20)
+        self.snapshot('2.00', 20, shop=self.heb)
+        self.snapshot('1.50', 21)
+
+        self.assertEqual(self.history(), [
+            {'date': '2025-02-20', 'unit': 'lb', 'count': 2, 'min': Decimal('1.0000'), 'avg': Decimal('1.5000'), 'max': Decimal('2.0000'), 'last': Decimal('2.0000')},
+            {'date': '2025-02-21', 'unit': 'lb', 'count': 1, 'min': Decimal('1.5000'), 'avg': Decimal('1.5000'), 'max': Decimal('1.5000'), 'last': Decimal('1.5000')},
+        ])
+
+    def test_monthly_buckets_report_last_price_of_the_month(self):
+        self.snapshot('1.00', 28)
+        self.snapshot('3.00', 1)
+        self.snapshot('2.00', 5, month=3)
+
+        self.assertEqual(
+            [(bucket['date'], bucket['count'], bucket['last']) for bucket in self.history(bucket='month')],
+            [('2025-02-01', 2, Decimal('1.0000')), ('2025-03-01', 1, Decimal('2.0000'))],
+        )
+
+    def test_weekly_buckets_start_on_monday(self):
+        self.snapshot('1.00', 17)
+        self.snapshot('2.00', 23)
+        self.snapshot('3.00', 24)
+
+        self.assertEqual([bucket['date'] for bucket in self.history(bucket='week')], ['2025-02-17', '2025-02-24'])
+
+    def test_buckets_keep_units_apart(self):
+        self.snapshot('1.00', 20, unit='lb')
+        self.snapshot('0.25', 20, unit='each')
+
+        self.assertEqual([(bucket['unit'], bucket['max']) for bucket in self.history()], [('each', Decimal('0.2500')), ('lb', Decimal('1.0000'))])
+
+    def test_history_can_be_limited_to_date_range_and_shop(self):
+        self.snapshot('1.00', 10)
+        self.snapshot('2.00', 20)
+        self.snapshot('3.00', 20, shop=self.heb)
+        self.snapshot('4.00', 28)
+
+        history = self.history(since='2025-02-15', until='2025-02-25', shop=self.costco.id)
+        self.assertEqual([(bucket['date'], bucket['max']) for bucket in history], [('2025-02-20', Decimal('2.0000'))])
+
+    def test_history_rejects_unknown_bucket_and_reversed_range(self):
+        self.assertEqual(self.client.get(self.url, {'bucket': 'year'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {'since': '2025-03-01', 'until': '2025-02-01'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_history_returns_not_found_if_product_does_not_exist(self):
+        response = self.client.get(reverse('product-price-history', args=[999]))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(PRODUCT_DETAIL_SNAPSHOT_LIMIT=2)
+    def test_detail_view_returns_only_most_recent_snapshots(self):
+        for day in range(1, 6):
+            self.snapshot(f'{day}.00', day)
+        response = self.client.get(reverse('product', args=[self.product.id]))
+
+        self.assertEqual([snapshot['date'] for snapshot in response.data['price_snapshots']], ['2025-02-05', '2025-02-04'])
@@ -0,0 +1,59 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from products.models import Product, Tag, ProductTag, PriceSnapshot
+from products.serializers import ProductListSerializer, ProductDetailSerializer
+from shops.models import Shop
+
+
+class FastReadPathTest(TestCase):
+    """The list and detail views skip the serializers but must render exactly what they would."""
+
+    def setUp(self):
+        self.client = APIClient()
+        shop = Shop.objects.create(name="Costco", address="Pearland")
+        tags = [Tag.objects.create(name=name) for name in ("fruit", "bio", "süß")]
+        self.products = []
+        for name, prices in (("Bananas", ['0.4967', '1.5']), ("Äpfel   Honeycrisp", ['10', '2.25']), ("Kiwi", [])):
+            product = Product.objects.create(name=name)
+            product.tags.set(tags[:len(self.products) + 1])
+            for day, price in enumerate(prices, start=1):
+                PriceSnapshot.objects.create(product=product, shop=shop if day == 1 else None, unit_price=price, date=f'2025-02-0{day}')
+            self.products.append(product)
+
+    def render(self, data):
+        return JSONRenderer().render(data)
+
+    def test_list_renders_same_bytes_as_list_serializer(self):
+        expected = {'next': None, 'previous': None, 'results': ProductListSerializer(Product.objects.order_by('id'), many=True).data}
+
+        self.assertEqual(self.client.get(reverse('products'), HTTP_ACCEPT='application/json').content, self.render(expected))
+
+    def test_detail_renders_same_bytes_as_detail_serializer(self):
+        for product in self.products:
+            response = self.client.get(reverse('product', args=[product.id]), HTTP_ACCEPT='application/json')
+
+            self.assertEqual(response.content, self.render(ProductDetailSerializer(product).data))
+
+    @override_settings(PRODUCT_DETAIL_SNAPSHOT_LIMIT=1)
+    def test_detail_serializer_keeps_the_same_snapshot_limit(self):
+        product = self.products[0]
+        response = self.client.get(reverse('product', args=[product.id]), HTTP_ACCEPT='application/json')
+
+        self.assertEqual(len(response.data['price_snapshots']), 1)
+        self.assertEqual(response.content, self.render(ProductDetailSerializer(product).data))
+
+    def test_tags_come_in_id_order(self):
+        product = Product.objects.create(name="Plantains")
+        ProductTag.objects.bulk_create([ProductTag(product=product, tag=tag) for tag in Tag.objects.order_by('-id')])
+
+        self.assertEqual([tag['name'] for tag in self.client.get(reverse('product', args=[product.id])).data['tags']], ["fruit", "bio", "süß"])
+
+    def test_search_results_keep_tags_of_each_product(self):
+        response = self.client.get(reverse('products'), {'search': 'bio'})
+
+        self.assertEqual(
+            {product['name']: [tag['name'] for tag in product['tags']] for product in response.data['results']},
+            {"Äpfel   Honeycrisp": ["fruit", "bio"], "Kiwi": ["fruit", "bio", "süß"]},
+        )
@@ -0,0 +1,124 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from products.bulk_loader import BulkCSVLoader
+from products.models import Product, Tag
+from products.search import get_search_backend, SubstringSearchBackend
+from unittest import skipUnless
+
+
+class ProductSearchBackendTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('products')
+
+    def create_product(self, name, *tag_names):
+        product = Product.objects.create(name=name)
+        product.tags.set([Tag.objects.get_or_create(name=tag_name)[0] for tag_name in tag_names])
+        return product
+
+    def search(self, query, **params):
+        response = self.client.get(self.url, {'search': query, **params})
+        return [product['name'] for product in response.data['results']]
+
+    def test_search_matches_substring_of_product_name(self):
+        self.create_product("Honeycrisp Apples", "fruit")
+
+        self.assertEqual(self.search('crisp'), ["Honeycrisp Apples"])
+
+    def test_search_matches_substring_of_tag_name(self):
+        self.create_product("Cheddar", "cheese")
+
+        self.assertEqual(self.search('chee'), ["Cheddar"])
+
+    def test_search_with_short_term_matches_substring(self):
+        self.create_product("Kiwi", "fruit")
+        self.create_product("Milk", "dairy")
+
+        self.assertEqual(self.search('ki'), ["Kiwi"])
+
+    def test_search_requires_every_term_to_match(self):
+        self.create_product("Opal Apples", "fruit")
+        self.create_product("Opal Juice", "drink")
+
+        self.assertEqual(self.search('opal fruit'), ["Opal Apples"])
+
+    def test_search_treats_like_wildcards_literally(self):
+        self.create_product("Milk", "dairy")
+
+        self.assertEqual(self.search('%'), [])
+        self.assertEqual(self.search('_'), [])
+
+    def test_search_ranks_name_matches_above_tag_matches(self):
+        self.create_product("Apple Juice Box", "drink")
+        self.create_product("Cider", "apple")
+        self.create_product("Apple", "fruit")
+
+        self.assertEqual(self.search('apple')[-1], "Cider")
+
+    def test_search_index_follows_tag_changes(self):
+        product = self.create_product("Brie", "cheese")
+        product.tags.set([Tag.objects.create(name="soft")])
+
+        self.assertEqual(self.search('cheese'), [])
+        self.assertEqual(self.search('soft'), ["Brie"])
+
+    def test_search_index_follows_tag_and_product_renames(self):
+        product = self.create_product("Brie", "cheese")
+        Tag.objects.filter(name="cheese").update(name="fromage")
+        Product.objects.filter(pk=product.pk).update(name="Camembert")
+
+        self.assertEqual(self.search('fromage'), ["Camembert"])
+        self.assertEqual(self.search('brie'), [])
+
+    def test_search_index_drops_deleted_products(self):
+        self.create_product("Brie", "cheese").delete()
+        self.create_product("Gouda", "cheese")
+
+        self.assertEqual(self.search('cheese'), ["Gouda"])
+
+    def test_search_index_covers_products_written_by_bulk_loader(self):
+        loader = BulkCSVLoader()
+        loader.add(2, {'store_product_id': '1', 'date': '2/20/2025', 'product_name': 'bananas', 'tags': 'banana fruit', 'unit': 'lb', 'units_per_pack': '1', 'packs_bought': '1', 'sale_price': '$1.49', 'unit_price': '$1.49', 'store_name': 'Costco', 'store_location': 'Pearland'})
+        loader.flush()
+
+        self.assertEqual(self.search('fruit'), ["bananas"])
+
+    def test_ranked_search_results_page_with_cursor_without_repeats(self):
+        for i in range(5):
+            self.create_product(f"Apple {'x' * i}", "fruit")
+        names, url = [], None
+        response = self.client.get(self.url, {'search': 'apple', 'page_size': 2})
+        while True:
+            names.extend(product['name'] for product in response.data['results'])
+            url = response.data['next']
+            if not url:
+                break
+            response = self.client.get(url)
+
+        self.assertEqual(sorted(names), sorted(product.name for product in Product.objects.all()))
+        self.assertEqual(len(names), 5)
+
+    @override_settings(PRODUCT_SEARCH_BACKEND='products.search.SubstringSearchBackend')
+    def test_search_backend_can_be_chosen_in_settings(self):
+        self.create_product("Cheddar", "cheese")
+
+        self.assertIsInstance(get_search_backend(), SubstringSearchBackend)
+        self.assertEqual(self.search('chee'), ["Cheddar"])
+
+    @override_settings(PRODUCT_SEARCH_BACKEND='products.search.SubstringSearchBackend')
+    def test_substring_search_ranks_exact_then_prefix_then_substring_then_tag_matches(self):
+        self.create_product("Cider", "apple")
+        self.create_product("Pineapple", "fruit")
+        self.create_product("Apple Juice", "drink")
+        self.create_product("Apple", "fruit")
+
+        self.assertEqual(self.search('apple'), ["Apple", "Apple Juice", "Pineapple", "Cider"])
+
+    @skipUnless(connection.vendor == 'sqlite', 'short terms skip the FTS5 rank on SQLite only')
+    def test_short_term_search_ranks_prefix_matches_first(self):
+        self.create_product("Smoked Kiwi", "fruit")
+        self.create_product("Kiwi", "fruit")
+
+        self.assertEqual(self.search('ki'), ["Kiwi", "Smoked Kiwi"])
@@ -0,0 +1,171 @@
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from products.bulk_loader import BulkCSVLoader
+from products.matching import product_matcher
+from products.models import Product, PriceSnapshot, StoreSKU
+from products.skus import update_skus, rebuild_skus, resolve_skus, resolve_products
+from shops.models import Shop
+from datetime import date
+from io import StringIO
+
+
+class StoreSKUMaintenanceTest(TestCase):
+    def setUp(self):
+        self.bananas = Product.objects.create(name="Bananas")
+        self.plantains = Product.objects.create(name="Plantains")
+        self.shop = Shop.objects.create(name="Costco", address="Pearland")
+
+    def snapshot(self, product, day, store_product_id='4011', shop=None):
+        return PriceSnapshot.objects.create(
+            product=product, shop=shop or self.shop, unit='lb', unit_price='0.49', date=date(2025, 2, day), store_product_id=store_product_id,
+        )
+
+    def sku_product_id(self, store_product_id='4011'):
+        return StoreSKU.objects.get(shop=self.shop, store_product_id=store_product_id).product_id
+
+    def test_new_snapshot_records_its_sku(self):
+        self.snapshot(self.bananas, 20)
+
+        self.assertEqual(self.sku_product_id(), self.bananas.id)
+
+    def test_newer_snapshot_moves_sku_to_its_product(self):
+        self.snapshot(self.bananas, 20)
+        self.snapshot(self.plantains, 21)
+
+        self.assertEqual(self.sku_product_id(), self.plantains.id)
+
+    def test_older_snapshot_does_not_move_sku(self):
+        self.snapshot(self.bananas, 20)
+        self.snapshot(self.plantains, 10)
+
+        self.assertEqual(self.sku_product_id(), self.bananas.id)
+
+    def test_snapshots_without_shop_or_sku_record_nothing(self):
+        self.snapshot(self.bananas, 20, store_product_id=None)
+        self.snapshot(self.bananas, 21, store_product_id='')
+        PriceSnapshot.objects.create(product=self.bananas, unit_price='0.49', store_product_id='4011')
+
+        self.assertFalse(StoreSKU.objects.exists())
+
+    def test_deleting_latest_snapshot_falls_back_to_previous_one(self):
+        self.snapshot(self.bananas, 20)
+        self.snapshot(self.plantains, 21).delete()
+
+        self.assertEqual(self.sku_product_id(), self.bananas.id)
+
+    def test_deleting_only_snapshot_removes_sku(self):
+        self.snapshot(self.bananas, 20).delete()
+
+        self.assertFalse(StoreSKU.objects.exists())
+
+    def test_moving_snapshot_to_another_shop_drops_sku_it_left(self):
+        other = Shop.objects.create(name="HEB", address="Katy")
+        snapshot = self.snapshot(self.bananas, 20, store_product_id='X1')
+        snapshot.shop = other
+        snapshot.save()
+
+        self.assertEqual(list(StoreSKU.objects.values_list('shop_id', 'store_product_id')), [(other.id, 'X1')])
+
+    def test_update_skus_applies_a_batch_in_one_query(self):
+        snapshots = [
+            PriceSnapshot(product=self.bananas, shop=self.shop, store_product_id='4011', date='2025-02-20'),
+            PriceSnapshot(product=self.plantains, shop=self.shop, store_product_id='4011', date='2025-02-21'),
+            PriceSnapshot(product=self.plantains, shop=self.shop, store_product_id='4235', date='2025-02-20'),
+        ]
+        with self.assertNumQueries(1):
+            update_skus(snapshots)
+
+        self.assertEqual((self.sku_product_id('4011'), self.sku_product_id('4235')), (self.plantains.id, self.plantains.id))
+
+    def test_bulk_loader_records_skus(self):
+        row = {
+            'store_product_id': '30669', 'date': '2/20/2025', 'product_name': 'bananas', 'tags': 'fruit', 'unit': 'lb',
+            'units_per_pack': '1', 'packs_bought': '1', 'sale_price': '$1.49', 'unit_price': '$1.49', 'store_name': 'HEB', 'store_location': 'Katy',
+        }
+        loader = BulkCSVLoader()
+        loader.add(2, row)
+        loader.add(3, {**row, 'product_name': 'organic bananas', 'date': '2/21/2025'})
+        loader.flush()
+
+        self.assertEqual(StoreSKU.objects.get(store_product_id='30669').product.name, 'organic bananas')
+
+    def test_rebuild_skus_recomputes_table_from_history(self):
+        self.snapshot(self.bananas, 20)
+        self.snapshot(self.plantains, 21, store_product_id='4235')
+        StoreSKU.objects.all().delete()
+        StoreSKU.objects.create(shop=self.shop, store_product_id='stale', product=self.bananas, date=date(2025, 1, 1))
+
+        self.assertEqual(rebuild_skus(), 2)
+        self.assertEqual((self.sku_product_id('4011'), self.sku_product_id('4235')), (self.bananas.id, self.plantains.id))
+
+    def test_rebuild_store_skus_command_reports_count(self):
+        self.snapshot(self.bananas, 20)
+        out = StringIO()
+        call_command('rebuild_store_skus', stdout=out)
+
+        self.assertIn('Rebuilt 1 store SKUs.', out.getvalue())
+
+
+class ResolveProductsTest(TestCase):
+    def setUp(self):
+        product_matcher.clear()
+        self.addCleanup(product_matcher.clear)
+        self.bananas = Product.objects.create(name="Bananas")
+        self.milk = Product.objects.create(name="Whole Milk")
+        self.shop = Shop.objects.create(name="Costco", address="Pearland")
+        self.other_shop = Shop.objects.create(name="HEB", address="Katy")
+        PriceSnapshot.objects.create(product=self.milk, shop=self.shop, unit='gal', unit_price='3.79', date=date(2025, 2, 20), store_product_id='1234')
+
+    def test_resolve_skus_matches_a_batch_in_one_query(self):
+        with self.assertNumQueries(1):
+            resolved = resolve_skus([(self.shop.id, '1234'), (self.other_shop.id, '1234'), (self.shop.id, '9999'), (None, '1234')])
+
+        self.assertEqual(resolved, {(self.shop.id, '1234'): (self.milk.id, 'Whole Milk')})
+
+    def test_known_skus_win_over_names_and_the_rest_fall_back_to_name_matching(self):
+        results = resolve_products([
+            (self.shop.id, '1234', 'KS BANANAS'),
+            (self.other_shop.id, '1234', 'KS BANANAS'),
+            (self.shop.id, None, 'Paper Towels'),
+        ], limit=1)
+
+        self.assertEqual(results, [
+            ('sku', [(self.milk.id, 'Whole Milk', 100.0)]),
+            ('name', [(self.bananas.id, 'Bananas', 95.0)]),
+            (None, []),
+        ])
+
+    def test_items_all_known_by_sku_skip_name_matching(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(resolve_products([(self.shop.id, '1234', '')]), [('sku', [(self.milk.id, 'Whole Milk', 100.0)])])
+
+
+class SkuResolveViewTest(TestCase):
+    def setUp(self):
+        product_matcher.clear()
+        self.addCleanup(product_matcher.clear)
+        self.client = APIClient()
+        self.url = reverse('sku-resolve')
+        self.milk = Product.objects.create(name="Whole Milk")
+        self.shop = Shop.objects.create(name="Costco", address="Pearland")
+        PriceSnapshot.objects.create(product=self.milk, shop=self.shop, unit='gal', unit_price='3.79', date=date(2025, 2, 20), store_product_id='1234')
+
+    def test_resolve_returns_matches_per_item(self):
+        response = self.client.post(self.url, {'items': [
+            {'shop': self.shop.id, 'store_product_id': '1234', 'name': 'WHL MLK'},
+            {'name': 'whole milk'},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [
+            {'index': 0, 'matched_by': 'sku', 'matches': [{'product_id': self.milk.id, 'name': 'Whole Milk', 'score': 100.0}]},
+            {'index': 1, 'matched_by': 'name', 'matches': [{'product_id': self.milk.id, 'name': 'Whole Milk', 'score': 100.0}]},
+        ])
+
+    def test_resolve_rejects_invalid_items(self):
+        response = self.client.post(self.url, {'items': [{'shop': 'costco'}]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
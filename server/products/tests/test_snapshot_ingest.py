@@ -0,0 +1,167 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from products.models import Product, Tag, PriceSnapshot, CurrentPrice
+from products.snapshot_ingest import API_SOURCE, parse_snapshot_row, validate_snapshot_rows, ingest_snapshots
+from shops.models import Shop
+from datetime import date
+from decimal import Decimal
+import json
+
+ROW = {
+    'product_name': 'Bananas', 'tags': 'fruit banana', 'store_name': 'Costco', 'store_location': 'Pearland',
+    'date': '2025-02-20', 'unit': 'lb', 'unit_price': '0.49',
+}
+
+
+def snapshot_row(**fields):
+    return {**ROW, **fields}
+
+
+class ValidateSnapshotRowsTest(TestCase):
+    def assert_same_as_reference(self, rows):
+        records, errors = validate_snapshot_rows(list(enumerate(rows)))
+        results = dict(records)
+        results.update((index, error.detail) for index, error in errors)
+
+        for index, row in enumerate(rows):
+            try:
+                expected = parse_snapshot_row(row)
+            except Exception as e:
+                expected = e.detail
+            self.assertEqual(results[index], expected, row)
+
+    def test_valid_row_becomes_loader_record(self):
+        records, errors = validate_snapshot_rows([(0, snapshot_row(unit_price=0.49, store_product_id='1234'))])
+
+        self.assertEqual(errors, [])
+        self.assertEqual(records, [(0, {
+            'product_name': 'Bananas', 'tags': ['fruit', 'banana'], 'shop': ('Costco', 'Pearland'), 'date': date(2025, 2, 20),
+            'unit': 'lb', 'unit_price': Decimal('0.49'), 'store_product_id': '1234', 'currency': 'USD', 'source': API_SOURCE,
+        })])
+
+    def test_row_without_tags_leaves_tags_unset(self):
+        records, _ = validate_snapshot_rows([(0, {key: value for key, value in ROW.items() if key != 'tags'})])
+
+        self.assertIsNone(records[0][1]['tags'])
+
+    def test_fast_path_matches_reference_serializer(self):
+        self.assert_same_as_reference([
+            snapshot_row(),
+            snapshot_row(product_name='  Apples  ', unit_price=3),
+            snapshot_row(unit='pound'),
+            snapshot_row(unit=' kg '),
+            snapshot_row(date=' 2024-01-01 '),
+            snapshot_row(unit_price=' 1.5 '),
+            snapshot_row(tags='  ', store_location=' '),
+            snapshot_row(currency=' '),
+            snapshot_row(source=''),
+            snapshot_row(date='2025-02-30'),
+            snapshot_row(date='02/20/2025'),
+            snapshot_row(unit_price='-1'),
+            snapshot_row(unit_price='1.23456'),
+            snapshot_row(unit_price=1e-7),
+            snapshot_row(product_name=''),
+            snapshot_row(product_name='x' * 256),
+            snapshot_row(store_product_id=None, currency='EUR', source='Store feed'),
+            snapshot_row(tags=None),
+            {'product_name': 'Bananas'},
+            ['not', 'an', 'object'],
+        ])
+
+    def test_undecodable_row_is_rejected_with_its_parse_error(self):
+        _, errors = validate_snapshot_rows([(0, ValueError('Invalid JSON at character 3.'))])
+
+        self.assertEqual(str(errors[0][1].detail['non_field_errors'][0]), 'Invalid JSON at character 3.')
+
+
+class IngestSnapshotsTest(TestCase):
+    def test_ingest_writes_snapshots_current_and_normalized_prices(self):
+        row_count, errors, truncated = ingest_snapshots([snapshot_row(), snapshot_row(date='2025-02-21', unit_price='0.39')], batch_size=1)
+
+        self.assertEqual((row_count, errors, truncated), (2, {}, False))
+        self.assertEqual(PriceSnapshot.objects.count(), 2)
+        self.assertEqual(PriceSnapshot.objects.filter(source=API_SOURCE, normalized_unit='kg').count(), 2)
+        self.assertEqual(CurrentPrice.objects.get().unit_price, Decimal('0.39'))
+
+    def test_ingest_keeps_tags_of_products_when_rows_have_none(self):
+        ingest_snapshots([snapshot_row()])
+        ingest_snapshots([{key: value for key, value in ROW.items() if key != 'tags'}])
+
+        self.assertEqual(sorted(Product.objects.get().tags.values_list('name', flat=True)), ['banana', 'fruit'])
+
+    def test_ingest_stops_reading_after_max_rows(self):
+        rows = iter([snapshot_row(date=f'2025-02-{day:02d}') for day in range(1, 6)])
+        row_count, _, truncated = ingest_snapshots(rows, max_rows=3)
+
+        self.assertEqual((row_count, truncated), (3, True))
+        self.assertEqual(PriceSnapshot.objects.count(), 3)
+
+
+class SnapshotBulkViewTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('snapshot-bulk')
+
+    def post(self, body, content_type):
+        return self.client.generic('POST', self.url, body, content_type=content_type)
+
+    def test_ndjson_rows_are_loaded_with_per_row_results(self):
+        body = '\n'.join([json.dumps(snapshot_row()), '{broken', json.dumps(snapshot_row(unit='pound')), json.dumps(snapshot_row(date='2025-02-21'))])
+        response = self.post(body, 'application/x-ndjson')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['loaded'], response.data['rejected']), (2, 2))
+        self.assertEqual([result['status'] for result in response.data['results']], ['loaded', 'rejected', 'rejected', 'loaded'])
+        self.assertIn('unit', response.data['results'][2]['errors'])
+        self.assertEqual(PriceSnapshot.objects.count(), 2)
+
+    def test_json_array_rows_are_loaded(self):
+        response = self.post(json.dumps([snapshot_row(), snapshot_row(product_name='Apples')]), 'application/json; charset=utf-8')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [{'index': 0, 'status': 'loaded'}, {'index': 1, 'status': 'loaded'}])
+        self.assertEqual(set(Product.objects.values_list('name', flat=True)), {'Bananas', 'Apples'})
+        self.assertEqual(Shop.objects.count(), 1)
+        self.assertEqual(Tag.objects.count(), 2)
+
+    def test_reposting_rows_does_not_duplicate_snapshots(self):
+        body = json.dumps([snapshot_row()])
+        self.post(body, 'application/json')
+        response = self.post(body, 'application/json')
+
+        self.assertEqual(response.data['loaded'], 1)
+        self.assertEqual(PriceSnapshot.objects.count(), 1)
+
+    def test_malformed_json_array_rejects_the_bad_element_and_stops(self):
+        response = self.post('[' + json.dumps(snapshot_row()) + ', {"product_name": }, ' + json.dumps(snapshot_row()) + ']', 'application/json')
+
+        self.assertEqual([result['status'] for result in response.data['results']], ['loaded', 'rejected'])
+        self.assertIn('Invalid JSON', str(response.data['results'][1]['errors']['non_field_errors'][0]))
+
+    @override_settings(SNAPSHOT_BULK_MAX_ROWS=1)
+    def test_request_with_more_rows_than_allowed_returns_payload_too_large(self):
+        response = self.post(json.dumps([snapshot_row(), snapshot_row(product_name='Apples')]), 'application/json')
+
+        self.assertEqual(response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        self.assertEqual(response.data['results'], [{'index': 0, 'status': 'loaded'}])
+        self.assertEqual(PriceSnapshot.objects.count(), 1)
+
+    def test_other_content_types_are_unsupported(self):
+        response = self.post('product_name=Bananas', 'application/x-www-form-urlencoded')
+
+        self.assertEqual(response.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+    def test_body_that_cannot_be_read_as_rows_is_a_bad_request(self):
+        for body in (json.dumps(snapshot_row()), b'[\xff]', ''):
+            response = self.post(body, 'application/json')
+
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, body)
+            self.assertNotIn('results', response.data)
+        self.assertEqual(PriceSnapshot.objects.count(), 0)
+
+    def test_empty_body_loads_nothing(self):
+        response = self.post('', 'application/x-ndjson')
+
+        self.assertEqual(response.data, {'loaded': 0, 'rejected': 0, 'results': []})
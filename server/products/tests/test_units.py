@@ -0,0 +1,127 @@
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from products.bulk_loader import BulkCSVLoader
+from products.models import Product, PriceSnapshot
+from products.serializers import CSVRowSerializer
+from products.units import normalize_unit_prices, normalize_unit_price, backfill_normalized_unit_prices
+from shops.models import Shop
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+CSV_ROW = {
+    'store_product_id': '1', 'date': '2/20/2025', 'product_name': 'Bananas', 'tags': 'fruit', 'unit': 'lb',
+    'units_per_pack': '1', 'packs_bought': '1', 'sale_price': '$1.49', 'unit_price': '$1.00',
+    'store_name': 'Costco', 'store_location': 'Pearland',
+}
+
+
+class NormalizeUnitPricesTest(TestCase):
+    def test_weights_are_converted_to_price_per_kg(self):
+        units, prices = normalize_unit_prices(['lb', 'oz', 'g', 'kg'], [Decimal('1'), Decimal('1'), Decimal('0.01'), Decimal('3.5')])
+
+        self.assertEqual(units, ['kg', 'kg', 'kg', 'kg'])
+        self.assertEqual(prices, [Decimal('2.2046'), Decimal('35.2740'), Decimal('10.0000'), Decimal('3.5000')])
+
+    def test_volumes_are_converted_to_price_per_litre(self):
+        units, prices = normalize_unit_prices(['gal', 'ml', 'l'], [Decimal('3.785411784'), Decimal('0.002'), Decimal('1.25')])
+
+        self.assertEqual(units, ['l', 'l', 'l'])
+        self.assertEqual(prices, [Decimal('1.0000'), Decimal('2.0000'), Decimal('1.2500')])
+
+    def test_each_stays_price_per_each(self):
+        self.assertEqual(normalize_unit_price('ea', Decimal('0.25')), ('ea', Decimal('0.2500')))
+
+    def test_unknown_unit_has_no_normalized_price(self):
+        self.assertEqual(normalize_unit_prices(['unit', 'lb'], [Decimal('1'), Decimal('1')]), ([None, 'kg'], [None, Decimal('2.2046')]))
+
+    def test_missing_price_has_no_normalized_price(self):
+        self.assertEqual(normalize_unit_price('lb', None), (None, None))
+
+    def test_empty_input_returns_empty_lists(self):
+        self.assertEqual(normalize_unit_prices([], []), ([], []))
+
+
+class NormalizedUnitPriceWritesTest(TestCase):
+    def setUp(self):
+        self.product = Product.objects.create(name="Bananas")
+        self.shop = Shop.objects.create(name="Costco", address="Pearland")
+
+    def test_saving_snapshot_stores_normalized_price(self):
+        snapshot = PriceSnapshot.objects.create(product=self.product, shop=self.shop, unit='lb', unit_price='1.00', date=date(2025, 2, 20))
+        snapshot.refresh_from_db()
+
+        self.assertEqual((snapshot.normalized_unit, snapshot.normalized_unit_price), ('kg', Decimal('2.2046')))
+
+    def test_changing_unit_updates_normalized_price(self):
+        snapshot = PriceSnapshot.objects.create(product=self.product, shop=self.shop, unit='lb', unit_price='1.00', date=date(2025, 2, 20))
+        snapshot.unit = 'g'
+        snapshot.save()
+        snapshot.refresh_from_db()
+
+        self.assertEqual((snapshot.normalized_unit, snapshot.normalized_unit_price), ('kg', Decimal('1000.0000')))
+
+    def test_csv_row_serializer_stores_normalized_price(self):
+        serializer = CSVRowSerializer(data={**CSV_ROW, 'unit': 'oz'})
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        self.assertEqual(PriceSnapshot.objects.get().normalized_unit_price, Decimal('35.2740'))
+
+    def test_bulk_loader_stores_normalized_prices(self):
+        loader = BulkCSVLoader()
+        loader.add(2, dict(CSV_ROW))
+        loader.add(3, {**CSV_ROW, 'unit': 'gal', 'unit_price': '$3.785411784'})
+        loader.flush()
+
+        self.assertEqual(
+            set(PriceSnapshot.objects.values_list('unit', 'normalized_unit', 'normalized_unit_price')),
+            {('lb', 'kg', Decimal('2.2046')), ('gal', 'l', Decimal('1.0000'))},
+        )
+
+    def test_cheapest_price_per_kg_query_uses_normalized_index(self):
+        snapshots = PriceSnapshot.objects.filter(product=self.product, normalized_unit='kg').order_by('normalized_unit_price')
+        sql, params = snapshots.values('id').query.sql_with_params()
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                # The test table is tiny, where a sequential scan would always win.
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute(('EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN ') + sql, params)
+            plan = ' '.join(str(column) for row in cursor.fetchall() for column in row)
+
+        self.assertIn('pricesnapshot_normalized', plan)
+
+
+class BackfillNormalizedUnitPricesTest(TestCase):
+    def setUp(self):
+        product = Product.objects.create(name="Bananas")
+        for day, unit in enumerate(['lb', 'ml', 'ea', 'unit'], start=1):
+            PriceSnapshot.objects.create(product=product, unit=unit, unit_price='2.00', date=date(2025, 2, day))
+        PriceSnapshot.objects.update(normalized_unit=None, normalized_unit_price=None)
+
+    def test_backfill_fills_in_missing_normalized_prices_in_batches(self):
+        updated = backfill_normalized_unit_prices(batch_size=3)
+
+        self.assertEqual(updated, 4)
+        self.assertEqual(
+            list(PriceSnapshot.objects.order_by('date').values_list('normalized_unit', 'normalized_unit_price')),
+            [('kg', Decimal('4.4092')), ('l', Decimal('2000.0000')), ('ea', Decimal('2.0000')), (None, None)],
+        )
+
+    def test_backfill_skips_snapshots_that_already_have_a_normalized_price(self):
+        backfill_normalized_unit_prices()
+
+        self.assertEqual(backfill_normalized_unit_prices(), 1)
+
+    def test_backfill_recomputes_every_snapshot_when_asked(self):
+        backfill_normalized_unit_prices()
+
+        self.assertEqual(backfill_normalized_unit_prices(recompute=True), 4)
+
+    def test_backfill_command_reports_number_of_updated_snapshots(self):
+        out = StringIO()
+        call_command('backfill_normalized_prices', '--batch-size', '2', stdout=out)
+
+        self.assertIn('Normalized 4 price snapshots.', out.getvalue())
+        self.assertEqual(PriceSnapshot.objects.filter(normalized_unit_price__isnull=False).count(), 3)
@@ -1,11 +1,13 @@
 from django.test import TestCase
 from products.models import Product, Tag, PriceSnapshot
+from products.serializers import ProductListSerializer, ProductDetailSerializer
 from shops.models import Shop
 from rest_framework.test import APIClient
 from django.urls import reverse
 from rest_framework import status
 from datetime import datetime
 from decimal import Decimal
+from unittest.mock import patch
 
 class TestProductGetViews(TestCase):
     def setUp(self):
@@ -18,13 +20,13 @@ class TestProductGetViews(TestCase):
 
     def test_get_all_products_returns_an_empty_list_of_products(self):
         response = self.client.get(self.url)
-        self.assertEqual(len(response.data), 0)
+        self.assertEqual(len(response.data['results']), 0)
 
     def test_create_a_product_and_list_view_returns_a_list_with_that_product(self):
         Product.objects.create(name="Test Product")
         response = self.client.get(self.url)
         
-        self.assertEqual(response.data[0]['name'], "Test Product")
+        self.assertEqual(response.data['results'][0]['name'], "Test Product")
 
     def test_create_a_product_and_retrieve_view_returns_the_product(self):
         product = Product.objects.create(name="Test Product")
@@ -42,7 +44,7 @@ class TestProductGetViews(TestCase):
         product.tags.add(Tag.objects.create(name="TestTag"))
         response = self.client.get(self.url)
         
-        self.assertEqual(response.data[0]['tags'][0], {'id': 1, 'name': 'TestTag'})
+        self.assertEqual(response.data['results'][0]['tags'][0], {'id': 1, 'name': 'TestTag'})
 
     def create_product_with_price_and_shop_information(self):
         product = Product.objects.create(name="Test Product")
@@ -76,20 +78,20 @@ class TestProductSearchViews(TestCase):
         Product.objects.create(name="Test Product")
         response = self.client.get(self.url, {'search': 'Test Product'})
 
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
 
     def test_create_a_product_with_tags_and_search_by_incorrect_name_returns_empty_result(self):
         Product.objects.create(name="Test Product")
         response = self.client.get(self.url, {'search': 'Incorrect Name'})
 
-        self.assertEqual(len(response.data), 0)
+        self.assertEqual(len(response.data['results']), 0)
 
     def test_create_a_product_with_tags_and_search_by_tag_returns_result_with_one_product(self):
         product = Product.objects.create(name="Test Product")
         product.tags.add(Tag.objects.create(name="TestTag"))
         response = self.client.get(self.url, {'search': 'TestTag'})
 
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
 
     def test_create_two_products_with_tags_and_search_by_name_returns_correct_products(self):
         product1 = Product.objects.create(name="Test Product 1")
@@ -99,7 +101,7 @@ class TestProductSearchViews(TestCase):
         product2.tags.add(tag)
         response = self.client.get(self.url, {'search': 'TestTag'})
 
-        self.assertEqual(len(response.data), 2)
+        self.assertEqual(len(response.data['results']), 2)
 
     def test_create_two_products_with_tags_and_search_by_incorrect_tag_returns_empty_result(self):
         product1 = Product.objects.create(name="Test Product 1")
@@ -108,7 +110,7 @@ class TestProductSearchViews(TestCase):
         product2.tags.add(Tag.objects.create(name="TestTag2"))
         response = self.client.get(self.url, {'search': 'Incorrect Tag'})
 
-        self.assertEqual(len(response.data), 0)
+        self.assertEqual(len(response.data['results']), 0)
 
     def test_create_two_products_with_tags_and_search_by_tag_returns_correct_products(self):
         product1 = Product.objects.create(name="Test Product 1")
@@ -117,5 +119,114 @@ class TestProductSearchViews(TestCase):
         product2.tags.add(Tag.objects.create(name="TestTag2"))
         response = self.client.get(self.url, {'search': 'TestTag1'})
 
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
 
+
+
+class TestProductPaginationViews(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('products')
+        self.products = [Product.objects.create(name=f"Product {i}") for i in range(5)]
+
+    def get_names(self, response):
+        return [product['name'] for product in response.data['results']]
+
+    def test_list_view_returns_page_of_requested_size_ordered_by_id_with_next_cursor(self):
+        response = self.client.get(self.url, {'page_size': 2})
+
+        self.assertEqual(self.get_names(response), ["Product 0", "Product 1"])
+        self.assertIsNotNone(response.data['next'])
+        self.assertIsNone(response.data['previous'])
+
+    def test_following_next_cursors_walks_every_product_exactly_once(self):
+        names = []
+        url = f'{self.url}?page_size=2'
+        while url:
+            response = self.client.get(url)
+            names.extend(self.get_names(response))
+            url = response.data['next']
+
+        self.assertEqual(names, [product.name for product in self.products])
+
+    def test_product_inserted_while_paging_does_not_shift_next_page(self):
+        first_page = self.client.get(self.url, {'page_size': 2})
+        Product.objects.create(name="Product inserted")
+        second_page = self.client.get(first_page.data['next'])
+
+        self.assertEqual(self.get_names(second_page), ["Product 2", "Product 3"])
+
+    def test_page_size_is_capped_at_max_page_size(self):
+        with patch('core.pagination.KeysetPagination.max_page_size', 3):
+            response = self.client.get(self.url, {'page_size': 100})
+
+        self.assertEqual(len(response.data['results']), 3)
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class TestProductViewQueryCounts(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('products')
+        self.shop = Shop.objects.create(name="Test Shop")
+        self.tags = [Tag.objects.create(name=f"Tag{i}") for i in range(3)]
+
+    def create_products(self, count):
+        products = []
+        for i in range(count):
+            product = Product.objects.create(name=f"Product {Product.objects.count()}")
+            product.tags.set(self.tags)
+            for day in range(1, 4):
+                PriceSnapshot.objects.create(product=product, shop=self.shop, unit_price=day, date=f'2025-01-0{day}')
+            products.append(product)
+        return products
+
+    def test_list_view_issues_same_number_of_queries_for_one_and_many_products(self):
+        self.create_products(1)
+        with self.assertNumQueries(2):
+            self.client.get(self.url)
+
+        self.create_products(20)
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.data['results']), 21)
+        self.assertEqual(len(response.data['results'][-1]['tags']), 3)
+
+    def test_search_by_tag_issues_constant_number_of_queries(self):
+        self.create_products(10)
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, {'search': 'Tag1'})
+        self.assertEqual(len(response.data['results']), 10)
+
+    def test_list_serializer_issues_same_number_of_queries_for_one_and_many_products(self):
+        self.create_products(1)
+        with self.assertNumQueries(2):
+            ProductListSerializer(Product.objects.with_tags(), many=True).data
+
+        self.create_products(20)
+        with self.assertNumQueries(2):
+            data = ProductListSerializer(Product.objects.with_tags(), many=True).data
+        self.assertEqual([tag['name'] for tag in data[-1]['tags']], ["Tag0", "Tag1", "Tag2"])
+
+    def test_detail_serializer_reads_prefetched_recent_snapshots(self):
+        self.create_products(5)
+        with self.assertNumQueries(3):
+            data = ProductDetailSerializer(Product.objects.with_tags().with_recent_snapshots(2), many=True).data
+
+        self.assertEqual([[snapshot['date'] for snapshot in product['price_snapshots']] for product in data], [['2025-01-03', '2025-01-02']] * 5)
+
+    def test_retrieve_view_issues_same_number_of_queries_regardless_of_snapshot_count(self):
+        product = self.create_products(1)[0]
+        with self.assertNumQueries(3):
+            self.client.get(reverse('product', args=[product.id]))
+
+        for day in range(4, 10):
+            PriceSnapshot.objects.create(product=product, shop=self.shop, unit_price=day, date=f'2025-01-0{day}')
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('product', args=[product.id]))
+        self.assertEqual(len(response.data['price_snapshots']), 9)
+        self.assertEqual(response.data['price_snapshots'][0]['date'], '2025-01-09')
@@ -0,0 +1,81 @@
+"""
+Conversion of snapshot prices into a canonical unit per dimension, so prices quoted per lb, oz, g or kg
+compare as prices per kg, gal, ml and l as prices per litre, and ea stays per each.
+Shared by the loaders, model saves and the backfill command so every path stores the same values.
+"""
+import math
+from decimal import Decimal
+import numpy as np
+from django.db import transaction
+from .models import PriceSnapshot
+
+# unit -> (canonical unit, how many canonical units one unit is)
+CANONICAL_UNITS = {
+    'lb': ('kg', 0.45359237),
+    'oz': ('kg', 0.028349523125),
+    'g': ('kg', 0.001),
+    'kg': ('kg', 1.0),
+    'gal': ('l', 3.785411784),
+    'ml': ('l', 0.001),
+    'l': ('l', 1.0),
+    'ea': ('ea', 1.0),
+}
+NORMALIZED_PRICE_PLACES = 4
+DEFAULT_BACKFILL_BATCH_SIZE = 5000
+
+
+def normalize_unit_prices(units, unit_prices):
+    """
+    Convert parallel sequences of units and unit prices in one pass.
+    Returns (normalized_units, normalized_unit_prices) as lists, with None for units that have no canonical unit
+    and for missing prices.
+    """
+    if not len(units):
+        return [], []
+
+    distinct, inverse = np.unique(np.asarray(units, dtype=object).astype(str), return_inverse=True)
+    conversions = [CANONICAL_UNITS.get(unit, (None, np.nan)) for unit in distinct]
+    canonical = np.array([unit for unit, _ in conversions], dtype=object)[inverse]
+    factors = np.array([factor for _, factor in conversions])[inverse]
+    prices = np.round(np.asarray(unit_prices, dtype=float) / factors, NORMALIZED_PRICE_PLACES)
+
+    normalized_prices = [
+        Decimal(f'{price:.{NORMALIZED_PRICE_PLACES}f}') if unit is not None and math.isfinite(price) else None
+        for unit, price in zip(canonical.tolist(), prices.tolist())
+    ]
+    return [unit if price is not None else None for unit, price in zip(canonical.tolist(), normalized_prices)], normalized_prices
+
+
+def normalize_unit_price(unit, unit_price):
+    """(normalized_unit, normalized_unit_price) of a single price."""
+    units, prices = normalize_unit_prices([unit], [unit_price])
+    return units[0], prices[0]
+
+
+def backfill_normalized_unit_prices(batch_size=DEFAULT_BACKFILL_BATCH_SIZE, recompute=False):
+    """
+    Fill in the normalized price of snapshots written before it existed, or of every snapshot with recompute.
+    Walks the table in id order, one transaction per batch. Returns the number of updated snapshots.
+    """
+    snapshots = PriceSnapshot.objects.order_by('id')
+    if not recompute:
+        snapshots = snapshots.filter(normalized_unit_price__isnull=True)
+
+    updated, last_id = 0, 0
+    while True:
+        batch = list(snapshots.filter(id__gt=last_id).values_list('id', 'unit', 'unit_price')[:batch_size])
+        if not batch:
+            return updated
+
+        ids, units, unit_prices = zip(*batch)
+        normalized_units, normalized_prices = normalize_unit_prices(units, unit_prices)
+        with transaction.atomic():
+            PriceSnapshot.objects.bulk_update(
+                [
+                    PriceSnapshot(id=snapshot_id, normalized_unit=normalized_unit, normalized_unit_price=normalized_price)
+                    for snapshot_id, normalized_unit, normalized_price in zip(ids, normalized_units, normalized_prices)
+                ],
+                ['normalized_unit', 'normalized_unit_price'],
+            )
+        updated += len(batch)
+        last_id = ids[-1]
@@ -1,8 +1,14 @@
 from django.urls import path
-from .views import ProductViewSet
+from .views import ProductViewSet, SnapshotBulkView, SkuResolveView
 
 urlpatterns = [
     path('', ProductViewSet.as_view({'get': 'list'}), name='products'),
     path('<int:pk>/', ProductViewSet.as_view({'get': 'retrieve'}), name='product'),
+    path('<int:pk>/prices/current/', ProductViewSet.as_view({'get': 'current_prices'}), name='product-current-prices'),
+    path('<int:pk>/prices/history/', ProductViewSet.as_view({'get': 'price_history'}), name='product-price-history'),
+    path('<int:pk>/prices/cheapest/', ProductViewSet.as_view({'get': 'cheapest_prices'}), name='product-cheapest-prices'),
+    path('facets/tags/', ProductViewSet.as_view({'get': 'tag_facets'}), name='product-tag-facets'),
+    path('snapshots/bulk/', SnapshotBulkView.as_view(), name='snapshot-bulk'),
+    path('skus/resolve/', SkuResolveView.as_view(), name='sku-resolve'),
 ]
 
@@ -1,6 +1,8 @@
 from datetime import datetime
 from decimal import Decimal
 
+VALID_UNITS = ['lb', 'oz', 'gal', 'ea', 'g', 'kg', 'ml', 'l']
+
 def format_date(date_string):
     return datetime.strptime(date_string, '%m/%d/%Y')
 
@@ -8,5 +10,5 @@ def convert_price_to_float(price_string):
     return Decimal(price_string.replace('$', ''))
 
 def validate_unit(unit):
-    if unit not in ['lb', 'oz', 'gal', 'ea', 'g', 'kg', 'ml', 'l']:
+    if unit not in VALID_UNITS:
         raise ValueError(f"Invalid unit: {unit}")
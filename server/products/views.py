@@ -1,14 +1,194 @@
-from rest_framework import viewsets, filters
-from .models import Product
-from .serializers import ProductListSerializer, ProductDetailSerializer
+import io
+import itertools
+from django.conf import settings
+from django.shortcuts import get_object_or_404
+from rest_framework import status, viewsets
+from rest_framework.exceptions import ParseError, UnsupportedMediaType, ValidationError
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+from core.json_stream import BodyError, iter_ndjson, iter_json_array
+from core.pagination import KeysetPagination, SearchRankKeysetPagination
+from core.response_cache import CachedResponseMixin, cache_response
+from .facets import ProductTagFilter, selected_tags, tag_facets
+from .models import Product, PriceSnapshot, CurrentPrice
+from .price_history import bucket_prices
+from .representations import PRODUCT_FIELDS, product_dicts, product_detail_dict
+from .search import ProductSearchFilter, RANK_FIELD
+from .skus import resolve_products
+from .snapshot_ingest import ingest_snapshots
+from .serializers import (
+    ProductListSerializer, ProductDetailSerializer, CurrentPriceSerializer,
+    PriceHistoryQuerySerializer, PriceHistoryBucketSerializer, SkuResolveSerializer, TagFacetQuerySerializer,
+)
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     queryset = Product.objects.all()
     serializer_class = ProductListSerializer
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['name', 'tags__name']
+    filter_backends = [ProductSearchFilter, ProductTagFilter]
+    response_cache_group = 'products'
+
+    @property
+    def pagination_class(self):
+        # Search results come back ranked, so their cursor is built on the rank instead of the id.
+        if ProductSearchFilter().get_search_terms(self.request):
+            return SearchRankKeysetPagination
+        return KeysetPagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ('list', 'retrieve'):
+            # Read as .values() rows, whose tags and snapshots products.representations fetches itself.
+            return queryset
+        return queryset.with_tags()
 
     def get_serializer_class(self):
         if self.action == 'retrieve':
             return ProductDetailSerializer
-        return ProductListSerializer
\ No newline at end of file
+        return ProductListSerializer
+
+    # list and retrieve build their JSON from .values() rows with products.representations instead of
+    # the serializers above, which describe the same output but cost a model and field round trip per object.
+
+    @cache_response
+    def list(self, request, *args, **kwargs):
+        fields = PRODUCT_FIELDS
+        if ProductSearchFilter().get_search_terms(request):
+            # The cursor of ranked results is read from the row.
+            fields = PRODUCT_FIELDS + [RANK_FIELD]
+        params = TagFacetQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        queryset = self.filter_queryset(self.get_queryset()).values(*fields)
+        page = self.paginate_queryset(queryset)
+        response = self.get_paginated_response(product_dicts(page))
+        if params.validated_data.get('facets') == 'tags':
+            response.data['facets'] = {'tags': self._tag_facets(request, params.validated_data['limit'])}
+        return response
+
+    @cache_response
+    def retrieve(self, request, *args, **kwargs):
+        row = get_object_or_404(self.get_queryset().values(*PRODUCT_FIELDS), pk=kwargs['pk'])
+        return Response(product_detail_dict(row, settings.PRODUCT_DETAIL_SNAPSHOT_LIMIT))
+
+    @cache_response
+    def current_prices(self, request, pk=None):
+        """Latest price at every shop, cheapest first. Reads one CurrentPrice row per shop and unit, not the history."""
+        prices = self._current_prices(request, pk).order_by('unit_price', 'shop_id')
+        return Response(CurrentPriceSerializer(prices, many=True).data)
+
+    @cache_response
+    def cheapest_prices(self, request, pk=None):
+        """The shop with the lowest current price for each unit the product is sold by."""
+        cheapest = {}
+        for price in self._current_prices(request, pk).order_by('unit', 'unit_price', 'shop_id'):
+            cheapest.setdefault(price.unit, price)
+        return Response(CurrentPriceSerializer(cheapest.values(), many=True).data)
+
+    @cache_response
+    def price_history(self, request, pk=None):
+        """Min, avg, max and last price per day, week or month and unit, optionally limited to a date range and shop."""
+        product = get_object_or_404(Product, pk=pk)
+        params = PriceHistoryQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        filters = params.validated_data
+
+        snapshots = PriceSnapshot.objects.filter(product=product)
+        if 'since' in filters:
+            snapshots = snapshots.filter(date__gte=filters['since'])
+        if 'until' in filters:
+            snapshots = snapshots.filter(date__lte=filters['until'])
+        if 'shop' in filters:
+            snapshots = snapshots.filter(shop_id=filters['shop'])
+
+        buckets = bucket_prices(snapshots, filters['bucket'])
+        return Response({'bucket': filters['bucket'], 'results': PriceHistoryBucketSerializer(buckets, many=True).data})
+
+    @cache_response
+    def tag_facets(self, request):
+        """Number of products per tag among the products matching ?search= and ?tag=, or the whole catalog without them."""
+        params = TagFacetQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        return Response({'results': self._tag_facets(request, params.validated_data['limit'])})
+
+    def _tag_facets(self, request, limit):
+        if not ProductSearchFilter().get_search_terms(request) and not selected_tags(request):
+            return tag_facets(limit=limit)
+        return tag_facets(self.filter_queryset(self.get_queryset()).values_list('id', flat=True), limit)
+
+    def _current_prices(self, request, pk):
+        product = get_object_or_404(Product, pk=pk)
+        prices = CurrentPrice.objects.filter(product=product).select_related('shop')
+        unit = request.query_params.get('unit')
+        if unit:
+            prices = prices.filter(unit=unit)
+        return prices
+
+
+class SnapshotBulkView(APIView):
+    """
+    Loads price snapshots posted as NDJSON, one row per line, or as one JSON array of rows.
+    The body is read and written a batch at a time, so a request never holds more than one batch in memory.
+    A body that cannot be read at all, like a JSON body that is not an array, is a 400 and loads nothing.
+    """
+    body_readers = {
+        'application/x-ndjson': iter_ndjson,
+        'application/jsonl': iter_ndjson,
+        'application/json': iter_json_array,
+    }
+
+    def post(self, request, *args, **kwargs):
+        reader = self.body_readers.get(request.content_type.split(';')[0].strip())
+        if reader is None:
+            raise UnsupportedMediaType(request.content_type)
+
+        # request.data would parse the whole body at once, so the raw stream is read instead.
+        row_count, errors, truncated = ingest_snapshots(self._read_rows(reader, request.stream or io.BytesIO()))
+        data = {
+            'loaded': row_count - len(errors),
+            'rejected': len(errors),
+            'results': [
+                {'index': index, 'status': 'rejected', 'errors': self._error_detail(errors[index])}
+                if index in errors else {'index': index, 'status': 'loaded'}
+                for index in range(row_count)
+            ],
+        }
+        if truncated:
+            data['detail'] = f'Only the first {row_count} rows were read, post the rest in another request.'
+            return Response(data, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        return Response(data)
+
+    def _read_rows(self, reader, stream):
+        rows = reader(stream)
+        for first in rows:
+            if isinstance(first, BodyError):
+                raise ParseError(str(first))
+            return itertools.chain([first], rows)
+        return rows
+
+    def _error_detail(self, error):
+        if isinstance(error, ValidationError):
+            return error.detail
+        return {api_settings.NON_FIELD_ERRORS_KEY: [str(error)]}
+
+
+class SkuResolveView(APIView):
+    """
+    Resolves a batch of items to products: every item whose (shop, store_product_id) is a known SKU
+    in one query, and the rest by fuzzy matching of their names.
+    """
+
+    def post(self, request, *args, **kwargs):
+        serializer = SkuResolveSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        items = serializer.validated_data['items']
+        results = resolve_products((item.get('shop'), item.get('store_product_id'), item['name']) for item in items)
+        return Response({
+            'results': [
+                {
+                    'index': index,
+                    'matched_by': matched_by,
+                    'matches': [{'product_id': product_id, 'name': name, 'score': score} for product_id, name, score in matches],
+                }
+                for index, (matched_by, matches) in enumerate(results)
+            ],
+        })
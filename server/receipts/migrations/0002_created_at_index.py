@@ -0,0 +1,18 @@
+# Generated by Django 4.2.23 on 2026-10-18 11:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('receipts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='receiptscan',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
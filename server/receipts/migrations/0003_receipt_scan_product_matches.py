@@ -0,0 +1,18 @@
+# Generated by Django 4.2.23 on 2026-10-18 12:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('receipts', '0002_created_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='receiptscan',
+            name='product_matches',
+            field=models.JSONField(blank=True, default=list, help_text='Best matching products of each receipt item, see products.matching'),
+        ),
+    ]
@@ -9,12 +9,13 @@ STATUS_CHOICES = [
 
 class ReceiptScan(models.Model):
     image = models.ImageField(upload_to='uploaded_receipt_images/')
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     ocr_text = models.TextField(blank=True)
     receipt_data = models.JSONField(default=dict, blank=True)
     processing_steps = models.JSONField(default=list, blank=True)
+    product_matches = models.JSONField(default=list, blank=True, help_text="Best matching products of each receipt item, see products.matching")
 
     def __str__(self):
         return f"ReceiptScan # ID: {self.pk}"
@@ -6,3 +6,20 @@ def parse_json_dict_from_text(full_text: str) -> dict:
 
     json_part = re.search(r'```json\n(.*)\n```', full_text, re.DOTALL).group(1)
     return json.loads(json_part)
+
+def parse_receipt_dict(receipt_data) -> dict:
+    """
+    The parsed receipt as a dict, whether the LLM answered with bare JSON or a ```json block, or {} if neither
+    """
+    if isinstance(receipt_data, dict):
+        return receipt_data
+    if not isinstance(receipt_data, str):
+        return {}
+    try:
+        parsed = json.loads(receipt_data)
+    except ValueError:
+        try:
+            parsed = parse_json_dict_from_text(receipt_data)
+        except (AttributeError, ValueError):
+            return {}
+    return parsed if isinstance(parsed, dict) else {}
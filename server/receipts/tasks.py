@@ -1,8 +1,16 @@
 from celery import shared_task
+from celery.signals import worker_process_init
+from products.matching import product_matcher, match_receipt_items
 from .models import ReceiptScan
 from .parsers.ocr_service import scan_image_text
+from .parsers.json_dict_parsers import parse_receipt_dict
 from .llm.client import parse_ocr_text_with_llm, revise_parsed_receipt_with_llm
 
+@worker_process_init.connect
+def warm_product_matcher(**kwargs):
+    # Load the product index once per worker process rather than on its first receipt.
+    product_matcher.refresh()
+
 @shared_task
 def process_receipt_task(scan_id):
     scan = ReceiptScan.objects.get(id=scan_id)
@@ -16,5 +24,15 @@ def process_receipt_task(scan_id):
     except Exception as e:
         print(f"Error processing receipt: {e}")
         scan.status = 'failed'
+    else:
+        scan.product_matches = receipt_product_matches(scan.receipt_data)
     finally:
         scan.save()
+
+def receipt_product_matches(receipt_data):
+    # Matching only enriches a scan, so when it fails the scan completes without matches.
+    try:
+        return match_receipt_items(parse_receipt_dict(receipt_data))
+    except Exception as e:
+        print(f"Error matching receipt items: {e}")
+        return []
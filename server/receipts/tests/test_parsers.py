@@ -1,7 +1,7 @@
 import numpy as np
 from django.test import TestCase
 from ..parsers.ocr_service import scan_image_text
-from ..parsers.json_dict_parsers import parse_json_dict_from_text
+from ..parsers.json_dict_parsers import parse_json_dict_from_text, parse_receipt_dict
 from unittest.mock import patch
 
 class OcrServiceTests(TestCase):
@@ -37,4 +37,12 @@ class JsonDictParsersTests(TestCase):
     def test_parse_json_dict_from_text_takes_sample_text_2_and_returns_dict_with_correct_keys(self):
         result = parse_json_dict_from_text(self.sample_text_2)
 
-        self.assertEqual(list(result.keys()), ['name', 'age', 'city'])
\ No newline at end of file
+        self.assertEqual(list(result.keys()), ['name', 'age', 'city'])
+
+    def test_parse_receipt_dict_accepts_bare_json_and_json_blocks(self):
+        self.assertEqual(parse_receipt_dict('{"items": []}'), {'items': []})
+        self.assertEqual(parse_receipt_dict(self.sample_text_2)['name'], 'John Doe')
+
+    def test_parse_receipt_dict_returns_empty_dict_for_anything_else(self):
+        for receipt_data in ['not json', '[1, 2]', None]:
+            self.assertEqual(parse_receipt_dict(receipt_data), {})
@@ -1,4 +1,7 @@
+import json
 from django.test import TestCase
+from products.matching import product_matcher
+from products.models import Product
 from ..tasks import process_receipt_task
 from ..models import ReceiptScan
 from unittest.mock import patch
@@ -10,6 +13,8 @@ PATCH_REVISE = 'receipts.tasks.revise_parsed_receipt_with_llm'
 class ProcessReceiptTaskTests(TestCase):
     def setUp(self):
         self.scan = ReceiptScan.objects.create(image='test_image.jpg')
+        product_matcher.clear()
+        self.addCleanup(product_matcher.clear)
         self._scan_p = patch(PATCH_SCAN, return_value='ocr text')
         self._parse_p = patch(PATCH_PARSE, return_value='{}')
         self._revise_p = patch(PATCH_REVISE, return_value='{}')
@@ -54,3 +59,30 @@ class ProcessReceiptTaskTests(TestCase):
                 self.assertEqual(str(e), 'Mocked exception')
         self.scan.refresh_from_db()
         self.assertEqual(self.scan.status, 'failed')
+
+    def test_sets_product_matches_for_receipt_items(self):
+        product = Product.objects.create(name='Ground Beef 90/10')
+        receipt = json.dumps({'items': [{'item': 'Beef Ground (90/10)'}, {'item': 'Zzzz'}]})
+        with patch(PATCH_REVISE, return_value=receipt):
+            process_receipt_task(self.scan.pk)
+        self.scan.refresh_from_db()
+        self.assertEqual(self.scan.product_matches, [
+            {'item': 'Beef Ground (90/10)', 'matches': [{'product_id': product.id, 'name': 'Ground Beef 90/10', 'score': 95.0}]},
+            {'item': 'Zzzz', 'matches': []},
+        ])
+
+    def test_matching_errors_complete_the_scan_without_product_matches(self):
+        receipt = json.dumps({'items': [{'item': 'Milk'}]})
+        with patch(PATCH_REVISE, return_value=receipt), patch('receipts.tasks.match_receipt_items', side_effect=Exception('Mocked exception')):
+            process_receipt_task(self.scan.pk)
+        self.scan.refresh_from_db()
+        self.assertEqual(self.scan.status, 'completed')
+        self.assertEqual(self.scan.receipt_data, receipt)
+        self.assertEqual(self.scan.product_matches, [])
+
+    def test_unparseable_receipt_data_leaves_no_product_matches(self):
+        with patch(PATCH_REVISE, return_value='no json here'):
+            process_receipt_task(self.scan.pk)
+        self.scan.refresh_from_db()
+        self.assertEqual(self.scan.status, 'completed')
+        self.assertEqual(self.scan.product_matches, [])
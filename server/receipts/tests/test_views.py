@@ -50,11 +50,18 @@ class ReceiptScanViewsTests(TestCase):
         self.assertEqual(self.client.get(self.receipt_scan_list_url).status_code, status.HTTP_200_OK)
 
     def test_receipt_scan_list_view_get_returns_empty_list_when_no_scans_exist(self):
-        self.assertEqual(self.client.get(self.receipt_scan_list_url).data, [])
+        self.assertEqual(self.client.get(self.receipt_scan_list_url).data['results'], [])
 
     def test_receipt_scan_list_view_get_returns_list_of_size_1_when_one_scan_exists(self):
         self.client.post(self.receipt_scan_request_url, self.receipt_scan_requestdata)
-        self.assertEqual(len(self.client.get(self.receipt_scan_list_url).data), 1)
+        self.assertEqual(len(self.client.get(self.receipt_scan_list_url).data['results']), 1)
+
+    def test_receipt_scan_list_view_get_returns_newest_scans_first_in_pages(self):
+        scan_ids = [self.client.post(self.receipt_scan_request_url, {'image': SimpleUploadedFile('test_image.jpg', _minimal_jpeg_bytes(), content_type='image/jpeg')}).data['id'] for _ in range(3)]
+        first_page = self.client.get(self.receipt_scan_list_url, {'page_size': 2})
+        second_page = self.client.get(first_page.data['next'])
+
+        self.assertEqual([scan['id'] for scan in first_page.data['results'] + second_page.data['results']], scan_ids[::-1])
 
     def test_receipt_scan_detail_view_get_returns_404_status_code_when_there_are_no_scans(self):
         self.assertEqual(self.client.get(self.receipt_scan_detail_url(scan_id=1)).status_code, status.HTTP_404_NOT_FOUND)
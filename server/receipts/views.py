@@ -1,16 +1,21 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from core.pagination import CreatedAtKeysetPagination
 from .serializers import ReceiptScanSerializer
 from .models import ReceiptScan
 from .tasks import process_receipt_task
 
 class ReceiptScanView(APIView):
+    pagination_class = CreatedAtKeysetPagination
+
     def get(self, request, *args, **kwargs):
         scan_id = kwargs.get('scan_id')
         if scan_id is None:
-            serializer = ReceiptScanSerializer(ReceiptScan.objects.all(), many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            paginator = self.pagination_class()
+            page = paginator.paginate_queryset(ReceiptScan.objects.all(), request, view=self)
+            serializer = ReceiptScanSerializer(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
         try:
             serializer = ReceiptScanSerializer(ReceiptScan.objects.get(id=scan_id))
             return Response(serializer.data, status=status.HTTP_200_OK)
@@ -51,6 +51,7 @@ INSTALLED_APPS = [
     'shops',
     'receipts',
     'orders',
+    'shopping_lists',
 ]
 
 MIDDLEWARE = [
@@ -109,6 +110,30 @@ else:
             'NAME': BASE_DIR / 'db.sqlite3',
         }
     }
+    # The INCLUDE columns of PriceSnapshot's covering indexes only exist on PostgreSQL.
+    SILENCED_SYSTEM_CHECKS = ['models.W040']
+
+# Cache
+# Product and shop GET responses are cached here (see core.response_cache). Redis is shared with Celery
+# when REDIS_URL is set; without it each process keeps its own in-memory cache.
+
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('CACHE_REDIS_URL', REDIS_URL),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Seconds a cached response is kept; writes through the app invalidate it earlier.
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', '600'))
 
 
 # Password validation
@@ -155,9 +180,39 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Custom user model
 AUTH_USER_MODEL = 'core.User'
 
+REST_FRAMEWORK = {
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.KeysetPagination',
+    'PAGE_SIZE': int(os.getenv('API_PAGE_SIZE', '50')),
+}
+
+# Seconds between refreshes of the in-memory price matrix used by the shopping list optimizer
+PRICE_MATRIX_REFRESH_INTERVAL = float(os.getenv('PRICE_MATRIX_REFRESH_INTERVAL', '1'))
+
+# Number of most recent price snapshots in a product's detail response; older ones are read from /prices/history/
+PRODUCT_DETAIL_SNAPSHOT_LIMIT = int(os.getenv('PRODUCT_DETAIL_SNAPSHOT_LIMIT', '100'))
+
+# Minimum rapidfuzz score (0-100) of both name and address for an incoming shop to resolve to an existing one
+SHOP_MATCH_THRESHOLD = float(os.getenv('SHOP_MATCH_THRESHOLD', '90'))
+
+# Matches kept per receipt item, and the minimum rapidfuzz score (0-100) of a product to be one of them
+PRODUCT_MATCH_LIMIT = int(os.getenv('PRODUCT_MATCH_LIMIT', '5'))
+PRODUCT_MATCH_MIN_SCORE = float(os.getenv('PRODUCT_MATCH_MIN_SCORE', '70'))
+
+# Rows accepted by one POST to /products/snapshots/bulk/, and rows validated and written per transaction
+SNAPSHOT_BULK_MAX_ROWS = int(os.getenv('SNAPSHOT_BULK_MAX_ROWS', '100000'))
+SNAPSHOT_BULK_BATCH_SIZE = int(os.getenv('SNAPSHOT_BULK_BATCH_SIZE', '1000'))
+
 # Celery Configuration
 # Run tasks synchronously in tests (no Redis needed)
 import sys
 if 'test' in sys.argv or 'pytest' in sys.modules:
     CELERY_TASK_ALWAYS_EAGER = True
     CELERY_TASK_EAGER_PROPAGATES = True
+    # The in-memory cache outlives each test's rolled back transaction, so responses are only
+    # cached by tests that turn it on with override_settings(RESPONSE_CACHE_TIMEOUT=...).
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+    RESPONSE_CACHE_TIMEOUT = 0
@@ -22,4 +22,6 @@ urlpatterns = [
     path('products/', include('products.urls')),
     path('shops/', include('shops.urls')),
     path('receipts/', include('receipts.urls')),
+    path('shopping-lists/', include('shopping_lists.urls')),
+    path('orders/', include('orders.urls')),
 ]
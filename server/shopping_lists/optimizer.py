@@ -0,0 +1,114 @@
+"""
+Cheapest assignment of shopping list items to shops.
+
+Given what each item costs at each shop, pick at most max_shops shops minimising the items' total at
+their cheapest chosen shop plus shop_cost for every shop after the first. Lists whose shop subsets
+can all be evaluated within EXACT_SEARCH_LIMIT are solved exactly; larger ones greedily add the shop
+that lowers the total most, then improve the choice by dropping and swapping shops until no move helps.
+Items a chosen set cannot cover cost a penalty larger than any real total, so coverage always comes first.
+"""
+from itertools import combinations, islice
+from math import comb
+import numpy as np
+
+EXACT_SEARCH_LIMIT = 20000
+SUBSET_BATCH_SIZE = 4096
+MAX_LOCAL_SEARCH_ROUNDS = 100
+
+
+def optimize(costs, shop_cost=0.0, max_shops=None):
+    """
+    costs is an items x shops array, inf where a shop does not sell the item.
+    Returns (shops, assignment, method): the chosen column indexes, the chosen column per item
+    or -1 for items none of the chosen shops sell, and 'exact' or 'heuristic'.
+    """
+    n_items, n_shops = costs.shape
+    if n_items == 0 or n_shops == 0:
+        return [], np.full(n_items, -1), 'exact'
+
+    limit = min(max_shops or n_shops, n_shops)
+    finite = np.isfinite(costs)
+    penalty = np.where(finite, costs, 0).max(axis=1).sum() + shop_cost * limit + 1
+    penalized = np.where(finite, costs, penalty)
+
+    if shop_cost == 0 and limit == n_shops:
+        # Extra shops are free, so every item simply goes to its cheapest shop.
+        shops, method = sorted(set(np.argmin(penalized, axis=1).tolist())), 'exact'
+    elif sum(comb(n_shops, size) for size in range(1, limit + 1)) <= EXACT_SEARCH_LIMIT:
+        shops, method = _exact(penalized, shop_cost, limit), 'exact'
+    else:
+        shops, method = _local_search(penalized, shop_cost, limit, _greedy(penalized, shop_cost, limit)), 'heuristic'
+
+    chosen = penalized[:, shops]
+    assignment = np.array(shops)[np.argmin(chosen, axis=1)]
+    assignment[np.min(chosen, axis=1) >= penalty] = -1
+    used = sorted(set(assignment[assignment >= 0].tolist()))
+    return used, assignment, method
+
+
+def total_cost(penalized, shops, shop_cost):
+    return penalized[:, shops].min(axis=1).sum() + shop_cost * (len(shops) - 1)
+
+
+def _exact(penalized, shop_cost, limit):
+    n_shops = penalized.shape[1]
+    best_total, best_shops = np.inf, None
+    for size in range(1, limit + 1):
+        subsets = combinations(range(n_shops), size)
+        while True:
+            batch = np.array(list(islice(subsets, SUBSET_BATCH_SIZE)), dtype=int).reshape(-1, size)
+            if not len(batch):
+                break
+            # items x subsets x size -> the total of every subset in the batch at once.
+            totals = penalized[:, batch].min(axis=2).sum(axis=0) + shop_cost * (size - 1)
+            index = int(np.argmin(totals))
+            if totals[index] < best_total:
+                best_total, best_shops = totals[index], batch[index].tolist()
+    return best_shops
+
+
+def _greedy(penalized, shop_cost, limit):
+    shops = []
+    best = np.full(penalized.shape[0], np.inf)
+    current = np.inf
+    while len(shops) < limit:
+        totals = np.minimum(best[:, None], penalized).sum(axis=0) + shop_cost * len(shops)
+        totals[shops] = np.inf
+        candidate = int(np.argmin(totals))
+        if totals[candidate] >= current:
+            break
+        shops.append(candidate)
+        best = np.minimum(best, penalized[:, candidate])
+        current = totals[candidate]
+    return shops
+
+
+def _local_search(penalized, shop_cost, limit, shops):
+    current = total_cost(penalized, shops, shop_cost)
+    for _ in range(MAX_LOCAL_SEARCH_ROUNDS):
+        best_move, best_total = None, current
+        for position, shop in enumerate(shops):
+            rest = shops[:position] + shops[position + 1:]
+            rest_best = penalized[:, rest].min(axis=1) if rest else np.full(penalized.shape[0], np.inf)
+            if rest:
+                dropped = rest_best.sum() + shop_cost * (len(rest) - 1)
+                if dropped < best_total:
+                    best_move, best_total = rest, dropped
+            # Swap shop for every other shop at once.
+            swapped = np.minimum(rest_best[:, None], penalized).sum(axis=0) + shop_cost * len(rest)
+            swapped[shops] = np.inf
+            candidate = int(np.argmin(swapped))
+            if swapped[candidate] < best_total:
+                best_move, best_total = rest + [candidate], swapped[candidate]
+        if len(shops) < limit:
+            current_best = penalized[:, shops].min(axis=1)
+            added = np.minimum(current_best[:, None], penalized).sum(axis=0) + shop_cost * len(shops)
+            added[shops] = np.inf
+            candidate = int(np.argmin(added))
+            if added[candidate] < best_total:
+                best_move, best_total = shops + [candidate], added[candidate]
+        if best_move is None:
+            break
+        shops, current = best_move, best_total
+    return shops
+
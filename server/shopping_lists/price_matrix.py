@@ -0,0 +1,135 @@
+"""
+In-memory product x shop matrix of current prices for the shopping list optimizer, one row per
+(product, unit) and one column per shop, inf where a shop has no price.
+It is loaded from CurrentPrice once, then refreshed by re-reading only the prices updated since the
+last refresh. Deleted prices leave nothing to re-read, so the matrix is reloaded when the number of
+prices in it no longer matches the table, or when one of its shops has been deleted.
+
+Every refresh hands out a snapshot of the matrix. A refresh that changes the matrix writes to copies of
+what the last snapshot holds, so a request keeps reading the one build it started with.
+"""
+import threading
+import time
+from collections import namedtuple
+from datetime import timedelta
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+from products.models import CurrentPrice
+from shops.models import Shop
+
+# Prices are re-read from a little before the last refresh, so prices written by transactions that
+# started earlier, and were stamped with that earlier time, are still picked up once they commit.
+REFRESH_OVERLAP = timedelta(minutes=5)
+
+
+class MatrixSnapshot(namedtuple('MatrixSnapshot', ['prices', 'row_index', 'units_by_product', 'shop_ids'])):
+    """One build of the matrix; prices has a column for every shop in shop_ids and is read-only."""
+
+    def units(self, product_id):
+        return self.units_by_product.get(product_id, ())
+
+    def row(self, product_id, unit):
+        return self.row_index.get((product_id, unit))
+
+
+class PriceMatrix:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self.prices = np.full((0, 0), np.inf)
+        self.row_index = {}
+        self.units_by_product = {}
+        self.shop_index = {}
+        self.shop_ids = []
+        self.price_count = 0
+        self.refreshed_at = None
+        self.checked_at = None
+        self.snapshot = None
+
+    def refresh(self, force=False):
+        """
+        Bring the matrix up to date, at most once per PRICE_MATRIX_REFRESH_INTERVAL unless forced,
+        and return a MatrixSnapshot of it.
+        """
+        with self.lock:
+            now = time.monotonic()
+            if not force and self.checked_at is not None and now - self.checked_at < settings.PRICE_MATRIX_REFRESH_INTERVAL:
+                return self.snapshot
+
+            started_at = timezone.now()
+            prices = CurrentPrice.objects.values_list('product_id', 'unit', 'shop_id', 'unit_price')
+            if self.refreshed_at is not None:
+                self._apply(prices.filter(updated_at__gte=self.refreshed_at - REFRESH_OVERLAP))
+            if self.refreshed_at is None or self.price_count != CurrentPrice.objects.count() or self._lost_shops():
+                self.clear()
+                self._apply(prices)
+            self.refreshed_at = started_at
+            self.checked_at = now
+            if self.snapshot is None:
+                self.prices.flags.writeable = False
+                self.snapshot = MatrixSnapshot(self.prices[:, :len(self.shop_ids)], self.row_index, self.units_by_product, self.shop_ids)
+            return self.snapshot
+
+    def expire(self):
+        """Make the next refresh check the tables, whatever the refresh interval."""
+        with self.lock:
+            self.checked_at = None
+
+    def _lost_shops(self):
+        return Shop.objects.filter(id__in=self.shop_ids).count() != len(self.shop_ids)
+
+    def _apply(self, prices):
+        prices = list(prices)
+        if not prices:
+            return
+
+        self._unshare()
+        rows, columns, values = [], [], []
+        for product_id, unit, shop_id, unit_price in prices:
+            rows.append(self._row_for(product_id, unit))
+            columns.append(self._column_for(shop_id))
+            values.append(float(unit_price))
+
+        self._grow(len(self.row_index), len(self.shop_ids))
+        rows, columns = np.array(rows), np.array(columns)
+        self.price_count += int(np.isinf(self.prices[rows, columns]).sum())
+        self.prices[rows, columns] = values
+
+    def _unshare(self):
+        """Copy whatever the last snapshot holds before it is written to, and drop the snapshot."""
+        if self.snapshot is None:
+            return
+        self.prices = self.prices.copy()
+        self.row_index = dict(self.row_index)
+        self.units_by_product = dict(self.units_by_product)
+        self.shop_index = dict(self.shop_index)
+        self.shop_ids = list(self.shop_ids)
+        self.snapshot = None
+
+    def _row_for(self, product_id, unit):
+        key = (product_id, unit)
+        if key not in self.row_index:
+            self.row_index[key] = len(self.row_index)
+            self.units_by_product[product_id] = (*self.units_by_product.get(product_id, ()), unit)
+        return self.row_index[key]
+
+    def _column_for(self, shop_id):
+        if shop_id not in self.shop_index:
+            self.shop_index[shop_id] = len(self.shop_ids)
+            self.shop_ids.append(shop_id)
+        return self.shop_index[shop_id]
+
+    def _grow(self, rows, columns):
+        # Capacity doubles, so new products and shops cost amortized O(1) copies.
+        capacity_rows, capacity_columns = self.prices.shape
+        if rows <= capacity_rows and columns <= capacity_columns:
+            return
+        grown = np.full((max(rows, 2 * capacity_rows), max(columns, 2 * capacity_columns)), np.inf)
+        grown[:capacity_rows, :capacity_columns] = self.prices
+        self.prices = grown
+
+
+price_matrix = PriceMatrix()
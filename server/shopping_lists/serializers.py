@@ -0,0 +1,20 @@
+from decimal import Decimal
+from rest_framework import serializers
+
+
+class ShoppingListItemSerializer(serializers.Serializer):
+    product = serializers.IntegerField()
+    quantity = serializers.DecimalField(max_digits=10, decimal_places=3, min_value=Decimal('0.001'), default=Decimal('1'))
+    unit = serializers.CharField(required=False, allow_blank=False)
+
+
+class OptimizeShoppingListSerializer(serializers.Serializer):
+    items = ShoppingListItemSerializer(many=True, allow_empty=False)
+    shop_cost = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0'), default=Decimal('0'))
+    max_shops = serializers.IntegerField(min_value=1, required=False)
+
+    def validate_items(self, items):
+        # Resolved against the price matrix in the view; only the item count is bounded here.
+        if len(items) > 500:
+            raise serializers.ValidationError("A shopping list can have at most 500 items.")
+        return items
@@ -0,0 +1,85 @@
+from django.test import SimpleTestCase
+from itertools import combinations
+from shopping_lists import optimizer
+from shopping_lists.optimizer import optimize
+from unittest.mock import patch
+import numpy as np
+
+INF = np.inf
+
+
+def brute_force_total(costs, shop_cost, max_shops):
+    best = INF
+    for size in range(1, max_shops + 1):
+        for shops in combinations(range(costs.shape[1]), size):
+            best = min(best, costs[:, shops].min(axis=1).sum() + shop_cost * (size - 1))
+    return best
+
+
+def solution_total(costs, shops, assignment, shop_cost):
+    return costs[np.arange(len(assignment)), assignment].sum() + shop_cost * (len(shops) - 1)
+
+
+class OptimizerTest(SimpleTestCase):
+    def test_without_shop_cost_every_item_goes_to_its_cheapest_shop(self):
+        costs = np.array([[1.0, 2.0], [3.0, 1.0]])
+        shops, assignment, method = optimize(costs)
+
+        self.assertEqual((shops, assignment.tolist(), method), ([0, 1], [0, 1], 'exact'))
+
+    def test_shop_cost_keeps_items_in_one_shop_when_splitting_saves_less(self):
+        costs = np.array([[1.0, 2.0], [3.0, 2.5]])
+
+        self.assertEqual(optimize(costs, shop_cost=1.0)[0], [0])
+        self.assertEqual(optimize(costs, shop_cost=0.4)[0], [0, 1])
+
+    def test_max_shops_limits_number_of_shops(self):
+        costs = np.array([[1.0, 5.0, 5.0], [5.0, 1.0, 5.0], [5.0, 5.0, 1.0]])
+        shops, assignment, _ = optimize(costs, max_shops=2)
+
+        self.assertEqual(len(shops), 2)
+        self.assertEqual(solution_total(costs, shops, assignment, 0), 7.0)
+
+    def test_coverage_comes_before_price(self):
+        costs = np.array([[1.0, 9.0], [INF, 9.0]])
+        shops, assignment, _ = optimize(costs, max_shops=1)
+
+        self.assertEqual((shops, assignment.tolist()), ([1], [1, 1]))
+
+    def test_items_no_chosen_shop_sells_are_marked_unassigned(self):
+        costs = np.array([[1.0, INF], [INF, 1.0]])
+        shops, assignment, _ = optimize(costs, max_shops=1)
+
+        self.assertEqual(len(shops), 1)
+        self.assertEqual(sorted(assignment.tolist()), [-1, 0] if shops == [0] else [-1, 1])
+
+    def test_exact_search_matches_brute_force_on_random_lists(self):
+        rng = np.random.default_rng(0)
+        for _ in range(20):
+            costs = rng.uniform(1, 10, (6, 7))
+            costs[rng.random(costs.shape) < 0.2] = INF
+            costs[:, 0] = rng.uniform(1, 10, 6)
+            shops, assignment, method = optimize(costs, shop_cost=2.0, max_shops=3)
+
+            self.assertEqual(method, 'exact')
+            self.assertAlmostEqual(solution_total(costs, shops, assignment, 2.0), brute_force_total(costs, 2.0, 3))
+
+    def test_large_lists_use_heuristic_close_to_optimum(self):
+        rng = np.random.default_rng(1)
+        costs = rng.uniform(1, 10, (30, 12))
+        with patch.object(optimizer, 'EXACT_SEARCH_LIMIT', 10):
+            shops, assignment, method = optimize(costs, shop_cost=3.0, max_shops=4)
+
+        self.assertEqual(method, 'heuristic')
+        self.assertLessEqual(len(shops), 4)
+        self.assertLessEqual(solution_total(costs, shops, assignment, 3.0), brute_force_total(costs, 3.0, 4) * 1.05)
+
+    def test_no_shops_leaves_every_item_unassigned(self):
+        shops, assignment, _ = optimize(np.empty((2, 0)))
+
+        self.assertEqual((shops, assignment.tolist()), ([], [-1, -1]))
+
+    def test_no_items_choose_no_shops(self):
+        shops, assignment, _ = optimize(np.empty((0, 2)))
+
+        self.assertEqual((shops, assignment.tolist()), ([], []))
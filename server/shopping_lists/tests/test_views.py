@@ -0,0 +1,120 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from products.models import Product, PriceSnapshot
+from shopping_lists.price_matrix import price_matrix
+from shops.models import Shop
+from datetime import date
+import numpy as np
+
+
+@override_settings(PRICE_MATRIX_REFRESH_INTERVAL=0)
+class OptimizeShoppingListViewTest(TestCase):
+    def setUp(self):
+        price_matrix.clear()
+        self.addCleanup(price_matrix.clear)
+        self.client = APIClient()
+        self.url = reverse('shopping-list-optimize')
+        self.costco = Shop.objects.create(name="Costco", address="Pearland")
+        self.heb = Shop.objects.create(name="HEB", address="Houston")
+        self.bananas = Product.objects.create(name="Bananas")
+        self.milk = Product.objects.create(name="Milk")
+        self.price(self.bananas, self.costco, '1.00')
+        self.price(self.bananas, self.heb, '1.50')
+        self.price(self.milk, self.costco, '4.00')
+        self.price(self.milk, self.heb, '3.00')
+
+    def price(self, product, shop, unit_price, unit='lb', day=20):
+        PriceSnapshot.objects.create(product=product, shop=shop, unit=unit, unit_price=unit_price, date=date(2025, 2, day))
+
+    def optimize(self, **body):
+        return self.client.post(self.url, body, format='json')
+
+    def test_items_are_bought_where_they_are_cheapest(self):
+        response = self.optimize(items=[{'product': self.bananas.id, 'quantity': 2}, {'product': self.milk.id}])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total'], 5.0)
+        self.assertEqual(
+            [(shop['shop']['name'], [item['name'] for item in shop['items']]) for shop in response.data['shops']],
+            [("Costco", ["Bananas"]), ("HEB", ["Milk"])],
+        )
+
+    def test_shop_cost_keeps_list_in_one_shop(self):
+        response = self.optimize(items=[{'product': self.bananas.id}, {'product': self.milk.id}], shop_cost='2.00')
+
+        self.assertEqual([shop['shop']['name'] for shop in response.data['shops']], ["HEB"])
+        self.assertEqual((response.data['total'], response.data['shop_costs']), (4.5, 0))
+
+    def test_max_shops_limits_number_of_shops(self):
+        response = self.optimize(items=[{'product': self.bananas.id}, {'product': self.milk.id}], max_shops=1)
+
+        self.assertEqual(len(response.data['shops']), 1)
+
+    def test_products_without_price_are_reported_unavailable(self):
+        cheese = Product.objects.create(name="Cheese")
+        response = self.optimize(items=[{'product': self.bananas.id}, {'product': cheese.id}])
+
+        self.assertEqual(response.data['unavailable'], [{'product': cheese.id, 'name': "Cheese", 'unit': None, 'quantity': 1.0}])
+
+    def test_list_without_any_priced_item_buys_nothing(self):
+        cheese = Product.objects.create(name="Cheese")
+        response = self.optimize(items=[{'product': cheese.id}])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['shops'], response.data['total']), ([], 0))
+        self.assertEqual([item['product'] for item in response.data['unavailable']], [cheese.id])
+
+    def test_product_priced_in_several_units_needs_a_unit(self):
+        self.price(self.bananas, self.costco, '0.25', unit='each')
+
+        self.assertEqual(self.optimize(items=[{'product': self.bananas.id}]).status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.optimize(items=[{'product': self.bananas.id, 'unit': 'each'}])
+        self.assertEqual(response.data['shops'][0]['items'][0]['unit_price'], 0.25)
+
+    def test_new_prices_are_picked_up_incrementally(self):
+        self.optimize(items=[{'product': self.milk.id}])
+        self.price(self.milk, self.costco, '2.00', day=21)
+
+        self.assertEqual(self.optimize(items=[{'product': self.milk.id}]).data['total'], 2.0)
+
+    def test_deleted_prices_reload_the_matrix(self):
+        self.optimize(items=[{'product': self.milk.id}])
+        PriceSnapshot.objects.filter(product=self.milk, shop=self.heb).get().delete()
+
+        self.assertEqual(self.optimize(items=[{'product': self.milk.id}]).data['total'], 4.0)
+
+    @override_settings(PRICE_MATRIX_REFRESH_INTERVAL=3600)
+    def test_shop_deleted_after_the_matrix_loaded_is_left_out_of_the_plan(self):
+        self.optimize(items=[{'product': self.milk.id}])
+        self.heb.delete()
+        response = self.optimize(items=[{'product': self.milk.id}])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([shop['shop']['name'] for shop in response.data['shops']], ["Costco"])
+        self.assertEqual(response.data['total'], 4.0)
+
+    def test_deleted_shop_reloads_the_matrix(self):
+        self.optimize(items=[{'product': self.milk.id}])
+        heb_id = self.heb.id
+        self.heb.delete()
+        # Keeps the number of prices the same, so only the lost shop tells the matrix to reload.
+        self.price(self.bananas, Shop.objects.create(name="Aldi", address="Houston"), '0.90')
+
+        self.assertNotIn(heb_id, price_matrix.refresh().shop_ids)
+
+    def test_refresh_leaves_snapshots_handed_out_before_it_alone(self):
+        before = price_matrix.refresh()
+        prices = before.prices.copy()
+        self.price(self.milk, self.costco, '2.00', day=21)
+        self.price(self.bananas, Shop.objects.create(name="Aldi", address="Houston"), '0.90')
+        after = price_matrix.refresh()
+
+        self.assertEqual((len(before.shop_ids), len(after.shop_ids)), (2, 3))
+        np.testing.assert_array_equal(before.prices, prices)
+        self.assertEqual(after.prices[after.row(self.milk.id, 'lb'), after.shop_ids.index(self.costco.id)], 2.0)
+        self.assertFalse(before.prices.flags.writeable)
+
+    def test_empty_list_is_rejected(self):
+        self.assertEqual(self.optimize(items=[]).status_code, status.HTTP_400_BAD_REQUEST)
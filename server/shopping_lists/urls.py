@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import OptimizeShoppingListView
+
+urlpatterns = [
+    path('optimize/', OptimizeShoppingListView.as_view(), name='shopping-list-optimize'),
+]
@@ -0,0 +1,94 @@
+import numpy as np
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from products.models import Product
+from shops.models import Shop
+from shops.serializers import ShopSerializer
+from .optimizer import optimize
+from .price_matrix import price_matrix
+from .serializers import OptimizeShoppingListSerializer
+
+
+class OptimizeShoppingListView(APIView):
+    def post(self, request, *args, **kwargs):
+        serializer = OptimizeShoppingListSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        items = serializer.validated_data['items']
+        shop_cost = float(serializer.validated_data['shop_cost'])
+
+        # Every read below goes to this one build of the matrix, whatever other requests refresh meanwhile.
+        matrix = price_matrix.refresh()
+        units, errors = self._resolve_units(matrix, items)
+        if any(errors):
+            return Response({'items': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Items without any current price are reported as unavailable and left out of the matrix.
+        rows = [matrix.row(item['product'], unit) for item, unit in zip(items, units)]
+        priced = [index for index, row in enumerate(rows) if row is not None]
+        quantities = np.array([float(items[index]['quantity']) for index in priced])
+        unit_prices = matrix.prices[[rows[index] for index in priced], :]
+        shops, assignment, method, shop_data = [], [], 'exact', {}
+        while priced:
+            shops, assignment, method = optimize(
+                unit_prices * quantities[:, None], shop_cost=shop_cost, max_shops=serializer.validated_data.get('max_shops'),
+            )
+            shop_ids = [matrix.shop_ids[shop] for shop in shops]
+            shop_data = {shop['id']: shop for shop in ShopSerializer(Shop.objects.filter(id__in=shop_ids), many=True).data}
+            missing = [shop for shop, shop_id in zip(shops, shop_ids) if shop_id not in shop_data]
+            if not missing:
+                break
+            # Shops deleted since the matrix was loaded lose their prices and the list is planned again.
+            # Every pass drops at least one shop, so this ends.
+            unit_prices[:, missing] = np.inf
+            price_matrix.expire()
+
+        names = dict(Product.objects.filter(id__in={item['product'] for item in items}).values_list('id', 'name'))
+
+        bought = {shop: [] for shop in shops}
+        unavailable = [index for index, row in enumerate(rows) if row is None]
+        for position, index in enumerate(priced):
+            shop = assignment[position]
+            if shop < 0:
+                unavailable.append(index)
+                continue
+            unit_price = float(unit_prices[position, shop])
+            bought[shop].append({
+                **self._item(items[index], units[index], names),
+                'unit_price': round(unit_price, 4),
+                'cost': round(unit_price * quantities[position], 4),
+            })
+
+        items_total = sum(item['cost'] for shop_items in bought.values() for item in shop_items)
+        shop_costs = shop_cost * max(len(shops) - 1, 0)
+        return Response({
+            'method': method,
+            'total': round(items_total + shop_costs, 4),
+            'items_total': round(items_total, 4),
+            'shop_costs': round(shop_costs, 4),
+            'shops': [
+                {
+                    'shop': shop_data[matrix.shop_ids[shop]],
+                    'items': bought[shop],
+                    'subtotal': round(sum(item['cost'] for item in bought[shop]), 4),
+                }
+                for shop in shops
+            ],
+            'unavailable': [self._item(items[index], units[index], names) for index in sorted(unavailable)],
+        })
+
+    def _resolve_units(self, matrix, items):
+        """The unit each item is priced in: the requested one, or the only one its product is priced in."""
+        units, errors = [], []
+        for item in items:
+            priced_units = matrix.units(item['product'])
+            if item.get('unit') or len(priced_units) <= 1:
+                units.append(item.get('unit') or next(iter(priced_units), None))
+                errors.append({})
+            else:
+                units.append(None)
+                errors.append({'unit': [f"Product {item['product']} is priced per {', '.join(sorted(priced_units))}, pick one."]})
+        return units, errors
+
+    def _item(self, item, unit, names):
+        return {'product': item['product'], 'name': names.get(item['product']), 'unit': unit, 'quantity': float(item['quantity'])}
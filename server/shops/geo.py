@@ -0,0 +1,78 @@
+"""
+Proximity search over Shop.latitude and Shop.longitude.
+
+Every located shop stores the cell of a GRID_DEGREES grid it lies in as row * GRID_COLUMNS + column,
+under a B-tree index. The cells of one grid row are consecutive numbers, so the cells under a search
+circle's bounding box come down to one index range per grid row. The shops found in them are measured
+with a vectorized haversine and only those within the radius are kept, nearest first.
+"""
+import math
+import numpy as np
+from django.db.models import Q
+from .models import Shop
+
+EARTH_RADIUS_KM = 6371.0088
+GRID_DEGREES = 0.1
+GRID_ROWS = round(180 / GRID_DEGREES)
+GRID_COLUMNS = round(360 / GRID_DEGREES)
+
+
+def grid_cell(latitude, longitude):
+    """The grid cell of a location, or None for shops without one."""
+    if latitude is None or longitude is None:
+        return None
+    return _grid_row(float(latitude)) * GRID_COLUMNS + _grid_column(float(longitude))
+
+
+def cell_ranges(latitude, longitude, radius_km):
+    """(first, last) cell ranges covering every location within radius_km of the given one."""
+    angle = radius_km / EARTH_RADIUS_KM
+    lat_min, lat_max = latitude - math.degrees(angle), latitude + math.degrees(angle)
+    if lat_min <= -90 or lat_max >= 90:
+        # The circle covers a pole, and with it every longitude.
+        column_spans = [(0, GRID_COLUMNS - 1)]
+    else:
+        lng_delta = math.degrees(math.asin(math.sin(angle) / math.cos(math.radians(latitude))))
+        first, last = _grid_column(longitude - lng_delta), _grid_column(longitude + lng_delta)
+        # A box crossing the antimeridian wraps around to the first columns.
+        column_spans = [(first, last)] if first <= last else [(first, GRID_COLUMNS - 1), (0, last)]
+
+    return [
+        (row * GRID_COLUMNS + first, row * GRID_COLUMNS + last)
+        for row in range(_grid_row(max(lat_min, -90)), _grid_row(min(lat_max, 90)) + 1)
+        for first, last in column_spans
+    ]
+
+
+def haversine_km(latitude, longitude, latitudes, longitudes):
+    """Great-circle distances in km from one location to arrays of locations."""
+    lat1, lng1 = math.radians(latitude), math.radians(longitude)
+    lat2, lng2 = np.radians(latitudes), np.radians(longitudes)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def nearby_shops(latitude, longitude, radius_km, limit):
+    """[(shop_id, distance_km)] of the limit nearest shops within radius_km, nearest first."""
+    cells = Q()
+    for first, last in cell_ranges(latitude, longitude, radius_km):
+        cells |= Q(grid_cell__range=(first, last))
+    candidates = list(Shop.objects.filter(cells).values_list('id', 'latitude', 'longitude'))
+    if not candidates:
+        return []
+
+    ids = np.array([shop_id for shop_id, _, _ in candidates])
+    locations = np.array([(float(lat), float(lng)) for _, lat, lng in candidates])
+    distances = haversine_km(latitude, longitude, locations[:, 0], locations[:, 1])
+    within = np.flatnonzero(distances <= radius_km)
+    # Ties are broken by id so equally far shops always come back in the same order.
+    nearest = within[np.lexsort((ids[within], distances[within]))][:limit]
+    return list(zip(ids[nearest].tolist(), distances[nearest].tolist()))
+
+
+def _grid_row(latitude):
+    return min(int((latitude + 90) // GRID_DEGREES), GRID_ROWS - 1)
+
+
+def _grid_column(longitude):
+    return int((longitude + 180) // GRID_DEGREES) % GRID_COLUMNS
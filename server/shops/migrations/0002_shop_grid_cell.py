@@ -0,0 +1,28 @@
+# Generated by Django 4.2.23 on 2026-10-18 11:54
+
+from django.db import migrations, models
+from shops.geo import grid_cell
+
+
+def set_grid_cells(apps, schema_editor):
+    Shop = apps.get_model('shops', 'Shop')
+    shops = list(Shop.objects.filter(latitude__isnull=False, longitude__isnull=False))
+    for shop in shops:
+        shop.grid_cell = grid_cell(shop.latitude, shop.longitude)
+    Shop.objects.bulk_update(shops, ['grid_cell'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shops', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shop',
+            name='grid_cell',
+            field=models.IntegerField(blank=True, db_index=True, editable=False, help_text='Location cell kept by shops.geo for proximity search', null=True),
+        ),
+        migrations.RunPython(set_grid_cells, migrations.RunPython.noop),
+    ]
@@ -10,6 +10,7 @@ class Shop(models.Model):
     address = models.CharField(max_length=255, blank=True)
     latitude = models.DecimalField(max_digits=10, decimal_places=8, null=True)
     longitude = models.DecimalField(max_digits=10, decimal_places=8, null=True)
+    grid_cell = models.IntegerField(null=True, blank=True, editable=False, db_index=True, help_text="Location cell kept by shops.geo for proximity search")
 
 
     def __str__(self):
@@ -0,0 +1,194 @@
+"""
+Matching of incoming shop names and addresses to existing shops, so variants like "SuperMart",
+"SUPERMART #12" and "SuperMart " resolve to one Shop instead of each creating another.
+
+Names lose case, punctuation, store numbers and spaces before they are compared, addresses lose case
+and punctuation. Every shop is filed in memory under blocks: each token of its normalized name and the
+first PREFIX_LENGTH characters of the name without spaces. A batch of lookups only scores the shops
+sharing a block with one of them, in one rapidfuzz process.cdist call for names and one for addresses.
+A shop matches when both its name and address score at least SHOP_MATCH_THRESHOLD and the numbers
+left in both names and in both addresses are the same, so "Shop 1" never becomes "Shop 12" and
+"1200 Main St" never becomes "1206 Main St"; exact name and address pairs always win.
+
+Like shopping_lists.price_matrix, the index loads every shop once and afterwards only re-reads shops
+updated since its last refresh, reloading when the number of shops in it no longer matches the table.
+"""
+import re
+import threading
+from datetime import timedelta
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rapidfuzz import fuzz, process
+from .models import Shop
+
+PREFIX_LENGTH = 4
+# Shops are re-read from a little before the last refresh, so shops written by transactions that
+# started earlier, and were stamped with that earlier time, are still picked up once they commit.
+REFRESH_OVERLAP = timedelta(minutes=5)
+
+STORE_NUMBER = re.compile(r'(?:#|\bno\.?|\bstore)\s*\d+\b')
+PUNCTUATION = re.compile(r'[^\w\s]')
+DIGITS = re.compile(r'\d+')
+
+
+def normalize_name(name):
+    name = STORE_NUMBER.sub(' ', name.casefold())
+    return ' '.join(PUNCTUATION.sub(' ', name).split())
+
+
+def normalize_address(address):
+    return ' '.join(PUNCTUATION.sub(' ', (address or '').casefold()).split())
+
+
+def name_numbers(normalized_name):
+    return ' '.join(DIGITS.findall(normalized_name))
+
+
+def name_blocks(normalized_name):
+    compact = normalized_name.replace(' ', '')
+    return {f'token:{token}' for token in normalized_name.split()} | ({f'prefix:{compact[:PREFIX_LENGTH]}'} if compact else set())
+
+
+class ShopResolver:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self.ids = []
+        self.names = []
+        self.addresses = []
+        self.match_names = []
+        self.match_addresses = []
+        self.match_numbers = []
+        self.match_address_numbers = []
+        self.positions = {}
+        self.exact = {}
+        self.blocks = {}
+        self.refreshed_at = None
+
+    def refresh(self):
+        """Bring the index up to date with the shops table."""
+        with self.lock:
+            started_at = timezone.now()
+            shops = Shop.objects.order_by('id').values_list('id', 'name', 'address')
+            if self.refreshed_at is not None:
+                self._apply(shops.filter(updated_at__gte=self.refreshed_at - REFRESH_OVERLAP))
+            if self.refreshed_at is None or len(self.ids) != Shop.objects.count():
+                self.clear()
+                self._apply(shops)
+            self.refreshed_at = started_at
+
+    def add(self, shop_id, name, address):
+        """File a shop the caller just created, without waiting for the next refresh."""
+        with self.lock:
+            self._apply([(shop_id, name, address)])
+
+    def resolve(self, keys, refresh=True):
+        """{(name, address): shop_id} for the keys that match an existing shop. Unmatched keys are left out."""
+        if refresh:
+            self.refresh()
+        keys = list(keys)
+        with self.lock:
+            matched = {key: self.exact[key] for key in keys if key in self.exact}
+            pending = [key for key in keys if key not in matched]
+            if pending:
+                matched.update(self._fuzzy_matches(pending))
+        return matched
+
+    def canonical(self, keys):
+        """
+        {(name, address): (name, address) to store it under}: the existing shop it matches,
+        or else the first of the unmatched keys it matches, see group_new_shops.
+        """
+        keys = list(keys)
+        matches = self.resolve(keys)
+        with self.lock:
+            canonical = {key: (self.names[self.positions[shop_id]], self.addresses[self.positions[shop_id]]) for key, shop_id in matches.items()}
+        canonical.update(group_new_shops(key for key in keys if key not in matches))
+        return canonical
+
+    def resolve_or_create(self, name, address):
+        """Id of the shop matching name and address, creating the shop when none does."""
+        shop_id = self.resolve([(name, address)]).get((name, address))
+        if shop_id is None:
+            shop_id = Shop.objects.create(name=name, address=address).pk
+            self.add_on_commit([(shop_id, name, address)])
+        return shop_id
+
+    def add_on_commit(self, shops):
+        # A rolled back shop must never be matched, so new shops are filed once they are committed.
+        transaction.on_commit(lambda: [self.add(*shop) for shop in shops])
+
+    def _fuzzy_matches(self, keys):
+        queries = [(normalize_name(name), normalize_address(address)) for name, address in keys]
+        # Ordered by id, so among equally good matches the oldest shop wins.
+        candidates = sorted({
+            position
+            for query_name, _ in queries
+            for block in name_blocks(query_name)
+            for position in self.blocks.get(block, ())
+        }, key=self.ids.__getitem__)
+        if not candidates:
+            return {}
+
+        threshold = settings.SHOP_MATCH_THRESHOLD
+        candidate_names = [self.match_names[position] for position in candidates]
+        candidate_addresses = [self.match_addresses[position] for position in candidates]
+        name_scores = process.cdist([name.replace(' ', '') for name, _ in queries], candidate_names, scorer=fuzz.ratio, workers=-1)
+        address_scores = process.cdist([address for _, address in queries], candidate_addresses, scorer=fuzz.token_sort_ratio, workers=-1)
+
+        # Among candidates good enough on both counts, the best combined score wins.
+        same_numbers = np.array([name_numbers(name) for name, _ in queries])[:, None] == np.array([self.match_numbers[position] for position in candidates])[None, :]
+        same_address_numbers = np.array([name_numbers(address) for _, address in queries])[:, None] == np.array([self.match_address_numbers[position] for position in candidates])[None, :]
+        qualified = (name_scores >= threshold) & (address_scores >= threshold) & same_numbers & same_address_numbers
+        combined = np.where(qualified, name_scores + address_scores, -1)
+        best = np.argmax(combined, axis=1)
+        return {
+            key: self.ids[candidates[column]]
+            for key, row, column in zip(keys, combined, best)
+            if row[column] >= 0
+        }
+
+    def _apply(self, shops):
+        for shop_id, name, address in shops:
+            position = self.positions.get(shop_id)
+            if position is None:
+                position = self.positions[shop_id] = len(self.ids)
+                for values in (self.ids, self.names, self.addresses, self.match_names, self.match_addresses, self.match_numbers, self.match_address_numbers):
+                    values.append(None)
+                self.ids[position] = shop_id
+            else:
+                for block in name_blocks(normalize_name(self.names[position])):
+                    self.blocks[block].discard(position)
+                if self.exact.get((self.names[position], self.addresses[position])) == shop_id:
+                    del self.exact[(self.names[position], self.addresses[position])]
+
+            normalized_name = normalize_name(name)
+            self.names[position], self.addresses[position] = name, address
+            self.match_names[position] = normalized_name.replace(' ', '')
+            self.match_addresses[position] = normalize_address(address)
+            self.match_numbers[position] = name_numbers(normalized_name)
+            self.match_address_numbers[position] = name_numbers(self.match_addresses[position])
+            for block in name_blocks(normalized_name):
+                self.blocks.setdefault(block, set()).add(position)
+            # The oldest of several identical shops keeps the exact match, like the loaders' order_by('id').
+            self.exact[(name, address)] = min(shop_id, self.exact.get((name, address), shop_id))
+
+
+def group_new_shops(keys):
+    """{(name, address): representative (name, address)} for keys without a shop yet, so variants of one shop become one."""
+    group, representatives, grouped = ShopResolver(), [], {}
+    for key in sorted(set(keys)):
+        match = group.resolve([key], refresh=False).get(key)
+        if match is None:
+            group.add(len(representatives), *key)
+            representatives.append(key)
+            match = len(representatives) - 1
+        grouped[key] = representatives[match]
+    return grouped
+
+
+shop_resolver = ShopResolver()
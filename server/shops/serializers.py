@@ -2,7 +2,16 @@ from rest_framework import serializers
 from .models import Shop
 
 class ShopSerializer(serializers.ModelSerializer):
+    latitude = serializers.FloatField(read_only=True)
+    longitude = serializers.FloatField(read_only=True)
+
     class Meta:
         model = Shop
-        fields = ['id', 'name', 'address']
+        fields = ['id', 'name', 'address', 'latitude', 'longitude']
         read_only_fields = ['id']
+
+class NearbyShopsQuerySerializer(serializers.Serializer):
+    lat = serializers.FloatField(min_value=-90, max_value=90)
+    lng = serializers.FloatField(min_value=-180, max_value=180)
+    radius = serializers.FloatField(min_value=0, max_value=200, default=5, help_text="Kilometres")
+    limit = serializers.IntegerField(min_value=1, max_value=500, default=50)
@@ -0,0 +1,16 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from core.response_cache import invalidate_responses
+from .geo import grid_cell
+from .models import Shop
+
+
+@receiver(pre_save, sender=Shop)
+def set_grid_cell(sender, instance, **kwargs):
+    instance.grid_cell = grid_cell(instance.latitude, instance.longitude)
+
+
+@receiver([post_save, post_delete], sender=Shop)
+def invalidate_shop_responses(sender, **kwargs):
+    # Shops are also nested in product price responses.
+    invalidate_responses('shops', 'products')
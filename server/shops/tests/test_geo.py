@@ -0,0 +1,88 @@
+from django.test import TestCase
+from shops.geo import GRID_COLUMNS, grid_cell, cell_ranges, haversine_km, nearby_shops
+from shops.models import Shop
+from decimal import Decimal
+import numpy as np
+
+# Downtown Houston and points around it
+HOUSTON = (29.7604, -95.3698)
+
+
+class GridCellTest(TestCase):
+    def test_grid_cell_numbers_cells_row_by_row(self):
+        self.assertEqual(grid_cell(-90, -180), 0)
+        self.assertEqual(grid_cell(-90, -179.95), 0)
+        self.assertEqual(grid_cell(-90, -179.85), 1)
+        self.assertEqual(grid_cell(-89.85, -180), GRID_COLUMNS)
+
+    def test_grid_cell_of_shop_without_location_is_none(self):
+        self.assertIsNone(grid_cell(None, Decimal('-95.3698')))
+
+    def test_saving_shop_keeps_its_grid_cell(self):
+        shop = Shop.objects.create(name="Costco", latitude=Decimal('29.7604'), longitude=Decimal('-95.3698'))
+        self.assertEqual(shop.grid_cell, grid_cell(*HOUSTON))
+
+        shop.latitude = shop.longitude = None
+        shop.save()
+        shop.refresh_from_db()
+        self.assertIsNone(shop.grid_cell)
+
+
+class CellRangesTest(TestCase):
+    def cells(self, latitude, longitude, radius_km):
+        return {cell for first, last in cell_ranges(latitude, longitude, radius_km) for cell in range(first, last + 1)}
+
+    def test_ranges_cover_every_point_within_radius(self):
+        rng = np.random.default_rng(0)
+        for latitude, longitude, radius_km in [(*HOUSTON, 25), (64.1, -21.9, 80), (-33.9, 151.2, 5)]:
+            cells = self.cells(latitude, longitude, radius_km)
+            bearings = rng.uniform(0, 2 * np.pi, 500)
+            distances = rng.uniform(0, radius_km, 500)
+            angle = distances / 6371.0088
+            lat1, lng1 = np.radians(latitude), np.radians(longitude)
+            lat2 = np.arcsin(np.sin(lat1) * np.cos(angle) + np.cos(lat1) * np.sin(angle) * np.cos(bearings))
+            lng2 = lng1 + np.arctan2(np.sin(bearings) * np.sin(angle) * np.cos(lat1), np.cos(angle) - np.sin(lat1) * np.sin(lat2))
+            for point_lat, point_lng in zip(np.degrees(lat2), (np.degrees(lng2) + 180) % 360 - 180):
+                self.assertIn(grid_cell(point_lat, point_lng), cells)
+
+    def test_ranges_wrap_around_the_antimeridian(self):
+        cells = self.cells(0, 179.99, 20)
+
+        self.assertIn(grid_cell(0, -179.95), cells)
+        self.assertIn(grid_cell(0, 179.95), cells)
+
+    def test_ranges_near_a_pole_cover_every_longitude(self):
+        self.assertEqual(cell_ranges(89.99, 0, 10)[-1], (GRID_COLUMNS * 1799, GRID_COLUMNS * 1800 - 1))
+
+
+class HaversineTest(TestCase):
+    def test_haversine_matches_known_distances(self):
+        # Houston to Dallas, and a quarter of a meridian
+        np.testing.assert_allclose(haversine_km(*HOUSTON, np.array([32.7767]), np.array([-96.797])), [361.8], rtol=1e-3)
+        np.testing.assert_allclose(haversine_km(0, 0, np.array([90.0]), np.array([0.0])), [np.pi / 2 * 6371.0088])
+
+
+class NearbyShopsTest(TestCase):
+    def shop(self, name, latitude, longitude):
+        return Shop.objects.create(name=name, latitude=Decimal(str(latitude)), longitude=Decimal(str(longitude)))
+
+    def test_nearby_shops_returns_shops_within_radius_nearest_first(self):
+        far = self.shop("Far", 29.95, -95.3698)
+        near = self.shop("Near", 29.77, -95.3698)
+        middle = self.shop("Middle", 29.80, -95.3698)
+        self.shop("Outside", 30.5, -95.3698)
+        Shop.objects.create(name="Nowhere")
+
+        results = nearby_shops(*HOUSTON, 25, limit=10)
+
+        self.assertEqual([shop_id for shop_id, _ in results], [near.id, middle.id, far.id])
+        self.assertAlmostEqual(results[0][1], 1.07, places=2)
+
+    def test_nearby_shops_returns_at_most_limit_shops(self):
+        for i in range(5):
+            self.shop(f"Shop {i}", 29.76 + i / 100, -95.3698)
+
+        self.assertEqual(len(nearby_shops(*HOUSTON, 25, limit=2)), 2)
+
+    def test_nearby_shops_without_candidates_is_empty(self):
+        self.assertEqual(nearby_shops(*HOUSTON, 25, limit=10), [])
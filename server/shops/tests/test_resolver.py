@@ -0,0 +1,114 @@
+from django.test import TestCase, override_settings
+from shops.models import Shop
+from shops.resolver import ShopResolver, normalize_name, normalize_address, group_new_shops
+
+ADDRESS = '3500 Business Center Drive, Pearland TX 77584'
+
+
+class NormalizationTest(TestCase):
+    def test_normalize_name_drops_case_punctuation_and_store_numbers(self):
+        self.assertEqual(normalize_name('SUPERMART #12'), 'supermart')
+        self.assertEqual(normalize_name('  Super-Mart Store 7 '), 'super mart')
+        self.assertEqual(normalize_name("Trader Joe's No. 451"), 'trader joe s')
+
+    def test_normalize_address_drops_case_and_punctuation(self):
+        self.assertEqual(normalize_address('3500 Business Center Dr., Pearland, TX'), '3500 business center dr pearland tx')
+        self.assertEqual(normalize_address(None), '')
+
+
+class ShopResolverTest(TestCase):
+    def setUp(self):
+        self.resolver = ShopResolver()
+        self.shop = Shop.objects.create(name='SuperMart', address=ADDRESS)
+
+    def test_exact_name_and_address_resolve_to_shop(self):
+        self.assertEqual(self.resolver.resolve([('SuperMart', ADDRESS)]), {('SuperMart', ADDRESS): self.shop.id})
+
+    def test_spelling_variants_resolve_to_existing_shop(self):
+        keys = [('SUPERMART #12', ADDRESS), ('Super Mart', ADDRESS.upper()), ('SuperMart', ADDRESS.replace(',', ''))]
+
+        self.assertEqual(self.resolver.resolve(keys), {key: self.shop.id for key in keys})
+
+    def test_different_shops_do_not_resolve(self):
+        keys = [('SuperMart', '12 Main St, Katy TX'), ('Super Foods', ADDRESS), ('SuperMart 2', ADDRESS)]
+
+        self.assertEqual(self.resolver.resolve(keys), {})
+
+    def test_names_differing_in_numbers_do_not_resolve(self):
+        shop_1 = Shop.objects.create(name='Shop 1', address=ADDRESS)
+
+        self.assertEqual(self.resolver.resolve([('shop 1', ADDRESS), ('Shop 12', ADDRESS)]), {('shop 1', ADDRESS): shop_1.id})
+
+    def test_addresses_differing_in_numbers_do_not_resolve(self):
+        kroger = Shop.objects.create(name='Kroger', address='1200 Main St')
+
+        self.assertEqual(self.resolver.resolve([('KROGER', '1200 Main St.'), ('Kroger', '1206 Main St')]), {('KROGER', '1200 Main St.'): kroger.id})
+
+    @override_settings(SHOP_MATCH_THRESHOLD=100)
+    def test_threshold_limits_how_different_a_match_may_be(self):
+        self.assertEqual(self.resolver.resolve([('SuperMrt', ADDRESS)]), {})
+
+    def test_oldest_of_identical_shops_wins(self):
+        Shop.objects.create(name='SuperMart', address=ADDRESS)
+
+        self.assertEqual(self.resolver.resolve([('SUPERMART', ADDRESS), ('SuperMart', ADDRESS)]), {
+            ('SUPERMART', ADDRESS): self.shop.id, ('SuperMart', ADDRESS): self.shop.id,
+        })
+
+    def test_shops_created_after_first_lookup_are_found(self):
+        self.resolver.resolve([('SuperMart', ADDRESS)])
+        later = Shop.objects.create(name='Fresh Market', address=ADDRESS)
+
+        self.assertEqual(self.resolver.resolve([('FRESH MARKET', ADDRESS)]), {('FRESH MARKET', ADDRESS): later.id})
+
+    def test_refresh_reads_only_recently_updated_shops(self):
+        self.resolver.refresh()
+
+        with self.assertNumQueries(2):
+            self.resolver.refresh()
+
+    def test_renamed_shop_is_refiled_under_its_new_name(self):
+        self.resolver.refresh()
+        self.shop.name = 'Fresh Market'
+        self.shop.save()
+
+        self.assertEqual(self.resolver.resolve([('SuperMart', ADDRESS), ('Fresh Market', ADDRESS)]), {('Fresh Market', ADDRESS): self.shop.id})
+
+    def test_deleted_shop_is_no_longer_resolved(self):
+        self.resolver.refresh()
+        self.shop.delete()
+
+        self.assertEqual(self.resolver.resolve([('SuperMart', ADDRESS)]), {})
+
+    def test_resolve_or_create_creates_a_shop_only_once(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            first = self.resolver.resolve_or_create('Fresh Market', ADDRESS)
+        second = self.resolver.resolve_or_create('FRESH MARKET #3', ADDRESS)
+
+        self.assertEqual(first, second)
+        self.assertEqual(Shop.objects.filter(name='Fresh Market').count(), 1)
+
+    def test_canonical_maps_keys_to_the_shop_they_resolve_to(self):
+        canonical = self.resolver.canonical([('SUPERMART #12', ADDRESS), ('Fresh Market', ADDRESS), ('FRESH MARKET', ADDRESS)])
+
+        self.assertEqual(canonical, {
+            ('SUPERMART #12', ADDRESS): ('SuperMart', ADDRESS),
+            ('FRESH MARKET', ADDRESS): ('FRESH MARKET', ADDRESS),
+            ('Fresh Market', ADDRESS): ('FRESH MARKET', ADDRESS),
+        })
+
+
+class GroupNewShopsTest(TestCase):
+    def test_variants_are_grouped_under_their_first_key(self):
+        grouped = group_new_shops([('Fresh Market', ''), ('FRESH MARKET #2', ''), ('Corner Store', '')])
+
+        self.assertEqual(grouped, {
+            ('Corner Store', ''): ('Corner Store', ''),
+            ('FRESH MARKET #2', ''): ('FRESH MARKET #2', ''),
+            ('Fresh Market', ''): ('FRESH MARKET #2', ''),
+        })
+
+    def test_shops_at_different_street_numbers_stay_apart(self):
+        grouped = group_new_shops([('Kroger', '1200 Main St'), ('Kroger', '1206 Main St')])
+
+        self.assertEqual(grouped, {('Kroger', '1200 Main St'): ('Kroger', '1200 Main St'), ('Kroger', '1206 Main St'): ('Kroger', '1206 Main St')})
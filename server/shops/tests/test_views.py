@@ -3,6 +3,7 @@ from rest_framework.test import APIClient
 from rest_framework import status
 from django.urls import reverse
 from shops.models import Shop
+from decimal import Decimal
 
 class TestShopRetrievalViews(TestCase):
     def setUp(self):
@@ -15,13 +16,13 @@ class TestShopRetrievalViews(TestCase):
 
     def test_get_all_shops_returns_an_empty_list_of_shops(self):
         response = self.client.get(self.url)
-        self.assertEqual(len(response.data), 0)
+        self.assertEqual(len(response.data['results']), 0)
 
     def test_create_a_shop_and_list_view_returns_a_list_with_that_shop(self):
         Shop.objects.create(name="Test Shop")
         response = self.client.get(self.url)
 
-        self.assertEqual(response.data[0]['name'], "Test Shop")
+        self.assertEqual(response.data['results'][0]['name'], "Test Shop")
 
     def test_create_a_shop_and_retrieve_view_returns_the_shop(self):
         shop = Shop.objects.create(name="Test Shop")
@@ -44,23 +45,92 @@ class TestShopSearchViews(TestCase):
         Shop.objects.create(name="Another Shop")
         response = self.client.get(self.url, {'search': 'Test'})
         
-        self.assertEqual(response.data[0]['name'], "Test Shop")
+        self.assertEqual(response.data['results'][0]['name'], "Test Shop")
 
     def test_search_by_incorrect_name_returns_empty_list(self):
         Shop.objects.create(name="Test Shop")
         response = self.client.get(self.url, {'search': 'Incorrect Name'})
 
-        self.assertEqual(len(response.data), 0)
+        self.assertEqual(len(response.data['results']), 0)
 
     def test_search_by_address_returns_correct_shops(self):
         Shop.objects.create(name="Test Shop", address="123 Main St")
         Shop.objects.create(name="Another Shop", address="456 Main St")
         response = self.client.get(self.url, {'search': 'Main St'})
 
-        self.assertEqual(len(response.data), 2)
+        self.assertEqual(len(response.data['results']), 2)
         
     def test_search_by_incorrect_address_returns_empty_list(self):
         Shop.objects.create(name="Test Shop", address="123 Main St")
         response = self.client.get(self.url, {'search': 'Incorrect Address'})
 
-        self.assertEqual(len(response.data), 0)
+        self.assertEqual(len(response.data['results']), 0)
+
+
+class TestShopPaginationViews(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('shops')
+        for i in range(3):
+            Shop.objects.create(name=f"Shop {i}", address=f"{i} Main St")
+
+    def test_search_results_are_paginated_with_cursor(self):
+        first_page = self.client.get(self.url, {'search': 'Main St', 'page_size': 2})
+        second_page = self.client.get(first_page.data['next'])
+
+        self.assertEqual([shop['name'] for shop in first_page.data['results']], ["Shop 0", "Shop 1"])
+        self.assertEqual([shop['name'] for shop in second_page.data['results']], ["Shop 2"])
+        self.assertIsNone(second_page.data['next'])
+
+
+class TestShopViewQueryCounts(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('shops')
+
+    def test_list_view_issues_one_query_regardless_of_shop_count(self):
+        Shop.objects.create(name="Shop 0", address="0 Main St")
+        with self.assertNumQueries(1):
+            self.client.get(self.url)
+
+        for i in range(1, 20):
+            Shop.objects.create(name=f"Shop {i}", address=f"{i} Main St")
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.data['results']), 20)
+
+
+class TestNearbyShopsView(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('shops-nearby')
+        self.near = Shop.objects.create(name="Near", latitude=Decimal('29.77'), longitude=Decimal('-95.3698'))
+        self.far = Shop.objects.create(name="Far", latitude=Decimal('29.95'), longitude=Decimal('-95.3698'))
+
+    def test_nearby_returns_shops_within_radius_sorted_by_distance(self):
+        response = self.client.get(self.url, {'lat': 29.7604, 'lng': -95.3698, 'radius': 25})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([shop['name'] for shop in response.data['results']], ["Near", "Far"])
+        self.assertEqual(response.data['results'][0]['latitude'], 29.77)
+        self.assertAlmostEqual(response.data['results'][0]['distance_km'], 1.068, places=2)
+
+    def test_nearby_leaves_out_shops_outside_radius(self):
+        response = self.client.get(self.url, {'lat': 29.7604, 'lng': -95.3698, 'radius': 5})
+
+        self.assertEqual([shop['name'] for shop in response.data['results']], ["Near"])
+
+    def test_nearby_reads_shops_in_two_queries(self):
+        with self.assertNumQueries(2):
+            self.client.get(self.url, {'lat': 29.7604, 'lng': -95.3698, 'radius': 25})
+
+    def test_nearby_requires_valid_coordinates(self):
+        response = self.client.get(self.url, {'lat': 91, 'radius': 5})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(set(response.data), {'lat', 'lng'})
+
+    def test_shop_detail_exposes_coordinates(self):
+        response = self.client.get(reverse('shop', args=[self.near.id]))
+
+        self.assertEqual((response.data['latitude'], response.data['longitude']), (29.77, -95.3698))
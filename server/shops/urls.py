@@ -3,5 +3,6 @@ from .views import ShopViewSet
 
 urlpatterns = [
     path('', ShopViewSet.as_view({'get': 'list'}), name='shops'),
+    path('nearby/', ShopViewSet.as_view({'get': 'nearby'}), name='shops-nearby'),
     path('<int:pk>/', ShopViewSet.as_view({'get': 'retrieve'}), name='shop'),
 ]
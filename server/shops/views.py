@@ -1,9 +1,25 @@
 from rest_framework import viewsets, filters
+from rest_framework.response import Response
+from core.response_cache import CachedResponseMixin, cache_response
+from .geo import nearby_shops
 from .models import Shop
-from .serializers import ShopSerializer
+from .serializers import ShopSerializer, NearbyShopsQuerySerializer
 
-class ShopViewSet(viewsets.ModelViewSet):
+class ShopViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     queryset = Shop.objects.all()
     serializer_class = ShopSerializer
     filter_backends = [filters.SearchFilter]
     search_fields = ['name', 'address']
+    response_cache_group = 'shops'
+
+    @cache_response
+    def nearby(self, request):
+        """Shops within radius km of lat, lng, nearest first, each with its distance in km."""
+        params = NearbyShopsQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        query = params.validated_data
+
+        distances = dict(nearby_shops(query['lat'], query['lng'], query['radius'], query['limit']))
+        shops = sorted(Shop.objects.filter(id__in=distances), key=lambda shop: (distances[shop.id], shop.id))
+        results = [{**shop, 'distance_km': round(distances[shop['id']], 3)} for shop in ShopSerializer(shops, many=True).data]
+        return Response({'results': results})